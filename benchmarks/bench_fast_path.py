@@ -0,0 +1,58 @@
+"""
+Per-call overhead of `TimeQuota` against `FastTimeQuota`, in nanoseconds.
+
+Usage: python benchmarks/bench_fast_path.py [--number N]
+"""
+
+import argparse
+import timeit
+
+from tabulate import tabulate
+
+from timequota import TimeQuota, FastTimeQuota
+
+
+def bench(quota_cls, number):
+    tq = quota_cls(float("inf"), verbose=False)
+
+    def ns_per_call(stmt, calls=number):
+        tq.reset()
+        return min(timeit.repeat(stmt, number=1, repeat=5)) / calls * 1e9
+
+    return {
+        "update()": ns_per_call(lambda: [tq.update() for _ in range(number)]),
+        "track()": ns_per_call(lambda: [tq.track() for _ in range(number)]),
+        "iter() per item": ns_per_call(lambda: [_ for _ in tq.iter(range(number))]),
+        "range() per item": ns_per_call(lambda: [_ for _ in tq.range(number)]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = {
+        cls.__name__: bench(cls, args.number) for cls in (TimeQuota, FastTimeQuota)
+    }
+
+    table = [
+        [
+            call,
+            results["TimeQuota"][call],
+            results["FastTimeQuota"][call],
+            results["TimeQuota"][call] / results["FastTimeQuota"][call],
+        ]
+        for call in results["TimeQuota"]
+    ]
+    print(
+        tabulate(
+            table,
+            ["call", "TimeQuota (ns)", "FastTimeQuota (ns)", "speedup"],
+            floatfmt=".1f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
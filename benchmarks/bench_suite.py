@@ -0,0 +1,278 @@
+"""
+Benchmark suite of TimeQuota per-step overhead and overflow prediction accuracy.
+
+Usage: python benchmarks/bench_suite.py [--number N] [--output results.json] [--compare baseline.json]
+
+Overhead scenarios time tight loops of update(), track(), iter() and range(), verbose and silent quotas,
+step aggregators and long step histories, in nanoseconds per call.
+Accuracy scenarios run quota guarded loops on a simulated clock over synthetic step time distributions
+(constant, heavy-tailed, trending), reporting how much of the quota is used and how often and how far loops overrun it.
+Results are written as JSON, and compared against an earlier results file with --compare.
+"""
+
+import sys
+import json
+import time
+import random
+import timeit
+import argparse
+import platform
+import statistics
+
+from tabulate import tabulate
+
+import timequota
+from timequota import (
+    TimeQuota,
+    FastTimeQuota,
+    RunningMean,
+    EWMA,
+    Welford,
+    P2Quantile,
+    LinearTrendPredictor,
+    QuantilePredictor,
+    SafetyMarginPredictor,
+)
+
+
+def ns_per_call(fn, number, repeat=5):
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / number * 1e9
+
+
+def bench_overhead(number):
+    results = {}
+
+    # typeguard checks every call of TimeQuota methods, about 100 times slower than FastTimeQuota, fewer calls are enough
+    for quota_cls, calls in (
+        (TimeQuota, max(number // 100, 100)),
+        (FastTimeQuota, number),
+    ):
+        tq = quota_cls(float("inf"), verbose=False)
+        prefix = quota_cls.__name__
+
+        def loop(method):
+            tq.reset()
+            for _ in range(calls):
+                method()
+
+        results[f"{prefix} update()"] = ns_per_call(lambda: loop(tq.update), calls)
+        results[f"{prefix} track()"] = ns_per_call(lambda: loop(tq.track), calls)
+        results[f"{prefix} iter()"] = ns_per_call(
+            lambda: [_ for _ in tq.iter(range(calls))], calls
+        )
+        results[f"{prefix} range()"] = ns_per_call(
+            lambda: [_ for _ in tq.range(calls)], calls
+        )
+        results[f"{prefix} range(stride=None)"] = ns_per_call(
+            lambda: [_ for _ in tq.range(calls, stride=None)], calls
+        )
+
+    # verbose quotas format a message every step, silent ones do not
+    for verbose in (False, True):
+        tq = FastTimeQuota(float("inf"), logger_fn=lambda _: None, verbose=verbose)
+        results[f"verbose={verbose} track()"] = ns_per_call(
+            lambda: [tq.track() for _ in range(number)], number
+        )
+
+    tq = FastTimeQuota(float("inf"), logger_fn=lambda _: None, log_every=1000)
+    results["verbose=True log_every=1000 track()"] = ns_per_call(
+        lambda: [tq.track() for _ in range(number)], number
+    )
+
+    return results
+
+
+def bench_aggregators(number):
+    results = {}
+
+    aggregators = {
+        "mean": statistics.mean,
+        "RunningMean": RunningMean(),
+        "EWMA": EWMA(),
+        "Welford": Welford(k=1),
+        "P2Quantile": P2Quantile(0.95),
+    }
+    for name, step_aggr_fn in aggregators.items():
+        tq = FastTimeQuota(float("inf"), step_aggr_fn=step_aggr_fn, verbose=False)
+        results[f"{name} track()"] = ns_per_call(
+            lambda: [tq.track() for _ in range(number)], number
+        )
+
+    # plain callables re-aggregate the whole history every step, quadratic in the number of calls
+    number = min(number, 10_000)
+    tq = FastTimeQuota(float("inf"), step_aggr_fn=max, verbose=False)
+    results[f"max (plain callable) track() x{number}"] = ns_per_call(
+        lambda: [tq.track() for _ in range(number)], number
+    )
+
+    return results
+
+
+def bench_histories(number, history_length=1_000_000):
+    results = {}
+
+    for history_size in (None, 1000, 0):
+        tq = FastTimeQuota(float("inf"), history_size=history_size, verbose=False)
+        for _ in range(history_length):
+            tq.time_steps.append(0.0)
+
+        results[f"history_size={history_size} track()"] = ns_per_call(
+            lambda: [tq.track() for _ in range(number)], number
+        )
+        results[f"history_size={history_size} bytes"] = tq.time_steps.nbytes
+
+    return results
+
+
+def constant_steps(rng):
+    while True:
+        yield 0.01
+
+
+def heavy_tailed_steps(rng):
+    while True:
+        yield 0.005 * rng.paretovariate(1.5)
+
+
+def trending_steps(rng):
+    step = 0.005
+    while True:
+        yield step * rng.uniform(0.9, 1.1)
+        step *= 1.002
+
+
+workloads = {
+    "constant": constant_steps,
+    "heavy-tailed": heavy_tailed_steps,
+    "trending": trending_steps,
+}
+
+
+def run_simulated(quota, steps, step_aggr_fn, predictor=None):
+    clock = [0.0]
+    tq = FastTimeQuota(
+        quota,
+        step_aggr_fn=step_aggr_fn,
+        history_size=0,
+        predictor=predictor,
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+
+    for _ in tq.iter(iter(int, 1)):
+        clock[0] += next(steps)
+
+    return tq.time_elapsed
+
+
+def bench_accuracy(runs, quota=10.0):
+    results = {}
+
+    predictions = {
+        "mean": lambda: (RunningMean(), None),
+        "EWMA": lambda: (EWMA(), None),
+        "Welford(k=2)": lambda: (Welford(k=2), None),
+        "P2Quantile(0.95)": lambda: (P2Quantile(0.95), None),
+        "LinearTrendPredictor": lambda: (RunningMean(), LinearTrendPredictor()),
+        "QuantilePredictor(0.95)": lambda: (RunningMean(), QuantilePredictor(0.95)),
+        "SafetyMarginPredictor(factor=1.5)": lambda: (
+            RunningMean(),
+            SafetyMarginPredictor(factor=1.5),
+        ),
+    }
+    for workload_name, workload in workloads.items():
+        for aggr_name, get_prediction in predictions.items():
+            elapsed = [
+                run_simulated(quota, workload(random.Random(seed)), *get_prediction())
+                for seed in range(runs)
+            ]
+            overruns = [e - quota for e in elapsed if e > quota]
+
+            results[f"{workload_name} {aggr_name}"] = {
+                "quota used": statistics.mean(min(e, quota) for e in elapsed) / quota,
+                "overrun rate": len(overruns) / runs,
+                "mean overrun (s)": statistics.mean(overruns) if overruns else 0.0,
+                "max overrun (s)": max(overruns, default=0.0),
+            }
+
+    return results
+
+
+def compare(results, baseline):
+    rows = []
+    for suite, suite_results in results.items():
+        if suite == "metadata":
+            continue
+        for name, value in suite_results.items():
+            baseline_value = baseline.get(suite, {}).get(name)
+            if baseline_value is None:
+                continue
+
+            if isinstance(value, dict):
+                pairs = [
+                    (f"{name} {metric}", value[metric], baseline_value.get(metric))
+                    for metric in value
+                ]
+            else:
+                pairs = [(name, value, baseline_value)]
+
+            for scenario, current, previous in pairs:
+                if previous is not None:
+                    ratio = current / previous if previous else float("nan")
+                    rows.append([suite, scenario, previous, current, ratio])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default=None, help="JSON results file")
+    parser.add_argument("--compare", default=None, help="JSON results to compare to")
+    args = parser.parse_args()
+
+    results = {
+        "metadata": {
+            "timequota": timequota.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "number": args.number,
+            "runs": args.runs,
+        },
+        "overhead (ns)": bench_overhead(args.number),
+        "aggregators (ns)": bench_aggregators(args.number),
+        "histories (ns)": bench_histories(args.number),
+        "accuracy": bench_accuracy(args.runs),
+    }
+
+    for suite, suite_results in results.items():
+        if suite == "metadata":
+            continue
+        if suite == "accuracy":
+            headers = ["scenario", *next(iter(suite_results.values()))]
+            table = [[name, *values.values()] for name, values in suite_results.items()]
+        else:
+            headers = ["scenario", suite]
+            table = list(suite_results.items())
+        print(tabulate(table, headers, floatfmt=".3f"), end="\n\n")
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(
+            tabulate(
+                compare(results, baseline),
+                ["suite", "scenario", "baseline", "current", "ratio"],
+                floatfmt=".3f",
+            )
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
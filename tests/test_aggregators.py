@@ -0,0 +1,113 @@
+import random
+import statistics
+
+import pytest
+
+from timequota import TimeQuota, RunningMean, EWMA, Welford, P2Quantile
+
+
+class FakeTimer:
+    def __init__(self, steps):
+        self.now = 0.0
+        self.steps = iter(steps)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self):
+        self.now += next(self.steps)
+
+
+def test_running_mean():
+    steps = [random.random() for _ in range(1000)]
+    agg = RunningMean()
+
+    for i, step in enumerate(steps, 1):
+        assert agg.update(step) == pytest.approx(statistics.mean(steps[:i]))
+
+    assert agg(steps[:10]) == pytest.approx(statistics.mean(steps[:10]))
+
+    agg.reset()
+    assert agg.value == 0
+
+
+def test_ewma():
+    agg = EWMA(alpha=0.5)
+    assert agg.update(2) == 2
+    assert agg.update(4) == 3
+    assert agg.update(5) == 4
+
+    with pytest.raises(ValueError):
+        EWMA(alpha=0)
+
+
+def test_welford():
+    steps = [random.random() for _ in range(1000)]
+    agg = Welford()
+    for step in steps:
+        agg.update(step)
+
+    assert agg.value == pytest.approx(statistics.mean(steps))
+    assert agg.variance == pytest.approx(statistics.variance(steps))
+    assert agg.stdev == pytest.approx(statistics.stdev(steps))
+
+    agg = Welford(k=2)
+    assert agg(steps) == pytest.approx(
+        statistics.mean(steps) + 2 * statistics.stdev(steps)
+    )
+
+
+def test_p2_quantile():
+    random.seed(0)
+    steps = [random.expovariate(1) for _ in range(10000)]
+
+    for q in [0.5, 0.9, 0.95]:
+        exact = statistics.quantiles(steps, n=100)[round(q * 100) - 1]
+        assert P2Quantile(q)(steps) == pytest.approx(exact, rel=0.05)
+
+    agg = P2Quantile(0.5)
+    assert agg.value == 0
+    assert agg.update(3) == 3
+    agg.update(1)
+    agg.update(2)
+    assert agg.value == 2
+
+    with pytest.raises(ValueError):
+        P2Quantile(1)
+
+
+def test_update_many():
+    for make_agg in [RunningMean, lambda: EWMA(0.3), lambda: Welford(k=1), P2Quantile]:
+        agg, expected = make_agg(), make_agg()
+        for step, count in [(2, 1), (1, 4), (3, 2)]:
+            agg.update_many(step, count)
+            for _ in range(count):
+                expected.update(step)
+            assert agg.value == pytest.approx(expected.value)
+            assert agg.count == expected.count
+
+
+def test_quota_aggregators():
+    steps = [0.1, 0.3, 0.2, 0.4, 0.2, 0.5, 0.1]
+
+    for step_aggr_fn in [statistics.mean, RunningMean(), Welford()]:
+        timer = FakeTimer(steps)
+        tq = TimeQuota(10, step_aggr_fn=step_aggr_fn, timer_fn=timer, verbose=False)
+
+        for i in range(len(steps)):
+            timer.advance()
+            tq.track()
+            assert tq.time_per_step == pytest.approx(statistics.mean(steps[: i + 1]))
+
+        tq.reset()
+        assert tq.time_per_step == 0
+
+    # aggregator state is reset with the quota
+    timer = FakeTimer([5, 1])
+    tq = TimeQuota(10, step_aggr_fn=EWMA(0.5), timer_fn=timer, verbose=False)
+    timer.advance()
+    tq.track()
+    tq.reset()
+    timer.advance()
+    tq.track()
+    assert tq.time_per_step == 1
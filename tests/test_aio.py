@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from timequota import TimeQuota
+
+
+async def agen(n, delay=0):
+    for i in range(n):
+        await asyncio.sleep(delay)
+        yield i
+
+
+def test_aiter():
+    tq = TimeQuota(1, "s", name="aiter", verbose=False)
+
+    async def collect(aiterable, **kwargs):
+        return [i async for i in tq.aiter(aiterable, **kwargs)]
+
+    # function
+    assert asyncio.run(collect(agen(5))) == list(range(5))
+    assert asyncio.run(collect(agen(5), stride=2)) == list(range(5))
+    assert len(tq.time_steps) == 8
+
+    # time predicted exhausted
+    tq.reset()
+    exceeded = []
+    assert asyncio.run(
+        collect(agen(10, 0.3), time_exceeded_fn=lambda: exceeded.append(True))
+    ) == [0, 1, 2]
+    assert tq.overflow == False
+    assert tq.predicted_overflow == True
+    assert exceeded == [True]
+
+
+def test_deadline():
+    tq = TimeQuota(0.3, "s", name="deadline", verbose=False)
+
+    async def work(steps, **kwargs):
+        async with tq.deadline(**kwargs):
+            for _ in range(steps):
+                await asyncio.sleep(0.1)
+            return True
+
+    # not exhausted
+    assert asyncio.run(work(1)) == True
+    assert tq.time_exceeded == False
+
+    # cancelled on exhaustion, without waiting for the enclosed code
+    tq.reset()
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(work(10))
+    assert time.perf_counter() - start < 0.5
+    assert tq.overflow == True
+
+    # pre-exhausted
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(work(1))
+
+    # cancelled on predicted exhaustion
+    tq.reset()
+    tq.time_per_step = 0.2
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(work(10, predicted=True))
+    assert time.perf_counter() - start < 0.2
+
+    # unrelated cancellation is propagated
+    tq.reset()
+
+    async def cancelled():
+        task = asyncio.ensure_future(work(10))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancelled())
+
+
+def test_deadline_steps():
+    clock = [0.0]
+    tq = TimeQuota(10, name="deadline-steps", timer_fn=lambda: clock[0], verbose=False)
+
+    async def work():
+        async for _ in tq.aiter(agen(4), verbose=False):
+            async with tq.deadline():
+                clock[0] += 1
+
+    # deadlines within a step are charged without ending the step
+    asyncio.run(work())
+    assert tq.time_steps == [1, 1, 1, 1]
+    assert tq.time_elapsed == 4
@@ -0,0 +1,61 @@
+import pytest
+
+from timequota import TimeQuota, FastTimeQuota, RunningMean
+
+np = pytest.importorskip("numpy")
+
+from timequota import analysis  # noqa: E402
+
+
+def test_load_steps(tmp_path):
+    clock = [0.0]
+    tq = TimeQuota(100, name="analysis", timer_fn=lambda: clock[0], verbose=False)
+    for step in (1.0, 2.0, 3.0):
+        clock[0] += step
+        tq.track()
+
+    # live histories are copied, the quota keeps tracking while the steps are held
+    steps = analysis.load_steps(tq)
+    assert steps.tolist() == [1.0, 2.0, 3.0]
+    clock[0] += 4.0
+    tq.track()
+    assert steps.tolist() == [1.0, 2.0, 3.0]
+    assert analysis.load_steps(tq).tolist() == [1.0, 2.0, 3.0, 4.0]
+
+    # ring buffers are read oldest first
+    tq = FastTimeQuota(
+        100, step_aggr_fn=RunningMean(), history_size=2, timer_fn=lambda: clock[0]
+    )
+    for step in (1.0, 2.0, 3.0):
+        tq.time_steps.append(step)
+    assert analysis.load_steps(tq).tolist() == [2.0, 3.0]
+
+    # checkpoints and sequences
+    path = str(tmp_path / "quota.json")
+    tq.save(path)
+    assert analysis.load_steps(path).tolist() == [2.0, 3.0]
+    assert analysis.load_steps([1, 2]).dtype == np.float64
+
+
+def test_statistics():
+    steps = np.concatenate((np.full(1000, 0.01), np.full(1000, 0.03)))
+
+    assert analysis.percentiles(steps, (0, 50, 100)) == {0: 0.01, 50: 0.02, 100: 0.03}
+
+    counts, edges = analysis.histogram(steps, bins=2)
+    assert counts.tolist() == [1000, 1000]
+    counts, edges = analysis.histogram(steps, bins=4, log=True)
+    assert counts.sum() == 2000
+
+    assert analysis.change_points(steps, window=100) == [1000]
+    assert analysis.change_points(steps[::-1], window=100) == []
+
+    throughput = analysis.rolling_throughput(steps, window=100)
+    assert len(throughput) == 1901
+    assert throughput[0] == pytest.approx(100)
+    assert throughput[-1] == pytest.approx(100 / 3)
+
+    table = analysis.summary(steps, name="run")
+    assert "run" in table
+    assert "P95" in table
+    assert "Slowdowns" in table
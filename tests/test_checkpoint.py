@@ -0,0 +1,139 @@
+import os
+import json
+
+import pytest
+
+from timequota import (
+    TimeQuota,
+    FastTimeQuota,
+    EWMA,
+    Welford,
+    P2Quantile,
+    LinearTrendPredictor,
+    QuantilePredictor,
+)
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "quota.json")
+    clock = [0.0]
+    tq = TimeQuota(
+        1,
+        "m",
+        name="checkpoint",
+        step_aggr_fn=Welford(k=1),
+        predictor=LinearTrendPredictor(),
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+    for step in range(1, 11):
+        clock[0] += step
+        tq.track()
+    tq.save(path, history_size=5)
+
+    # resumed quota keeps the budget and warm step statistics
+    clock[0] = 100.0
+    resumed = TimeQuota.load(
+        path,
+        include_downtime=False,
+        step_aggr_fn=Welford(k=1),
+        predictor=LinearTrendPredictor(),
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+    assert resumed.name == "checkpoint"
+    assert resumed.quota == 60
+    assert resumed.unit == "m"
+    assert resumed.time_elapsed == 55
+    assert resumed.time_remaining == 5
+    assert resumed.time_steps == [6, 7, 8, 9, 10]
+    assert resumed.steps_done == 10
+    assert resumed.time_per_step == tq.time_per_step
+    assert resumed.step_aggr_fn.stdev == tq.step_aggr_fn.stdev
+    assert resumed.predictor.slope == 1
+    assert resumed.predicted_overflow == True
+
+    clock[0] += 11
+    resumed.track()
+    assert resumed.overflow == True
+    assert resumed.step_aggr_fn.count == 11
+
+    # downtime charged against the quota by default
+    resumed = FastTimeQuota.load(path, verbose=False)
+    assert isinstance(resumed, FastTimeQuota)
+    assert 55 <= resumed.time_elapsed < 56
+
+    with open(path, "w") as f:
+        json.dump({"version": 0}, f)
+    with pytest.raises(ValueError):
+        TimeQuota.load(path)
+
+
+def test_load_options(tmp_path):
+    path = str(tmp_path / "quota.json")
+    clock = [0.0]
+    tq = TimeQuota(
+        10,
+        step_aggr_fn=EWMA(0.1),
+        predictor=QuantilePredictor(0.5),
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+    for step in [1, 2, 3]:
+        clock[0] += step
+        tq.track()
+    tq.save(path)
+
+    # only the running statistics are restored, the options are the caller's
+    resumed = TimeQuota.load(
+        path, step_aggr_fn=EWMA(0.9), predictor=QuantilePredictor(0.5), verbose=False
+    )
+    assert resumed.step_aggr_fn.alpha == 0.9
+    assert resumed.step_aggr_fn.count == 3
+    assert resumed.step_aggr_fn.mean == tq.step_aggr_fn.mean
+    assert resumed.predictor.q == 0.5
+
+    # quantile markers are only valid for their quantile
+    with pytest.raises(ValueError):
+        TimeQuota.load(path, predictor=QuantilePredictor(0.9), verbose=False)
+
+    state = Welford(k=1).get_state()
+    assert "k" not in state
+    agg = Welford(k=2)
+    agg.set_state(state)
+    assert agg.k == 2
+    assert "q" in P2Quantile(0.5).get_state()
+
+
+def test_auto_checkpoint(tmp_path):
+    path = str(tmp_path / "quota.json")
+    clock = [0.0]
+    tq = TimeQuota(
+        10,
+        name="auto-checkpoint",
+        checkpoint_path=path,
+        checkpoint_every=3,
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+
+    for _ in tq.range(5):
+        clock[0] += 0.5
+    assert TimeQuota.load(path).steps_done == 3
+
+    # the checkpoint is saved after the step, its time is charged to the next one
+    save = tq.save
+
+    def slow_save(*args, **kwargs):
+        clock[0] += 0.25
+        save(*args, **kwargs)
+
+    tq.save = slow_save
+    tq.track(steps=2)
+    assert TimeQuota.load(path).steps_done == 7
+    assert tq.time_elapsed == 2.5
+    clock[0] += 0.5
+    tq.track()
+    assert tq.time_this_step == 0.75
+    assert tq.time_elapsed == 3.25
+    assert os.listdir(str(tmp_path)) == ["quota.json"]
@@ -0,0 +1,142 @@
+import time
+import queue
+import socket
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from timequota import TimeQuota, QuotaExceeded
+from timequota.context import get_timeout, settimeout, queue_get, wait, propagate
+
+
+def test_current_quota():
+    clock = [0.0]
+    tq = TimeQuota(10, timer_fn=lambda: clock[0], verbose=False)
+    sub = TimeQuota(2, timer_fn=lambda: clock[0], verbose=False)
+
+    assert TimeQuota.current() is None
+    assert get_timeout() is None
+    assert get_timeout(5) == 5
+
+    with tq.activate() as active:
+        assert active is tq
+        assert TimeQuota.current() is tq
+
+        clock[0] += 4
+        assert get_timeout() == 6
+        assert get_timeout(1) == 1
+
+        with sub.activate():
+            assert TimeQuota.current() is sub
+            assert get_timeout() == 0
+        assert TimeQuota.current() is tq
+
+    assert TimeQuota.current() is None
+
+    # lite quotas can be activated alike
+    with TimeQuota.template(1).acquire() as lite, lite.activate():
+        assert TimeQuota.current() is lite
+        assert 0 < get_timeout() <= 1
+
+
+def test_current_quota_threads_and_tasks():
+    tq = TimeQuota(10, verbose=False)
+    seen = {}
+
+    def worker(key):
+        seen[key] = TimeQuota.current()
+
+    async def main():
+        await asyncio.gather(*(asyncio.create_task(run(i)) for i in range(3)))
+
+    async def run(i):
+        await asyncio.sleep(0)
+        worker(f"task {i}")
+
+    with tq.activate():
+        thread = threading.Thread(target=worker, args=("thread",))
+        thread.start()
+        thread.join()
+
+        thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(worker, "copied")
+        )
+        thread.start()
+        thread.join()
+
+        threads = [
+            threading.Thread(target=propagate(worker), args=(f"propagated {i}",))
+            for i in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        asyncio.run(main())
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(
+                tq.map(lambda _: TimeQuota.current(), range(4), executor=pool)
+            )
+
+    # new threads start with an empty context
+    assert seen["thread"] is None
+    assert seen["copied"] is tq
+    assert seen["propagated 0"] is tq and seen["propagated 1"] is tq
+    assert all(seen[f"task {i}"] is tq for i in range(3))
+    assert all(result is tq for result in results)
+
+
+def test_timeout_helpers():
+    with TimeQuota(0.1, verbose=False).activate():
+        q = queue.Queue()
+        q.put(1)
+        assert queue_get(q) == 1
+
+        start = time.perf_counter()
+        with pytest.raises(queue.Empty):
+            queue_get(q)
+        assert time.perf_counter() - start < 0.5
+
+    with TimeQuota(0.1, verbose=False).activate():
+        with ThreadPoolExecutor(1) as pool:
+            future = pool.submit(time.sleep, 0.5)
+            done, not_done = wait([future])
+            assert not done and not_done == {future}
+
+    tq = TimeQuota(0.1, verbose=False)
+    a, b = socket.socketpair()
+    with a, b:
+        assert 0 < settimeout(a, tq=tq) <= 0.1
+        with pytest.raises(socket.timeout):
+            a.recv(1)
+
+        # a zero timeout would make the socket non-blocking
+        assert get_timeout(tq=tq) == 0
+        with pytest.raises(QuotaExceeded):
+            settimeout(a, tq=tq)
+
+
+def test_timeout_helpers_unbounded():
+    tq = TimeQuota(float("inf"), verbose=False)
+
+    with tq.activate():
+        assert get_timeout() is None
+        assert get_timeout(5) == 5
+
+        q = queue.Queue()
+        q.put(1)
+        assert queue_get(q) == 1
+        with pytest.raises(queue.Empty):
+            queue_get(q, 0.01)
+
+        a, b = socket.socketpair()
+        with a, b:
+            assert settimeout(a) is None
+            assert a.gettimeout() is None
+            assert settimeout(a, 0.5) == 0.5
+            assert a.gettimeout() == 0.5
@@ -0,0 +1,111 @@
+import time
+import multiprocessing
+
+import pytest
+
+from timequota import DistributedTimeQuota, SharedMemoryStore, FileStore
+
+
+def worker(store, results):
+    tq = DistributedTimeQuota(100, store=store, verbose=False)
+    steps = 0
+    while True:
+        time.sleep(0.05)
+        steps += 1
+        if tq.track():
+            break
+    results.put((steps, tq.quota, tq.overflow, tq.predicted_overflow))
+
+
+def run_workers(store, n=4):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(store, results)) for _ in range(n)
+    ]
+    for process in processes:
+        process.start()
+    outputs = [results.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join()
+    return outputs
+
+
+@pytest.mark.parametrize("store_type", ["shared_memory", "file"])
+def test_distributed(store_type, tmp_path):
+    if store_type == "shared_memory":
+        store = SharedMemoryStore()
+    else:
+        store = FileStore(str(tmp_path / "quota.bin"))
+
+    # first quota starts the shared budget
+    tq = DistributedTimeQuota(0.5, store=store, verbose=False)
+    assert tq.quota == 0.5
+    assert 0.49 < tq.time_remaining <= 0.5
+
+    # workers join the budget, regardless of their own quota
+    start = time.perf_counter()
+    outputs = run_workers(store)
+    assert time.perf_counter() - start < 1.5
+
+    for steps, quota, overflow, predicted_overflow in outputs:
+        assert quota == 0.5
+        assert steps < 10
+        assert overflow or predicted_overflow
+
+    # step statistics of all workers are shared
+    tq.update()
+    assert tq.time_remaining < tq.time_per_step
+    assert tq.shared_steps == sum(output[0] for output in outputs)
+    assert 0.04 < tq.time_per_step < 0.1
+
+    # cleared store starts a new budget
+    store.clear()
+    tq = DistributedTimeQuota(2, store=store, verbose=False)
+    tq.track()
+    assert tq.time_exceeded == False
+    assert tq.shared_steps == 1
+
+    store.close()
+
+
+def test_shared_memory_store_attach():
+    store = SharedMemoryStore()
+    with pytest.raises(ValueError):
+        SharedMemoryStore(store.name)
+
+    attached = SharedMemoryStore(store.name, store._lock)
+    tq = DistributedTimeQuota(3, store=store, verbose=False)
+    assert attached.read()[1] == 3
+
+    attached.close()
+
+    # the time per step is the shared running mean
+    with pytest.raises(ValueError):
+        DistributedTimeQuota(3, store=store, step_aggr_fn=max)
+    store.close()
+
+
+def hold_lock(store, locked):
+    with store.lock():
+        locked.set()
+        time.sleep(0.3)
+
+
+def test_file_store_fork(tmp_path):
+    store = FileStore(str(tmp_path / "quota.bin"))
+    with store.lock():
+        pass
+
+    # forked processes inherit the open file, the lock must still exclude them
+    context = multiprocessing.get_context("fork")
+    locked = context.Event()
+    process = context.Process(target=hold_lock, args=(store, locked))
+    process.start()
+    assert locked.wait(10)
+
+    start = time.perf_counter()
+    with store.lock():
+        assert time.perf_counter() - start > 0.1
+    process.join()
+    store.close()
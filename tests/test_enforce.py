@@ -0,0 +1,169 @@
+import time
+import signal
+import threading
+
+import pytest
+
+from timequota import TimeQuota, QuotaExceeded
+
+
+def test_enforce():
+    tq = TimeQuota(0.2, "s", name="enforce", verbose=False)
+
+    # time not exhausted
+    with tq.enforce():
+        time.sleep(0.05)
+    assert tq.time_exceeded == False
+
+    # main thread step interrupted by the signal timer
+    tq.reset()
+    start = time.perf_counter()
+    with pytest.raises(QuotaExceeded):
+        with tq.enforce():
+            time.sleep(5)
+    assert time.perf_counter() - start < 0.5
+    assert tq.overflow == True
+
+    # time pre-exhausted
+    with pytest.raises(QuotaExceeded):
+        with tq.enforce():
+            pass
+
+    # decorator, with time exceeded function instead of raising
+    tq.reset()
+    exceeded = []
+
+    @tq.enforce(time_exceeded_fn=lambda: exceeded.append(True))
+    def work():
+        time.sleep(0.3)
+        return "done"
+
+    assert work() == "done"
+    assert exceeded == [True]
+
+
+def test_enforce_thread():
+    tq = TimeQuota(0.2, "s", name="enforce-thread", verbose=False)
+    results = []
+
+    def work(**kwargs):
+        try:
+            with tq.enforce(**kwargs):
+                # pure python steps are interrupted between bytecodes
+                end = time.perf_counter() + 5
+                while time.perf_counter() < end:
+                    pass
+        except QuotaExceeded as e:
+            assert str(e) == "enforce-thread time quota exceeded"
+            results.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join(5)
+    assert len(results) == 1
+    assert 0.15 < results[0] < 0.5
+
+    # predicted exhaustion leaves a time step
+    tq.reset()
+    tq.time_per_step = 0.1
+    start = time.perf_counter()
+    thread = threading.Thread(target=work, kwargs={"predicted": True})
+    thread.start()
+    thread.join(5)
+    assert len(results) == 2
+    assert 0.05 < results[1] < 0.18
+
+
+def test_enforce_steps():
+    clock = [0.0]
+    tq = TimeQuota(10, name="enforce-steps", timer_fn=lambda: clock[0], verbose=False)
+
+    # enforced code within a step is charged without ending the step
+    for _ in tq.iter(range(4), verbose=False):
+        with tq.enforce():
+            clock[0] += 1
+    assert list(tq.time_steps) == [1.0] * 4
+    assert tq.time_elapsed == 4
+
+
+def test_enforce_signal_ignored():
+    tq = TimeQuota(0.3, "s", name="enforce-ignored", verbose=False)
+
+    # an ignored enclosing timer due first leaves the enforcer armed, and the ignore action is restored
+    previous = signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        start = time.perf_counter()
+        with pytest.raises(QuotaExceeded):
+            with tq.enforce():
+                time.sleep(2)
+        assert 0.2 < time.perf_counter() - start < 0.6
+        assert signal.getsignal(signal.SIGALRM) == signal.SIG_IGN
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def test_enforce_nested():
+    outer = TimeQuota(0.3, "s", name="outer", verbose=False)
+    inner = TimeQuota(10, "s", name="inner", verbose=False)
+
+    # leaving the inner enforcer keeps the outer one armed
+    start = time.perf_counter()
+    with pytest.raises(QuotaExceeded, match="outer"):
+        with outer.enforce():
+            with inner.enforce():
+                time.sleep(0.05)
+            time.sleep(2)
+    assert time.perf_counter() - start < 0.6
+
+    # the outer enforcer interrupts an inner one with a longer budget
+    outer.reset()
+    inner.reset()
+    start = time.perf_counter()
+    with pytest.raises(QuotaExceeded, match="outer"):
+        with outer.enforce():
+            with inner.enforce():
+                time.sleep(2)
+    assert time.perf_counter() - start < 0.6
+
+    # the inner enforcer with a shorter budget fires first, the outer one still later
+    outer = TimeQuota(0.5, "s", name="outer", verbose=False)
+    inner = TimeQuota(0.1, "s", name="inner", verbose=False)
+    start = time.perf_counter()
+    with pytest.raises(QuotaExceeded, match="outer"):
+        with outer.enforce():
+            with pytest.raises(QuotaExceeded, match="inner"):
+                with inner.enforce():
+                    time.sleep(2)
+            assert time.perf_counter() - start < 0.3
+            time.sleep(2)
+    assert time.perf_counter() - start < 0.8
+
+
+def test_enforce_decorator_threads():
+    tq = TimeQuota(0.3, "s", name="enforce-decorator", verbose=False)
+    results = []
+
+    @tq.enforce()
+    def work():
+        end = time.perf_counter() + 2
+        while time.perf_counter() < end:
+            pass
+
+    def run():
+        start = time.perf_counter()
+        try:
+            work()
+        except QuotaExceeded:
+            pass
+        results.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(results) == 2
+    assert all(result < 0.8 for result in results)
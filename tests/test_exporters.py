@@ -0,0 +1,96 @@
+import json
+import socket
+
+from timequota import (
+    TimeQuota,
+    QuotaSnapshot,
+    OpenMetricsExporter,
+    StatsdExporter,
+    JsonLinesExporter,
+)
+from timequota.exporters import read_json_lines
+
+
+def make_quota(name="export"):
+    clock = [0.0]
+    tq = TimeQuota(2, name=name, timer_fn=lambda: clock[0], verbose=False)
+    clock[0] += 0.5
+    tq.track()
+    return tq
+
+
+def test_snapshot():
+    snapshot = make_quota().snapshot()
+    assert isinstance(snapshot, QuotaSnapshot)
+    assert snapshot.name == "export"
+    assert snapshot.quota == 2
+    assert snapshot.time_elapsed == 0.5
+    assert snapshot.time_remaining == 1.5
+    assert snapshot.time_per_step == 0.5
+    assert snapshot.steps_done == 1
+    assert snapshot.overflow == False
+    assert snapshot._asdict()["time_exceeded"] == False
+
+
+def test_openmetrics():
+    exporter = OpenMetricsExporter()
+    exporter(make_quota().snapshot())
+    exporter(TimeQuota(float("inf"), name='inf"', verbose=False).snapshot())
+
+    text = exporter.render()
+    lines = text.splitlines()
+    assert "# TYPE timequota_remaining_seconds gauge" in lines
+    assert 'timequota_remaining_seconds{name="export"} 1.5' in lines
+    assert 'timequota_quota_seconds{name="inf\\""} +Inf' in lines
+    assert 'timequota_steps_total{name="export"} 1.0' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_statsd():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+
+    with StatsdExporter(port=server.getsockname()[1], prefix="app") as exporter:
+        exporter(make_quota().snapshot())
+
+    lines = server.recv(65536).decode().splitlines()
+    assert "app.export.time_remaining:1.5|g" in lines
+    assert "app.export.overflow:0.0|g" in lines
+    server.close()
+
+
+def test_statsd_format():
+    clock = [0.0]
+    tq = TimeQuota(1, name="a:b|c\nd", timer_fn=lambda: clock[0], verbose=False)
+    clock[0] += 1.5
+    tq.update()
+
+    exporter = StatsdExporter()
+    lines = exporter.format(tq.snapshot()).decode().splitlines()
+    exporter.close()
+
+    assert all(line.startswith("timequota.a_b_c_d.") for line in lines)
+    # negative gauges are set after a reset to 0, not read as a decrement
+    index = lines.index("timequota.a_b_c_d.time_remaining:-0.5|g")
+    assert lines[index - 1] == "timequota.a_b_c_d.time_remaining:0|g"
+
+
+def test_json_lines(tmp_path):
+    path = str(tmp_path / "quota.jsonl")
+    with JsonLinesExporter(path) as exporter:
+        exporter(make_quota("a").snapshot())
+        exporter(make_quota("b").snapshot())
+        exporter(TimeQuota(float("inf"), name="inf", verbose=False).snapshot())
+
+    with open(path) as f:
+        lines = f.readlines()
+    assert json.loads(lines[0])["name"] == "a"
+    # infinite times are written as null, as strict JSON
+    assert "Infinity" not in lines[2]
+    assert json.loads(lines[2])["quota"] == None
+
+    snapshots = read_json_lines(path, name="b")
+    assert len(snapshots) == 1
+    assert snapshots[0].time_remaining == 1.5
+    assert read_json_lines(path, name="inf")[0].time_remaining == float("inf")
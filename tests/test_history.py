@@ -0,0 +1,96 @@
+import statistics
+
+import pytest
+
+from timequota import TimeQuota, StepHistory, RunningMean
+
+
+def test_step_history():
+    # unbounded
+    history = StepHistory()
+    for step in range(5):
+        history.append(step)
+    assert history == [0, 1, 2, 3, 4]
+    assert history[-1] == 4
+    assert history[1:3] == [1, 2]
+    assert statistics.mean(history) == 2
+
+    # buffer is reused after clear
+    nbytes = history.nbytes
+    history.clear()
+    assert history == []
+    history.append(7)
+    assert history == [7]
+    assert history.nbytes == nbytes
+
+    # ring buffer
+    history = StepHistory(3)
+    for step in range(5):
+        history.append(step)
+    assert history == [2, 3, 4]
+    assert history[0] == 2
+    assert history[-1] == 4
+    assert len(history) == 3
+    assert history.nbytes == 3 * 8
+
+    with pytest.raises(IndexError):
+        history[3]
+
+    # none
+    history = StepHistory(0)
+    history.append(1)
+    assert history == []
+
+    with pytest.raises(ValueError):
+        StepHistory(-1)
+
+
+def test_quota_history_size():
+    timer_value = [0.0]
+
+    def timer_fn():
+        return timer_value[0]
+
+    tq = TimeQuota(100, history_size=2, timer_fn=timer_fn, verbose=False)
+    for step in [1, 2, 3]:
+        timer_value[0] += step
+        tq.track()
+
+    assert tq.time_steps == [2, 3]
+    assert tq.time_per_step == 2
+
+    # plain callables aggregate the kept steps, given as a list
+    aggregated = []
+
+    def step_aggr_fn(steps):
+        aggregated.append(steps)
+        return max(steps)
+
+    tq = TimeQuota(
+        100, step_aggr_fn=step_aggr_fn, history_size=2, timer_fn=timer_fn, verbose=False
+    )
+    for step in [3, 2, 1]:
+        timer_value[0] += step
+        tq.track()
+    assert aggregated[-1] == [2, 1]
+    assert type(aggregated[-1]) is list
+    assert tq.time_per_step == 2
+
+    buffer = tq.time_steps._buffer
+    tq.reset()
+    assert tq.time_steps == []
+    assert tq.time_steps._buffer is buffer
+
+    # aggregates only
+    tq = TimeQuota(100, history_size=0, timer_fn=timer_fn, verbose=False)
+    for step in [1, 2, 3]:
+        timer_value[0] += step
+        tq.track()
+    assert tq.time_steps == []
+    assert tq.time_per_step == 2
+
+    with pytest.raises(ValueError):
+        TimeQuota(100, step_aggr_fn=max, history_size=0)
+
+    tq = TimeQuota(100, step_aggr_fn=RunningMean(), history_size=0)
+    assert "history_size=0" in repr(tq)
@@ -0,0 +1,71 @@
+import sys
+import subprocess
+
+# cumulative import time budget of `from timequota import TimeQuota`, in microseconds
+IMPORT_TIME_BUDGET = 50_000
+
+LAZY_MODULES = ["tabulate", "colorama", "typeguard", "asyncio", "sqlite3", "socket"]
+
+
+def run_python(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def get_import_times(code):
+    # parses the `-X importtime` report, of lines "import time: self [us] | cumulative | imported package"
+    import_times = {}
+    for line in run_python(code, "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def get_imported_modules(code):
+    modules = run_python(f"import sys\n{code}\nprint(' '.join(sys.modules))").stdout
+    return set(modules.split())
+
+
+def test_import_time():
+    code = "from timequota import TimeQuota"
+
+    # best of a few runs, the first one may compile the bytecode
+    import_time = min(get_import_times(code)["timequota"] for _ in range(3))
+    assert import_time < IMPORT_TIME_BUDGET
+
+    modules = get_imported_modules(code)
+    for module in LAZY_MODULES + ["timequota.aio", "timequota.trace"]:
+        assert module not in modules
+
+
+def test_lazy_imports():
+    # typeguard (which imports asyncio) is imported by the first quota created, to type check the quota methods
+    modules = get_imported_modules(
+        "from timequota import TimeQuota\n"
+        "tq = TimeQuota(1, verbose=False)\n"
+        "tq.update(verbose=False)\n"
+        "tq.track(verbose=False)"
+    )
+    assert "typeguard" in modules
+    for module in ["tabulate", "colorama", "sqlite3", "statistics"]:
+        assert module not in modules
+    for module in ["aio", "trace", "priors", "exporters", "enforce", "context"]:
+        assert f"timequota.{module}" not in modules
+
+    modules = get_imported_modules("from timequota import TimeQuota\nstr(TimeQuota(1))")
+    assert "tabulate" in modules
+    assert "colorama" in modules
+
+
+def test_lazy_exports():
+    import timequota
+
+    assert set(timequota.__all__) <= set(dir(timequota))
+    for name in timequota.__all__:
+        assert getattr(timequota, name).__name__ == name
@@ -0,0 +1,72 @@
+import pytest
+
+from timequota import TimeQuota, LiteTimeQuota, QuotaTemplate
+
+
+def test_lite_quota():
+    clock = [0.0]
+    template = TimeQuota.template(1, "m", name="request", timer_fn=lambda: clock[0])
+    assert isinstance(template, QuotaTemplate)
+    assert template.quota == 60
+
+    tq = template.acquire()
+    assert isinstance(tq, LiteTimeQuota)
+    assert not hasattr(tq, "__dict__")
+    assert tq.name == "request"
+    assert tq.time_remaining == 60
+
+    for _ in range(3):
+        clock[0] += 10
+        assert tq.track() == False
+    assert tq.steps_done == 3
+    assert tq.time_per_step == 10
+    assert tq.time_elapsed == 30
+    assert tq.time_remaining == 30
+
+    clock[0] += 5
+    assert tq._get_time_remaining_now() == 25
+    assert tq.update() == False
+    assert tq.time_remaining == 25
+
+    # amortized steps are predicted to overflow
+    clock[0] += 20
+    assert tq.track(steps=2) == True
+    assert tq.predicted_overflow == True
+    assert tq.overflow == False
+    assert tq.time_this_step == 10
+    assert tq.steps_done == 5
+
+    clock[0] += 10
+    assert tq.update() == True
+    assert tq.overflow == True
+
+
+def test_lite_pool():
+    clock = [0.0]
+    template = QuotaTemplate(1, timer_fn=lambda: clock[0], pool_size=1)
+
+    with template.acquire() as tq:
+        clock[0] += 2
+        assert tq.update() == True
+    assert len(template) == 1
+
+    # released quotas are reused, restarted
+    clock[0] += 5
+    reused = template.acquire()
+    assert reused is tq
+    assert len(template) == 0
+    assert reused.time_remaining == 1
+    assert reused.time_exceeded == False
+    assert reused.update() == False
+
+    # the pool is bounded
+    other = template.acquire()
+    assert other is not tq
+    reused.release()
+    other.release()
+    assert len(template) == 1
+
+    with pytest.raises(ValueError):
+        other.release()
+    with pytest.raises(ValueError):
+        QuotaTemplate(1, "d")
@@ -0,0 +1,84 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from timequota import TimeQuota, TraceReader
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_map():
+    tq = TimeQuota(2, "s", name="map", verbose=False)
+
+    # function
+    assert sorted(tq.map(math.sqrt, [1, 4, 9], workers=2)) == [1, 2, 3]
+    assert sorted(tq.map(math.sqrt, [1, 4, 9], executor="process", workers=2)) == [
+        1,
+        2,
+        3,
+    ]
+
+    with ThreadPoolExecutor(2) as executor:
+        assert sorted(tq.map(math.sqrt, [1, 4], executor=executor)) == [1, 2]
+
+    with pytest.raises((TypeError, ValueError)):
+        list(tq.map(math.sqrt, [1], executor="gpu"))
+
+    # time not exhausted, tasks run in parallel
+    tq.reset()
+    start = time.perf_counter()
+    assert list(tq.map(sleep, [0.2] * 8, workers=4)) == [0.2] * 8
+    assert time.perf_counter() - start < 0.8
+    assert len(tq.time_steps) == 8
+    assert 0.15 < tq.time_per_step < 0.25
+    assert tq.time_exceeded == False
+
+    # time predicted exhausted, submission stops
+    tq.reset()
+    exceeded = []
+    results = list(
+        tq.map(
+            sleep,
+            [0.5] * 100,
+            workers=4,
+            time_exceeded_fn=lambda: exceeded.append(True),
+        )
+    )
+    assert 8 <= len(results) < 16
+    assert tq.overflow == False
+    assert tq.predicted_overflow == True
+    assert exceeded == [True]
+
+    # time exhausted, pending tasks are cancelled
+    tq.reset()
+    start = time.perf_counter()
+    results = list(tq.map(sleep, [0.3, 3, 3, 3, 3], workers=2))
+    assert time.perf_counter() - start < 2.5
+    assert results == [0.3]
+    assert tq.overflow == True
+
+
+def test_map_clock(tmp_path):
+    path = str(tmp_path / "map.trace")
+    clock = [0.0]
+    tq = TimeQuota(
+        100, name="map-clock", timer_fn=lambda: clock[0], trace=path, verbose=False
+    )
+
+    def work(seconds):
+        clock[0] += seconds
+        return seconds
+
+    # tasks are timed on the quota clock and traced as steps
+    assert list(tq.map(work, [1, 2], workers=1)) == [1, 2]
+    assert tq.time_steps == [1, 2]
+    assert tq.time_per_step == 1.5
+
+    with TraceReader(path) as reader:
+        assert [record.duration for record in reader] == [1, 2]
+    tq.close()
@@ -0,0 +1,75 @@
+import pytest
+
+from timequota import (
+    TimeQuota,
+    LinearTrendPredictor,
+    QuantilePredictor,
+    SafetyMarginPredictor,
+)
+
+
+def run(quota, steps, **kwargs):
+    clock = [0.0]
+    tq = TimeQuota(quota, timer_fn=lambda: clock[0], verbose=False, **kwargs)
+    steps = iter(steps)
+    for _ in tq.iter(range(10000)):
+        clock[0] += next(steps)
+    return tq
+
+
+def test_linear_trend_predictor():
+    predictor = LinearTrendPredictor()
+    assert predictor.estimate(0.5) == 0.5
+
+    for step in [1, 2, 3, 4]:
+        predictor.update(step)
+    assert predictor.slope == pytest.approx(1)
+    assert predictor.estimate(2.5) == pytest.approx(5)
+    assert predictor.estimate(2.5, steps=2) == pytest.approx(5 + 6)
+    assert predictor.predict(10, 2.5, steps=2) == True
+    assert predictor.predict(11, 2.5, steps=2) == False
+
+    # steps getting slower overrun with the mean, not with the trend
+    steps = [0.01 + 0.001 * i for i in range(10000)]
+    tq = run(12, steps)
+    assert tq.overflow == True
+
+    tq = run(12, steps, predictor=LinearTrendPredictor())
+    assert tq.overflow == False
+    assert tq.predicted_overflow == True
+    assert tq.time_remaining < 0.2
+
+
+def test_quantile_predictor():
+    predictor = QuantilePredictor(0.9)
+    for step in range(1, 101):
+        predictor.update(step)
+    assert predictor.estimate(50.5) == pytest.approx(90, rel=0.05)
+    assert predictor.predict(80, 50.5) == True
+
+    # heavy tails, one slow step every ten
+    steps = [1.0 if i % 10 == 9 else 0.1 for i in range(10000)]
+    tq = run(10, steps, predictor=QuantilePredictor(0.95))
+    assert tq.overflow == False
+    assert tq.time_remaining >= 0
+
+    predictor.reset()
+    assert predictor.estimate(1) == 0
+
+
+def test_safety_margin_predictor():
+    predictor = SafetyMarginPredictor(margin=0.5, factor=2)
+    assert predictor.estimate(1, steps=2) == 4.5
+    assert predictor.predict(4, 1, steps=2) == True
+
+    predictor = SafetyMarginPredictor(QuantilePredictor(0.5), margin=1)
+    for step in [1, 2, 3]:
+        predictor.update(step)
+    assert predictor.estimate(0) == 3
+
+    with pytest.raises(ValueError):
+        SafetyMarginPredictor(factor=0)
+
+    tq = run(10, [1] * 20, predictor=SafetyMarginPredictor(margin=2))
+    assert tq.time_elapsed == 8
+    assert "SafetyMarginPredictor(None, margin=2, factor=1.0)" in repr(tq)
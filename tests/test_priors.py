@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from timequota import (
+    TimeQuota,
+    StepPrior,
+    StepPriorCache,
+    RunningMean,
+    Welford,
+    EWMA,
+    QuantilePredictor,
+)
+
+
+def run(cache, steps, name="priors"):
+    clock = [0.0]
+    tq = TimeQuota(
+        100, name=name, prior_cache=cache, timer_fn=lambda: clock[0], verbose=False
+    )
+    time_per_step = tq.time_per_step
+    for step in tq.iter(steps):
+        clock[0] += step
+    return tq, time_per_step
+
+
+def test_prior_cache(tmp_path):
+    path = str(tmp_path / "priors.db")
+    cache = StepPriorCache(path)
+
+    # cold start
+    tq, time_per_step = run(cache, [1.0, 2.0, 3.0])
+    assert time_per_step == 0
+    assert tq.prior == None
+
+    # seeded from the previous run
+    tq, time_per_step = run(StepPriorCache(path), [5.0])
+    assert time_per_step == 2.0
+    assert tq.prior.n_steps == 3
+    assert tq.prior.stdev == 1.0
+
+    # runs are merged
+    prior = cache.get("priors")
+    assert prior.n_steps == 4
+    assert prior.mean == 2.75
+    assert TimeQuota(11, name="priors", prior_cache=cache).steps_fit == 4
+
+    # reset saves the tracked steps
+    tq.track()
+    tq.reset()
+    assert cache.get("priors").n_steps == 5
+
+    cache.delete("priors")
+    assert cache.get("priors") == None
+
+
+def test_prior_cache_eviction():
+    # least recently used names are evicted
+    cache = StepPriorCache(":memory:", max_entries=2)
+    cache.update("a", StepPrior(1, 1.0, 0.0))
+    cache.update("b", StepPrior(1, 1.0, 0.0))
+    time.sleep(0.01)
+    cache.get("a")
+    cache.update("c", StepPrior(1, 1.0, 0.0))
+    assert len(cache) == 2
+    assert cache.get("a") != None
+    assert cache.get("b") == None
+
+    # expired entries are removed
+    cache = StepPriorCache(":memory:", ttl=0.05)
+    cache.update("a", StepPrior(1, 1.0, 0.0))
+    assert cache.get("a") != None
+    time.sleep(0.1)
+    assert cache.get("a") == None
+
+    # cached statistics are downweighted beyond max_count
+    cache = StepPriorCache(":memory:", max_count=10)
+    cache.update("a", StepPrior(100, 1.0, 0.0))
+    cache.update("a", StepPrior(5, 2.0, 0.0))
+    prior = cache.get("a")
+    assert prior.n_steps == 10
+    assert prior.mean == 1.5
+
+
+def test_prior_seeding():
+    cache = StepPriorCache(":memory:")
+    cache.update("seeded", StepPrior(1000, 4.0, 999.0))
+
+    # a strong prior is not replaced by the first step of the run
+    for step_aggr_fn in [None, RunningMean(), Welford(), EWMA(0.1)]:
+        clock = [0.0]
+        tq = TimeQuota(
+            100,
+            name="seeded",
+            step_aggr_fn=step_aggr_fn,
+            prior_cache=cache,
+            timer_fn=lambda: clock[0],
+            verbose=False,
+        )
+        assert tq.time_per_step == 4.0
+
+        clock[0] += 0.5
+        tq.track()
+        assert tq.time_per_step > 3.6
+
+    # the prior weighs as prior_weight steps, the steps of the run soon outweigh it
+    assert cache.get("seeded").stdev == 1.0
+    for prior_weight, time_per_step in [(10, 2.25), (None, 4005 / 1010)]:
+        clock = [0.0]
+        tq = TimeQuota(
+            100,
+            name="seeded",
+            prior_cache=StepPriorCache(":memory:", prior_weight=prior_weight),
+            timer_fn=lambda: clock[0],
+            verbose=False,
+        )
+        tq.prior_cache.update("seeded", StepPrior(1000, 4.0, 999.0))
+        tq.reset()
+        for _ in range(10):
+            clock[0] += 0.5
+            tq.track()
+        assert tq.time_per_step == pytest.approx(time_per_step)
+
+    # the predictor is seeded, overflow is predicted before the first item
+    clock = [0.0]
+    tq = TimeQuota(
+        3,
+        name="seeded",
+        predictor=QuantilePredictor(0.5),
+        prior_cache=cache,
+        timer_fn=lambda: clock[0],
+        verbose=False,
+    )
+    assert tq.predictor.estimate(tq.time_per_step) == pytest.approx(4.0, rel=0.05)
+    assert tq.predicted_overflow == True
+    assert list(tq.iter(range(3))) == []
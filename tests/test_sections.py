@@ -0,0 +1,84 @@
+import pytest
+
+from timequota import TimeQuota, QuotaExceeded
+
+
+def test_section():
+    clock = [0.0]
+    tq = TimeQuota(10, name="section", timer_fn=lambda: clock[0], verbose=False)
+
+    # time taken is charged against the quota
+    with tq.section("load"):
+        clock[0] += 1
+    for step in (0.5, 1.5):
+        with tq.section("train"):
+            clock[0] += step
+    assert tq.time_elapsed == 3
+    assert tq.time_remaining == 7
+
+    # per section statistics
+    assert list(tq.sections) == ["load", "train"]
+    train = tq.sections["train"]
+    assert train.count == 2
+    assert train.total == 2
+    assert train.mean == 1
+    assert train.max == 1.5
+    assert "train" in str(tq)
+
+    # nested sections and decorators
+    @tq.section("inner")
+    def inner():
+        clock[0] += 0.25
+
+    with tq.section("outer"):
+        inner()
+        inner()
+    assert tq.sections["inner"].count == 2
+    assert tq.sections["outer"].total == 0.5
+
+    tq.reset()
+    assert tq.sections == {}
+
+
+def test_section_steps():
+    clock = [0.0]
+    tq = TimeQuota(10, name="steps", timer_fn=lambda: clock[0], verbose=False)
+
+    # sections within a step are charged without ending the step
+    done = []
+    for i in tq.iter(range(100), verbose=False):
+        with tq.section("item"):
+            clock[0] += 1
+        done.append(i)
+
+    assert len(done) == 10
+    assert list(tq.time_steps) == [1.0] * 10
+    assert tq.time_per_step == 1
+    assert tq.time_elapsed == 10
+    assert tq.time_remaining == 0
+    assert tq.sections["item"].total == 10
+
+
+def test_limit():
+    clock = [0.0]
+    tq = TimeQuota(2, name="limit", timer_fn=lambda: clock[0], verbose=False)
+
+    @tq.limit
+    def work(step):
+        clock[0] += step
+        return step
+
+    @tq.limit(name="other")
+    def other():
+        pass
+
+    assert work(1) == 1
+    other()
+    assert list(tq.sections) == [work.__qualname__, "other"]
+
+    # calls are refused once the quota is exceeded
+    work(1.5)
+    assert tq.overflow == True
+    with pytest.raises(QuotaExceeded):
+        work(1)
+    assert tq.sections[work.__qualname__].count == 2
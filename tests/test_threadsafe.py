@@ -0,0 +1,100 @@
+import time
+import threading
+
+from timequota import ThreadSafeTimeQuota, TraceReader
+
+
+def run_threads(target, n=32):
+    barrier = threading.Barrier(n)
+
+    def worker():
+        barrier.wait()
+        target()
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_threadsafe_stress():
+    tq = ThreadSafeTimeQuota(float("inf"), name="threads", verbose=False)
+
+    def hammer():
+        for _ in range(500):
+            tq.track()
+
+    start = time.perf_counter()
+    run_threads(hammer)
+    wall_time = time.perf_counter() - start
+
+    # every step of every thread is recorded, elapsed time is global wall time
+    assert len(tq.time_steps) == 32 * 500
+    assert tq._step_aggregator.count == 32 * 500
+    assert 0 < tq.time_elapsed <= wall_time + 0.01
+    assert tq.time_remaining == float("inf")
+    assert tq.time_exceeded == False
+
+    # overlapping steps of all threads are not summed up
+    def sleep_track():
+        time.sleep(0.1)
+        tq.track()
+
+    tq.reset()
+    start = time.perf_counter()
+    run_threads(sleep_track)
+    wall_time = time.perf_counter() - start
+
+    assert tq.time_elapsed <= wall_time + 0.01
+    assert 0.1 <= tq.time_per_step < 0.2
+
+
+def test_threadsafe_quota():
+    tq = ThreadSafeTimeQuota(0.5, name="threads", verbose=False)
+    steps = []
+
+    def work():
+        for _ in range(100):
+            time.sleep(0.05)
+            if tq.track():
+                break
+            steps.append(tq.time_this_step)
+
+    run_threads(work, n=8)
+
+    assert tq.time_exceeded == True
+    assert tq.time_elapsed < 0.65
+    assert 8 * 5 <= len(steps) <= 8 * 10
+    assert all(0.04 < step < 0.15 for step in steps)
+
+    # reset restarts the step timers of all threads
+    time.sleep(0.1)
+    tq.reset()
+    time.sleep(0.05)
+    tq.track()
+    assert 0.04 < tq.time_this_step < 0.1
+    assert tq.time_exceeded == False
+
+
+def test_threadsafe_hooks(tmp_path):
+    path = str(tmp_path / "threads.trace")
+    tq = ThreadSafeTimeQuota(
+        float("inf"),
+        name="threads",
+        trace=path,
+        cpu_timer_fn="process_time",
+        verbose=False,
+    )
+
+    def hammer():
+        for _ in range(100):
+            tq.track()
+
+    run_threads(hammer, n=8)
+
+    # steps of all threads are traced and timed on the cpu clock
+    with TraceReader(path) as reader:
+        assert len(reader) == 8 * 100
+    assert tq.cpu_time_elapsed > 0
+    tq.close()
@@ -1,7 +1,10 @@
 import time
+import logging
 import statistics
 
-from timequota import TimeQuota
+import pytest
+
+from timequota import TimeQuota, FastTimeQuota, RunningMean, Welford
 
 
 def test_init():
@@ -161,6 +164,37 @@ def test_track():
     assert 0.95 < tq.time_per_step < 1.05
 
 
+def test_track_stride():
+    for make_aggr in [RunningMean, lambda: Welford(k=1)]:
+        clocks = [[0.0], [0.0]]
+        strided, tq = (
+            TimeQuota(
+                10, step_aggr_fn=make_aggr(), timer_fn=lambda c=c: c[0], verbose=False
+            )
+            for c in clocks
+        )
+
+        # a step of 2s, then four steps of 1s tracked at once or one by one
+        for clock in clocks:
+            clock[0] += 2
+        strided.track()
+        tq.track()
+
+        clocks[0][0] += 4
+        strided.track(steps=4)
+        for _ in range(4):
+            clocks[1][0] += 1
+            tq.track()
+
+        assert strided.steps_done == tq.steps_done == 5
+        assert strided.time_this_step == tq.time_this_step == 1
+        assert strided.time_per_step == pytest.approx(tq.time_per_step)
+
+        # strided steps weigh their number of steps, not their one call
+        if make_aggr is RunningMean:
+            assert strided.time_per_step == pytest.approx(1.2)
+
+
 def test_iter():
     tq = TimeQuota(3, "s", name="range", verbose=False)
     iterable = list("abc")
@@ -256,6 +290,297 @@ def test_range():
     assert 5 < tq.time_per_step < 5.1
 
 
+def test_iter_stride():
+    clock = [0.0]
+    timer_calls = [0]
+
+    def timer_fn():
+        timer_calls[0] += 1
+        return clock[0]
+
+    tq = TimeQuota(10, name="stride", timer_fn=timer_fn, verbose=False)
+
+    # fixed stride
+    tq.reset()
+    for _ in tq.range(10, stride=4):
+        clock[0] += 0.1
+    assert len(tq.time_steps) == 3
+    assert 0.099 < tq.time_per_step < 0.101
+    assert 8.99 < tq.time_remaining < 9.01
+
+    # predicted exhaustion looks a stride ahead
+    tq.reset()
+    for _ in tq.range(1000, stride=5):
+        clock[0] += 0.5
+    assert tq.predicted_overflow == True
+    assert tq.overflow == False
+    assert len(tq.time_steps) == 4
+    assert tq.time_remaining < 0.001
+
+    # adaptive stride reads the clock far less often
+    tq.reset()
+    timer_calls[0] = 0
+    items = 0
+    for _ in tq.range(10000, stride=None):
+        clock[0] += 1e-6
+        items += 1
+    assert items == 10000
+    assert timer_calls[0] < 100
+    assert 0.9e-6 < tq.time_per_step < 1.1e-6
+
+    # adaptive stride shrinks near the end of the quota
+    tq.reset()
+    items = 0
+    for _ in tq.iter(range(100000), stride=None):
+        clock[0] += 1e-3
+        items += 1
+    assert tq.time_exceeded == True
+    assert tq.overflow == False
+    assert 9990 <= items <= 10000
+
+    with pytest.raises(ValueError):
+        list(tq.range(10, stride=0))
+
+
+def test_eta():
+    clock = [0.0]
+    tq = TimeQuota(10, name="eta", timer_fn=lambda: clock[0], verbose=False)
+
+    # unknown before any step
+    assert tq.throughput == 0.0
+    assert tq.eta == None
+    assert tq.steps_fit == None
+    assert tq.will_finish == None
+
+    # sized iterables set the total steps, estimates follow the tracked steps
+    for _ in tq.iter([0] * 100):
+        if tq.steps_done == 1:
+            break
+        clock[0] += 0.25
+    assert tq.total_steps == 100
+    assert tq.steps_done == 1
+    assert tq.steps_remaining == 99
+    assert tq.throughput == 4.0
+    assert tq.eta == 24.75
+    assert tq.steps_fit == 39
+    assert tq.will_finish == False
+    assert "Will Finish" in str(tq)
+
+    tq.reset()
+    for _ in tq.range(20):
+        clock[0] += 0.25
+    assert tq.steps_done == 20
+    assert tq.steps_remaining == 0
+    assert tq.eta == 0.0
+    assert tq.will_finish == True
+
+    # unsized iterables leave the total unknown
+    tq.reset()
+    for _ in tq.iter(i for i in range(4)):
+        clock[0] += 0.25
+    assert tq.steps_done == 4
+    assert tq.total_steps == None
+    assert tq.eta == None
+    assert tq.steps_fit == 36
+
+
+def test_batches():
+    clock = [0.0]
+    tq = TimeQuota(10, name="batches", timer_fn=lambda: clock[0], verbose=False)
+
+    # function
+    assert [i for batch in tq.batches("abcdefg") for i in batch] == list("abcdefg")
+    with pytest.raises(ValueError):
+        list(tq.batches(range(10), batch_size=0))
+
+    # batches grow, then shrink to fit the remaining quota
+    tq.reset()
+    batch_sizes = []
+    for batch in tq.batches(range(2000)):
+        batch_sizes.append(len(batch))
+        clock[0] += 0.01 * len(batch)
+    assert batch_sizes[:9] == [1, 2, 4, 8, 16, 32, 64, 128, 256]
+    assert batch_sizes[9:] == sorted(batch_sizes[9:], reverse=True)
+    assert sum(batch_sizes) == 1000
+    assert tq.overflow == False
+    assert tq.time_exceeded == True
+    assert tq.steps_done == 1000
+
+    # the final batch takes the elements left if they fit
+    tq.reset()
+    batch_sizes = []
+    for batch in tq.batches(range(700), batch_size=4, max_batch_size=200):
+        batch_sizes.append(len(batch))
+        clock[0] += 0.01 * len(batch)
+    assert batch_sizes == [4, 8, 16, 32, 64, 128, 200, 200, 48]
+    assert tq.time_exceeded == False
+
+
+def test_clocks():
+    # clocks by name
+    for clock in ("perf_counter", "process_time", "thread_time", "monotonic"):
+        tq = TimeQuota(1, name="clocks", timer_fn=clock, verbose=False)
+        assert tq.timer_fn == getattr(time, clock)
+
+    # nanosecond clocks are scaled to seconds
+    clock = [10**18]
+    tq = TimeQuota(1, name="clocks-ns", timer_fn=time.perf_counter_ns, verbose=False)
+    tq.timer_fn = lambda: clock[0]
+    tq.reset()
+    clock[0] += 250_000_001
+    tq.track()
+    assert tq.time_elapsed == 0.250000001
+    assert tq.time_per_step == 0.250000001
+
+    with pytest.raises((TypeError, ValueError)):
+        TimeQuota(1, timer_fn="sundial")
+
+    # cpu time accounted alongside wall time
+    wall_clock, cpu_clock = [0.0], [0.0]
+    tq = TimeQuota(
+        10,
+        name="clocks-cpu",
+        timer_fn=lambda: wall_clock[0],
+        cpu_timer_fn=lambda: cpu_clock[0],
+        verbose=False,
+    )
+    assert tq.cpu_utilization == 0.0
+    wall_clock[0] += 2
+    cpu_clock[0] += 0.5
+    tq.track()
+    assert tq.cpu_time_elapsed == 0.5
+    assert tq.cpu_time_this_step == 0.5
+    assert tq.cpu_utilization == 0.25
+    assert "CPU Utilization" in str(tq)
+    assert TimeQuota(1, verbose=False).cpu_utilization == None
+
+
+def test_logging(caplog):
+    clock = [0.0]
+    messages = []
+
+    def timer_fn():
+        return clock[0]
+
+    # every n steps
+    tq = TimeQuota(10, name="log", timer_fn=timer_fn, logger_fn=messages.append)
+    tq.log_every = 3
+    for _ in range(7):
+        clock[0] += 0.1
+        tq.track()
+    assert len(messages) == 3
+
+    # every t seconds, state changes are always logged
+    messages.clear()
+    tq = TimeQuota(
+        1, timer_fn=timer_fn, logger_fn=messages.append, log_interval=0.35, color=False
+    )
+    for _ in range(10):
+        clock[0] += 0.1
+        tq.track()
+    assert len(messages) == 4
+    assert "TIME EXCEEDED! [Predicted]" in messages[-1]
+
+    # state changes only
+    messages.clear()
+    tq = TimeQuota(1, timer_fn=timer_fn, logger_fn=messages.append, log_on_change=True)
+    for _ in range(10):
+        clock[0] += 0.1
+        tq.track()
+    assert len(messages) == 2
+
+    # messages are only built when the logger is enabled, without color codes
+    logger = logging.getLogger("timequota-test")
+    logger.setLevel(logging.WARNING)
+    built = []
+    clock[0] = 0.0
+    tq = TimeQuota(1, timer_fn=timer_fn, logger_fn=logger)
+    get_info_string = tq._get_info_string
+    tq._get_info_string = lambda *args: built.append(args) or get_info_string(*args)
+
+    with caplog.at_level(logging.WARNING, logger="timequota-test"):
+        for _ in range(4):
+            clock[0] += 0.25
+            tq.track()
+
+    assert built == []
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelno == logging.WARNING
+    assert "TIME EXCEEDED!" in caplog.records[0].getMessage()
+    assert "\x1b[" not in caplog.records[0].getMessage()
+
+
+def test_sub():
+    clock = [0.0]
+
+    def timer_fn():
+        return clock[0]
+
+    tq = TimeQuota(10, name="pipeline", timer_fn=timer_fn, verbose=False)
+
+    with pytest.raises(ValueError):
+        tq.sub(1, fraction=0.5)
+    with pytest.raises(ValueError):
+        tq.sub(fraction=1.5)
+    with pytest.raises(ValueError):
+        tq.sub(timer_fn=time.perf_counter)
+
+    # budget slices
+    load = tq.sub(fraction=0.2, name="load")
+    assert load.quota == 2
+    assert load.name == "load"
+    assert load.timer_fn is timer_fn
+
+    # child time is charged to its ancestors once
+    clock[0] += 1
+    load.update()
+    assert load.time_elapsed == 1
+    assert tq.time_elapsed == 1
+    assert tq.time_remaining == 9
+
+    transform = tq.sub(6)
+    assert transform.quota == 6
+    assert transform.name == "pipeline.1"
+    assert tq.children == [load, transform]
+
+    clock[0] += 2
+    transform.track()
+    assert transform.time_elapsed == 2
+    assert tq.time_elapsed == 3
+
+    step = transform.sub(fraction=0.5)
+    assert step.quota == 2
+
+    clock[0] += 1
+    step.track()
+    assert step.time_remaining == 1
+    assert transform.time_elapsed == 3
+    assert tq.time_elapsed == 4
+
+    clock[0] += 0.5
+    tq.update()
+    assert tq.time_elapsed == 4.5
+    assert tq.time_remaining == 5.5
+
+    # child is limited by what its ancestors have left
+    write = tq.sub(1, "m")
+    assert write.quota == 5.5
+
+    clock[0] += 6
+    write.update()
+    assert write.overflow == True
+    assert tq.overflow == True
+    assert tq.time_exceeded == True
+    assert tq.time_elapsed == 10.5
+
+    # report covers the whole tree
+    tq = TimeQuota(3, name="tree", timer_fn=timer_fn, color=False, verbose=False)
+    # sub-quotas are reported once they are no longer referenced too
+    tq.sub(fraction=0.5).sub(name="nested")
+    for el in ["└ tree.0", "│ └ nested", "Quota", "Elapsed", "Remaining", "1.5000s"]:
+        assert el in str(tq)
+
+
 def test_str():
     tq = TimeQuota(3, "s", name="str-tq", color=False)
 
@@ -276,3 +601,55 @@ def test_str():
         "False",
     ]:
         assert el in str(tq)
+
+
+def test_fast_time_quota():
+    # type checked on creation only
+    with pytest.raises(TypeError):
+        FastTimeQuota("3")
+
+    assert not hasattr(FastTimeQuota.update, "__wrapped__")
+    assert not hasattr(FastTimeQuota.track, "__wrapped__")
+    assert not hasattr(FastTimeQuota.iter, "__wrapped__")
+    assert hasattr(TimeQuota.update, "__wrapped__")
+
+    tq = FastTimeQuota(1, "s", name="fast", verbose=False)
+    assert list(tq.range(3)) == [0, 1, 2]
+
+    tq.reset()
+    time.sleep(0.6)
+    tq.track()
+    assert tq.overflow == False
+    assert tq.predicted_overflow == True
+    assert tq.time_exceeded == True
+
+    assert repr(tq).startswith("FastTimeQuota(1.0, 's', 's'")
+
+
+def test_sub_parent_steps():
+    clock = [0.0]
+    tq = TimeQuota(5, timer_fn=lambda: clock[0], verbose=False)
+
+    # each item takes 1s in a sub-quota and 0.1s in the parent
+    for i in range(1, 5):
+        child = tq.sub()
+        clock[0] += 1
+        child.update()
+        clock[0] += 0.1
+        exceeded = tq.track()
+
+        assert tq.time_this_step == pytest.approx(1.1)
+        assert tq.time_per_step == pytest.approx(1.1)
+        assert tq.time_elapsed == pytest.approx(1.1 * i)
+        assert exceeded == (i == 4)
+
+    # the 5th item is predicted not to fit in the remaining 0.6s
+    assert tq.predicted_overflow == True
+    assert tq.overflow == False
+
+    # sub-quotas are kept by their parent until it is reset
+    assert len(tq.children) == 4
+    assert tq.children[-1] is child
+    tq.reset()
+    assert tq.children == []
+    assert tq.sub().name == "tq.4"
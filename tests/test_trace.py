@@ -0,0 +1,67 @@
+import gc
+
+import pytest
+
+from timequota import TimeQuota, TraceWriter, TraceReader
+
+
+def test_trace(tmp_path):
+    path = str(tmp_path / "quota.trace")
+    clock = [0.0]
+    tq = TimeQuota(
+        100, name="trace", trace=path, timer_fn=lambda: clock[0], verbose=False
+    )
+    tq.trace.chunk_records = 2
+
+    for _ in tq.range(5):
+        clock[0] += 0.5
+    tq.track(steps=4)
+    with tq.section("save"):
+        clock[0] += 2
+
+    # readable while tracing
+    with TraceReader(path) as reader:
+        assert len(reader) == 7
+        assert reader[0] == (0.0, 0.5, 0, 1)
+        assert reader[5] == (2.5, 0.0, 0, 4)
+        assert reader[-1] == (2.5, 2.0, 1, 1)
+        assert reader.sections == {0: "step", 1: "save"}
+        assert [record.duration for record in reader][:5] == [0.5] * 5
+
+        view = reader.memoryview()
+        assert len(view) == 7 * 24
+        view.release()
+
+    # the writer created from the path is closed with the quota
+    tq.close()
+    assert (tmp_path / "quota.trace").stat().st_size == 16 + 7 * 24
+
+    tq = TimeQuota(100, trace=path, verbose=False)
+    tq.track()
+    assert (tmp_path / "quota.trace").stat().st_size > 16 + 24
+    del tq
+    gc.collect()
+    assert (tmp_path / "quota.trace").stat().st_size == 16 + 24
+
+    with open(path, "r+b") as f:
+        f.write(b"NOTTRACE")
+    with pytest.raises(ValueError):
+        TraceReader(path)
+
+
+def test_trace_numpy(tmp_path):
+    np = pytest.importorskip("numpy")
+
+    path = str(tmp_path / "quota.trace")
+    with TraceWriter(path, chunk_records=10) as writer:
+        for i in range(25):
+            writer.append(float(i), 0.1 * i, 0, 1)
+
+    reader = TraceReader(path)
+    records = reader.numpy()
+    assert len(records) == 25
+    assert records["start"].tolist() == list(range(25))
+    assert np.allclose(records["duration"], 0.1 * np.arange(25))
+    assert not records.flags.owndata
+    del records
+    reader.close()
@@ -1,4 +1,115 @@
-from .timequota import TimeQuota
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+# submodules are imported on first access of their names, keeping `import timequota` cheap
+if TYPE_CHECKING:
+    from .timequota import TimeQuota, FastTimeQuota
+    from .aggregators import StepAggregator, RunningMean, EWMA, Welford, P2Quantile
+    from .history import StepHistory
+    from .exceptions import QuotaExceeded
+    from .sections import SectionStats
+    from .priors import StepPrior, StepPriorCache
+    from .trace import TraceWriter, TraceReader
+    from .exporters import (
+        QuotaSnapshot,
+        Exporter,
+        OpenMetricsExporter,
+        StatsdExporter,
+        JsonLinesExporter,
+    )
+    from .predictors import (
+        OverflowPredictor,
+        LinearTrendPredictor,
+        QuantilePredictor,
+        SafetyMarginPredictor,
+    )
+    from .threadsafe import ThreadSafeTimeQuota
+    from .lite import LiteTimeQuota, QuotaTemplate
+    from .distributed import (
+        DistributedTimeQuota,
+        QuotaStore,
+        SharedMemoryStore,
+        FileStore,
+    )
 
 __version__ = "0.0.6"
-__all__ = ["TimeQuota"]
+__all__ = [
+    "TimeQuota",
+    "FastTimeQuota",
+    "ThreadSafeTimeQuota",
+    "DistributedTimeQuota",
+    "LiteTimeQuota",
+    "QuotaTemplate",
+    "QuotaStore",
+    "SharedMemoryStore",
+    "FileStore",
+    "StepAggregator",
+    "RunningMean",
+    "EWMA",
+    "Welford",
+    "P2Quantile",
+    "StepHistory",
+    "QuotaExceeded",
+    "SectionStats",
+    "StepPrior",
+    "StepPriorCache",
+    "TraceWriter",
+    "TraceReader",
+    "QuotaSnapshot",
+    "Exporter",
+    "OpenMetricsExporter",
+    "StatsdExporter",
+    "JsonLinesExporter",
+    "OverflowPredictor",
+    "LinearTrendPredictor",
+    "QuantilePredictor",
+    "SafetyMarginPredictor",
+]
+
+_exports = {
+    "TimeQuota": ".timequota",
+    "FastTimeQuota": ".timequota",
+    "StepAggregator": ".aggregators",
+    "RunningMean": ".aggregators",
+    "EWMA": ".aggregators",
+    "Welford": ".aggregators",
+    "P2Quantile": ".aggregators",
+    "StepHistory": ".history",
+    "QuotaExceeded": ".exceptions",
+    "SectionStats": ".sections",
+    "StepPrior": ".priors",
+    "StepPriorCache": ".priors",
+    "TraceWriter": ".trace",
+    "TraceReader": ".trace",
+    "QuotaSnapshot": ".exporters",
+    "Exporter": ".exporters",
+    "OpenMetricsExporter": ".exporters",
+    "StatsdExporter": ".exporters",
+    "JsonLinesExporter": ".exporters",
+    "OverflowPredictor": ".predictors",
+    "LinearTrendPredictor": ".predictors",
+    "QuantilePredictor": ".predictors",
+    "SafetyMarginPredictor": ".predictors",
+    "ThreadSafeTimeQuota": ".threadsafe",
+    "LiteTimeQuota": ".lite",
+    "QuotaTemplate": ".lite",
+    "DistributedTimeQuota": ".distributed",
+    "QuotaStore": ".distributed",
+    "SharedMemoryStore": ".distributed",
+    "FileStore": ".distributed",
+}
+
+
+def __getattr__(
+    name: str,
+) -> Any:
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
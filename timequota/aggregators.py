@@ -0,0 +1,520 @@
+"""
+Streaming step aggregators.
+
+Aggregators update their value in constant time for every tracked step, instead of
+re-aggregating the full step history on each call. They can be passed as *step_aggr_fn*
+to `timequota.TimeQuota` alongside plain callables.
+"""
+
+import copy
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _normal_quantile(
+    p: float,
+) -> float:
+    # quantile of the standard normal distribution, by bisection of its cdf
+    low, high = -10.0, 10.0
+    for _ in range(64):
+        z = (low + high) / 2
+        if 0.5 * (1 + math.erf(z / math.sqrt(2))) < p:
+            low = z
+        else:
+            high = z
+    return (low + high) / 2
+
+
+class StepAggregator:
+    """
+    Base class for streaming step aggregators.
+
+    Subclasses implement `update()` and `reset()`, and expose the current aggregate through `value`.
+    Aggregators hold state, so every quota should be given its own instance.
+    """
+
+    # attributes of the running statistics, see get_state()
+    _state_attrs: Optional[Tuple[str, ...]] = None
+
+    def update(
+        self,
+        step: float,
+    ) -> float:
+        """
+        Adds a time step to the aggregate.
+
+        Args:
+            step (float): Time taken by the step.
+
+        Returns:
+            float: Updated aggregate value.
+        """
+
+        raise NotImplementedError
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> float:
+        """
+        Adds *count* time steps taking *step* each, like the steps amortized by `timequota.TimeQuota.track`.
+        Calls `update()` for every step unless overridden.
+
+        Args:
+            step (float): Time taken by each step.
+            count (int): Number of steps.
+
+        Returns:
+            float: Updated aggregate value.
+        """
+
+        for _ in range(count):
+            self.update(step)
+        return self.value
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Resets the aggregator to its initial state.
+        """
+
+        raise NotImplementedError
+
+    @property
+    def value(
+        self,
+    ) -> float:
+        """
+        float: Current aggregate value, 0 if no steps were added.
+        """
+
+        raise NotImplementedError
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        """
+        Starts the aggregate from the step statistics of previous runs, as kept by `timequota.StepPriorCache`.
+        Does nothing unless overridden.
+
+        Args:
+            count (int): Number of previous steps.
+            mean (float): Mean time of the previous steps.
+            m2 (float, optional): Sum of squared deviations of the previous steps from their mean. Defaults to 0.
+        """
+
+    def get_state(
+        self,
+    ) -> Dict[str, Any]:
+        """
+        Returns the running statistics of the aggregator as JSON serializable values, to be restored by `set_state()`.
+        Options like `EWMA.alpha` are not part of the state. Subclasses list their statistics in `_state_attrs`,
+        all attributes are saved otherwise.
+        """
+
+        if self._state_attrs is None:
+            return copy.deepcopy(vars(self))
+        return {name: copy.deepcopy(getattr(self, name)) for name in self._state_attrs}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        """
+        Restores the running statistics returned by `get_state()`, keeping the options of the aggregator.
+        """
+
+        if self._state_attrs is None:
+            vars(self).update(copy.deepcopy(state))
+            return
+        for name in self._state_attrs:
+            if name in state:
+                setattr(self, name, copy.deepcopy(state[name]))
+
+    def __call__(
+        self,
+        steps: Iterable[float],
+    ) -> float:
+        """
+        Recomputes the aggregate from scratch over *steps*, to be used like a plain *step_aggr_fn*.
+        """
+
+        self.reset()
+        for step in steps:
+            self.update(step)
+        return self.value
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class RunningMean(StepAggregator):
+    """
+    Running arithmetic mean of the steps, equivalent to `statistics.mean` over the history.
+    """
+
+    _state_attrs = ("count", "mean")
+
+    def __init__(
+        self,
+    ) -> None:
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        self.count = count
+        self.mean = mean
+
+    def update(
+        self,
+        step: float,
+    ) -> float:
+        self.count += 1
+        self.mean += (step - self.mean) / self.count
+        return self.mean
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> float:
+        self.count += count
+        self.mean += (step - self.mean) * count / self.count
+        return self.mean
+
+    @property
+    def value(
+        self,
+    ) -> float:
+        return self.mean
+
+
+class EWMA(StepAggregator):
+    """
+    Exponentially weighted moving average of the steps, favouring recent steps.
+
+    Args:
+        alpha (float, optional): Smoothing factor in (0, 1], higher values weigh recent steps more. Defaults to 0.1.
+    """
+
+    _state_attrs = ("count", "mean")
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+    ) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha!r}")
+
+        self.alpha = alpha
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+
+    def update(
+        self,
+        step: float,
+    ) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.mean = step
+        else:
+            self.mean += self.alpha * (step - self.mean)
+        return self.mean
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> float:
+        # equal steps decay the previous mean by (1 - alpha) each
+        if self.count == 0:
+            self.mean = step
+        else:
+            self.mean += (1 - (1 - self.alpha) ** count) * (step - self.mean)
+        self.count += count
+        return self.mean
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        # the previous mean is the starting value, recent steps still weigh alpha
+        if count > 0:
+            self.count = count
+            self.mean = mean
+
+    @property
+    def value(
+        self,
+    ) -> float:
+        return self.mean
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}(alpha={self.alpha!r})"
+
+
+class Welford(StepAggregator):
+    """
+    Running mean and variance of the steps using Welford's algorithm.
+
+    The aggregate value is `mean + k * stdev`, so a positive *k* gives a pessimistic step estimate for noisy steps.
+
+    Args:
+        k (float, optional): Number of standard deviations added to the mean. Defaults to 0.
+    """
+
+    _state_attrs = ("count", "mean", "_m2")
+
+    def __init__(
+        self,
+        k: float = 0.0,
+    ) -> None:
+        self.k = k
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0
+        self._m2: float = 0.0
+
+    def update(
+        self,
+        step: float,
+    ) -> float:
+        self.count += 1
+        delta = step - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (step - self.mean)
+        return self.value
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> float:
+        # merges the steps as a group of mean step and no variance
+        self.count += count
+        delta = step - self.mean
+        self.mean += delta * count / self.count
+        self._m2 += delta * (step - self.mean) * count
+        return self.value
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        self.count = count
+        self.mean = mean
+        self._m2 = m2
+
+    @property
+    def variance(
+        self,
+    ) -> float:
+        """
+        float: Sample variance of the steps, 0 for less than two steps.
+        """
+
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(
+        self,
+    ) -> float:
+        """
+        float: Sample standard deviation of the steps.
+        """
+
+        return math.sqrt(self.variance)
+
+    @property
+    def value(
+        self,
+    ) -> float:
+        if self.k:
+            return self.mean + self.k * self.stdev
+        return self.mean
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}(k={self.k!r})"
+
+
+class P2Quantile(StepAggregator):
+    """
+    Approximate quantile of the steps using the P² algorithm (Jain & Chlamtac, 1985), in constant memory.
+
+    Args:
+        q (float, optional): Quantile to estimate, in (0, 1). Defaults to 0.5.
+    """
+
+    _state_attrs = ("count", "_heights", "_positions", "_desired")
+
+    def __init__(
+        self,
+        q: float = 0.5,
+    ) -> None:
+        if not 0 < q < 1:
+            raise ValueError(f"q must be in (0, 1), got {q!r}")
+
+        self.q = q
+        self._increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self._heights: List[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1 + 2 * self.q, 1 + 4 * self.q, 3 + 2 * self.q, 5.0]
+
+    def update(
+        self,
+        step: float,
+    ) -> float:
+        self.count += 1
+        heights = self._heights
+
+        if self.count <= 5:
+            heights.append(step)
+            heights.sort()
+            return self.value
+
+        positions = self._positions
+
+        if step < heights[0]:
+            heights[0] = step
+            k = 0
+        elif step >= heights[4]:
+            heights[4] = step
+            k = 3
+        else:
+            k = 0
+            while step >= heights[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (
+                d <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, d)
+                heights[i] = height
+                positions[i] += d
+
+        return heights[2]
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        # markers placed at the quantiles of a normal distribution with the previous mean and stdev, steps being non-negative
+        if count < 5:
+            self.reset()
+            self.count = count
+            self._heights = [mean] * count
+            return
+
+        stdev = math.sqrt(m2 / (count - 1))
+        heights = [
+            mean + _normal_quantile(p) * stdev
+            for p in (0.00135, *self._increments[1:4], 0.99865)
+        ]
+
+        self.count = count
+        self._heights = [max(height, 0.0) for height in heights]
+        self._positions = [1 + (count - 1) * p for p in self._increments]
+        self._desired = list(self._positions)
+
+    def get_state(
+        self,
+    ) -> Dict[str, Any]:
+        # the markers track the quantile q, checked on restore
+        return {"q": self.q, **super().get_state()}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        if state.get("q", self.q) != self.q:
+            raise ValueError(
+                f"state of the {state['q']!r} quantile can not be restored into {self!r}"
+            )
+        super().set_state(state)
+
+    def _parabolic(
+        self,
+        i: int,
+        d: int,
+    ) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(
+        self,
+        i: int,
+        d: int,
+    ) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+
+    @property
+    def value(
+        self,
+    ) -> float:
+        if not self._heights:
+            return 0.0
+        if self.count <= 5:
+            # exact quantile of the few steps seen so far
+            return self._heights[min(int(self.q * self.count), self.count - 1)]
+        return self._heights[2]
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}(q={self.q!r})"
@@ -0,0 +1,83 @@
+"""
+asyncio support for `timequota.TimeQuota`.
+"""
+
+import asyncio
+from typing import Any, Optional
+
+
+class QuotaDeadline:
+    """
+    Async context manager cancelling the enclosed code when the quota runs out, created by `timequota.TimeQuota.deadline`.
+
+    The cancellation is scheduled with an event loop timer on entry, no polling is done. On exit the time taken is charged
+    against the quota without ending its current step, and if the timer cancelled the enclosed code `asyncio.TimeoutError`
+    is raised instead of `asyncio.CancelledError`.
+
+    Args:
+        tq (TimeQuota): Time quota enforced.
+        predicted (bool, optional): Cancel as soon as the quota is predicted to be exhausted, leaving one time step of the quota. Defaults to False.
+        verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        tq: Any,
+        *,
+        predicted: bool = False,
+        verbose: bool = True,
+    ) -> None:
+        self.tq = tq
+        self.predicted = predicted
+        self.verbose = verbose
+
+        self.expired: bool = False
+        self._time_start: float = 0
+        self._task: Optional["asyncio.Task[Any]"] = None
+        self._handle: Optional[asyncio.Handle] = None
+
+    def _expire(
+        self,
+    ) -> None:
+        self.expired = True
+        if self._task is not None:
+            self._task.cancel()
+
+    async def __aenter__(
+        self,
+    ) -> "QuotaDeadline":
+        loop = asyncio.get_event_loop()
+        self._task = asyncio.current_task()
+        self.expired = False
+        self._time_start = self.tq.timer_fn()
+
+        delay = self.tq._get_time_remaining_now()
+        if self.predicted:
+            delay -= self.tq.time_per_step
+
+        if self.tq.time_exceeded or delay <= 0:
+            self._handle = loop.call_soon(self._expire)
+        elif delay != float("inf"):
+            self._handle = loop.call_later(delay, self._expire)
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Any,
+        exc: Any,
+        tb: Any,
+    ) -> Optional[bool]:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        self.tq._charge_since(self._time_start, self.verbose)
+
+        if self.expired and exc_type is asyncio.CancelledError:
+            # python>=3.11 counts cancellation requests, ours is handled here
+            if hasattr(self._task, "uncancel"):
+                self._task.uncancel()  # type: ignore
+            raise asyncio.TimeoutError from exc
+
+        return None
@@ -0,0 +1,214 @@
+"""
+Vectorized offline analysis of recorded time steps, requires numpy.
+
+Steps are loaded from a live `timequota.TimeQuota`, its `StepHistory`, a checkpoint saved by `timequota.TimeQuota.save`,
+or any sequence of floats, into a float64 array. All statistics are computed in vectorized form,
+so histories of tens of millions of steps are analysed in a fraction of a second.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from tabulate import tabulate
+
+from .history import StepHistory
+from .checkpoint import load_checkpoint
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "timequota.analysis requires numpy, install it with `pip install numpy`"
+        ) from e
+    return numpy
+
+
+def load_steps(
+    source: Any,
+) -> Any:
+    """
+    Loads time steps into a float64 numpy array, oldest first.
+
+    Args:
+        source (Union[TimeQuota, StepHistory, str, Sequence[float]]): Quota or step history, copied in a single pass so the quota keeps tracking,
+            path of a checkpoint, or sequence of steps.
+
+    Returns:
+        numpy.ndarray: Time steps.
+    """
+
+    np = _import_numpy()
+
+    if isinstance(source, str):
+        return np.asarray(load_checkpoint(source)["time_steps"], dtype=np.float64)
+
+    history = getattr(source, "time_steps", source)
+    if isinstance(history, StepHistory):
+        # a view would keep the live array from growing
+        steps = np.array(history._buffer, dtype=np.float64)
+        head = history._head
+        if history.maxlen and len(history) == history.maxlen:
+            return np.concatenate((steps[head:], steps[:head]))
+        return steps[: len(history)]
+
+    return np.asarray(source, dtype=np.float64)
+
+
+def percentiles(
+    steps: Any,
+    q: Sequence[float] = (50, 90, 95, 99),
+) -> Dict[float, float]:
+    """
+    Args:
+        steps (Any): Time steps, or a source accepted by `load_steps()`.
+        q (Sequence[float], optional): Percentiles to compute, in [0, 100]. Defaults to (50, 90, 95, 99).
+
+    Returns:
+        Dict[float, float]: Step time of each percentile.
+    """
+
+    np = _import_numpy()
+    steps = load_steps(steps)
+    if not len(steps):
+        return {p: float("nan") for p in q}
+    return dict(zip(q, np.percentile(steps, q).tolist()))
+
+
+def histogram(
+    steps: Any,
+    bins: Union[int, Sequence[float]] = 20,
+    log: bool = False,
+) -> Tuple[Any, Any]:
+    """
+    Args:
+        steps (Any): Time steps, or a source accepted by `load_steps()`.
+        bins (Union[int, Sequence[float]], optional): Number of bins, or bin edges. Defaults to 20.
+        log (bool, optional): Space the bins logarithmically, for heavy-tailed steps. Defaults to False.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: Counts of steps in each bin, and the bin edges.
+    """
+
+    np = _import_numpy()
+    steps = load_steps(steps)
+    if log and isinstance(bins, int) and len(steps):
+        positive = steps[steps > 0]
+        bins = np.geomspace(positive.min(), positive.max(), bins + 1)
+    return np.histogram(steps, bins=bins)
+
+
+def change_points(
+    steps: Any,
+    window: int = 100,
+    threshold: float = 1.5,
+) -> List[int]:
+    """
+    Finds where the steps got slower, comparing the mean step time of the *window* steps after each step with the *window* steps before it.
+
+    Args:
+        steps (Any): Time steps, or a source accepted by `load_steps()`.
+        window (int, optional): Number of steps compared on each side. Defaults to 100.
+        threshold (float, optional): Ratio of the mean step times after and before, above which the steps got slower. Defaults to 1.5.
+
+    Returns:
+        List[int]: Indices of the first slower steps, one per slowdown.
+    """
+
+    np = _import_numpy()
+    steps = load_steps(steps)
+    if window < 1:
+        raise ValueError(f"window must be a positive integer, got {window!r}")
+    if len(steps) < 2 * window:
+        return []
+
+    sums = np.concatenate(([0.0], np.cumsum(steps)))
+    span = 2 * window
+    before = sums[window:-window] - sums[:-span]
+    after = sums[span:] - sums[window:-window]
+    # compared without dividing, only the ratios above the threshold are computed
+    above = np.flatnonzero(after > threshold * before)
+    if not len(above):
+        return []
+    with np.errstate(divide="ignore"):
+        ratios = after[above] / before[above]
+
+    # one change point per run of consecutive indices above the threshold, at its highest ratio
+    runs = np.split(np.arange(len(above)), np.flatnonzero(np.diff(above) > 1) + 1)
+    return [int(above[run[np.argmax(ratios[run])]]) + window for run in runs]
+
+
+def rolling_throughput(
+    steps: Any,
+    window: int = 1000,
+) -> Any:
+    """
+    Args:
+        steps (Any): Time steps, or a source accepted by `load_steps()`.
+        window (int, optional): Number of steps of the rolling window. Defaults to 1000.
+
+    Returns:
+        numpy.ndarray: Steps per second over each window of consecutive steps, empty if there are fewer steps than *window*.
+    """
+
+    np = _import_numpy()
+    steps = load_steps(steps)
+    if window < 1:
+        raise ValueError(f"window must be a positive integer, got {window!r}")
+
+    sums = np.concatenate(([0.0], np.cumsum(steps)))
+    window_times = sums[window:] - sums[:-window]
+    with np.errstate(divide="ignore"):
+        return window / window_times
+
+
+def summary(
+    source: Any,
+    *,
+    name: str = "steps",
+    window: int = 100,
+    threshold: float = 1.5,
+    precision: int = 4,
+) -> str:
+    """
+    Summary table of the time steps, in the style of the `timequota.TimeQuota` report.
+
+    Args:
+        source (Any): Time steps, or a source accepted by `load_steps()`.
+        name (str, optional): Name shown in the table header. Defaults to the quota name, or 'steps'.
+        window (int, optional): Number of steps compared for change points. Defaults to 100.
+        threshold (float, optional): Ratio of mean step times for change points. Defaults to 1.5.
+        precision (int, optional): Number of decimals of the step times. Defaults to 4.
+
+    Returns:
+        str: Summary table.
+    """
+
+    name = getattr(source, "name", name)
+    steps = load_steps(source)
+
+    table: List[List[Any]] = [["Steps", len(steps)]]
+    if len(steps):
+        table += [
+            ["Total", f"{steps.sum():.{precision}f}s"],
+            ["Mean", f"{steps.mean():.{precision}f}s"],
+            ["Stdev", f"{steps.std():.{precision}f}s"],
+            ["Min", f"{steps.min():.{precision}f}s"],
+            *(
+                [f"P{p:g}", f"{value:.{precision}f}s"]
+                for p, value in percentiles(steps).items()
+            ),
+            ["Max", f"{steps.max():.{precision}f}s"],
+            [
+                "Throughput",
+                f"{len(steps) / steps.sum() if steps.sum() else float('inf'):.{precision}f}/s",
+            ],
+            ["Slowdowns", len(change_points(steps, window, threshold))],
+        ]
+
+    return tabulate(
+        table,
+        [name, "Time"],
+        colalign=("left", "right"),
+        tablefmt="simple",
+    )
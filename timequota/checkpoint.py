@@ -0,0 +1,65 @@
+"""
+Persistent checkpoints of `timequota.TimeQuota` state, so resumed runs continue the same budget.
+
+Checkpoints are JSON files holding the elapsed and remaining time, the step statistics, the aggregator and predictor
+state, and the latest time steps. They are written atomically, replacing the previous checkpoint only once complete.
+"""
+
+import os
+import json
+import tempfile
+from typing import Any, Dict
+
+_checkpoint_version = 1
+
+
+def write_atomic(
+    path: str,
+    data: str,
+) -> None:
+    """
+    Writes *data* to a temporary file next to *path*, then renames it over *path*, so readers never see a partial file.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def save_checkpoint(
+    path: str,
+    state: Dict[str, Any],
+) -> None:
+    """
+    Saves a quota state atomically as JSON.
+    """
+
+    write_atomic(path, json.dumps({"version": _checkpoint_version, **state}))
+
+
+def load_checkpoint(
+    path: str,
+) -> Dict[str, Any]:
+    """
+    Loads a quota state saved by `save_checkpoint()`.
+    """
+
+    with open(path) as f:
+        state = json.load(f)
+
+    version = state.pop("version", None)
+    if version != _checkpoint_version:
+        raise ValueError(
+            f"unsupported checkpoint version {version!r} in {path!r}, expected {_checkpoint_version!r}"
+        )
+    return state
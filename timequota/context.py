@@ -0,0 +1,158 @@
+"""
+Ambient current quota, so nested calls can bound their blocking waits by the remaining time without it being passed down.
+
+The current quota is kept in a `contextvars.ContextVar`, set by `timequota.TimeQuota.activate`: asyncio tasks inherit
+the one active when they are created, but a plain `threading.Thread` starts with an empty context and sees no current
+quota, unless its target is wrapped by `propagate()`. The helpers turn the remaining time of the current quota into
+timeouts of `socket`, `queue.Queue.get` and `concurrent.futures.wait`.
+"""
+
+import functools
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Iterable, Optional, Set, Tuple
+
+from .exceptions import QuotaExceeded
+
+_current_quota: ContextVar[Any] = ContextVar("timequota_current", default=None)
+
+
+class QuotaActivation:
+    """
+    Context manager making *tq* the current quota, restoring the previous one on exit. Returned by `timequota.TimeQuota.activate`.
+    """
+
+    __slots__ = ("tq", "_token")
+
+    def __init__(
+        self,
+        tq: Any,
+    ) -> None:
+        self.tq = tq
+        self._token: Any = None
+
+    def __enter__(
+        self,
+    ) -> Any:
+        self._token = _current_quota.set(self.tq)
+        return self.tq
+
+    def __exit__(
+        self,
+        *args: Any,
+    ) -> None:
+        _current_quota.reset(self._token)
+        self._token = None
+
+
+def current_quota() -> Any:
+    """
+    Returns:
+        Optional[Union[TimeQuota, LiteTimeQuota]]: Active quota of the current context, None if none is active.
+    """
+
+    return _current_quota.get()
+
+
+def propagate(
+    fn: Callable[..., Any],
+) -> Callable[..., Any]:
+    """
+    Wraps *fn* to run in a copy of the current context, so a thread started with it as target sees the current quota.
+    Used as `threading.Thread(target=propagate(fn))`, each call runs in its own copy and calls may be concurrent.
+
+    Args:
+        fn (Callable[..., Any]): Function to be wrapped.
+
+    Returns:
+        Callable[..., Any]: Wrapped function.
+    """
+
+    context = copy_context()
+
+    @functools.wraps(fn)
+    def propagated(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(fn, *args, **kwargs)
+
+    return propagated
+
+
+def get_timeout(
+    default: Optional[float] = None,
+    *,
+    tq: Any = None,
+) -> Optional[float]:
+    """
+    Remaining time of the quota as a timeout, in seconds, not below 0.
+
+    Args:
+        default (Optional[float], optional): Timeout used without an active quota, and upper bound of the remaining time. Defaults to None, no timeout.
+        tq (Optional[Union[TimeQuota, LiteTimeQuota]], optional): Quota to use instead of the current one. Defaults to None.
+
+    Returns:
+        Optional[float]: Timeout, *default* without an active or with an unbounded quota.
+    """
+
+    if tq is None:
+        tq = _current_quota.get()
+        if tq is None:
+            return default
+
+    timeout = max(tq._get_time_remaining_now(), 0.0)
+    # an unbounded quota sets no timeout
+    if timeout == float("inf"):
+        return default
+    return timeout if default is None else min(timeout, default)
+
+
+def settimeout(
+    sock: Any,
+    default: Optional[float] = None,
+    *,
+    tq: Any = None,
+) -> Optional[float]:
+    """
+    Sets the timeout of the socket *sock* to the remaining time of the quota, see `get_timeout()`.
+    Raises `QuotaExceeded` when no time remains, as a zero timeout would make the socket non-blocking.
+
+    Returns:
+        Optional[float]: Timeout set.
+    """
+
+    timeout = get_timeout(default, tq=tq)
+    if timeout == 0:
+        raise QuotaExceeded("no time remaining for the socket operation")
+    sock.settimeout(timeout)
+    return timeout
+
+
+def queue_get(
+    q: Any,
+    default: Optional[float] = None,
+    *,
+    tq: Any = None,
+) -> Any:
+    """
+    Removes and returns an item of the queue *q*, waiting at most the remaining time of the quota, see `get_timeout()`.
+    Raises `queue.Empty` if no item is available in time.
+    """
+
+    return q.get(timeout=get_timeout(default, tq=tq))
+
+
+def wait(
+    fs: Iterable[Any],
+    default: Optional[float] = None,
+    *,
+    return_when: str = "ALL_COMPLETED",
+    tq: Any = None,
+) -> Tuple[Set[Any], Set[Any]]:
+    """
+    `concurrent.futures.wait` for the futures *fs*, waiting at most the remaining time of the quota, see `get_timeout()`.
+
+    Returns:
+        Tuple[Set[Future], Set[Future]]: Done and not done futures.
+    """
+
+    from concurrent.futures import wait
+
+    return wait(fs, timeout=get_timeout(default, tq=tq), return_when=return_when)
@@ -0,0 +1,321 @@
+"""
+Time quota shared by processes, with the budget and step statistics kept in a shared store.
+
+Stores are pluggable, `SharedMemoryStore` keeps the state in `multiprocessing.shared_memory`, and `FileStore` in
+a memory mapped file locked with `flock`. Both are for processes on a single host: the elapsed time is read from
+the wall clock of each process, and neither `flock` nor memory mapping is coherent over a network filesystem.
+"""
+
+import os
+import mmap
+import math
+import time
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
+
+from .timequota import TimeQuota
+from .typechecks import typechecked
+
+# time start, quota, steps, step mean, step sum of squared deviations
+_layout = struct.Struct("<ddddd")
+
+# wall clock shared by the processes of one host
+_clock = time.time
+
+
+class QuotaStore:
+    """
+    Base class for shared quota stores, a fixed size buffer guarded by an inter-process lock.
+    """
+
+    size = _layout.size
+
+    buffer: Any
+
+    def lock(
+        self,
+    ) -> Any:
+        """
+        Returns a context manager holding the inter-process lock of the store.
+        """
+
+        raise NotImplementedError
+
+    def read(
+        self,
+    ) -> Tuple[float, float, float, float, float]:
+        """
+        Returns the stored time start, quota, steps, step mean and step sum of squared deviations, to be called with the lock held.
+        """
+
+        return _layout.unpack_from(self.buffer)
+
+    def write(
+        self,
+        *values: float,
+    ) -> None:
+        """
+        Stores the time start, quota, steps, step mean and step sum of squared deviations, to be called with the lock held.
+        """
+
+        _layout.pack_into(self.buffer, 0, *values)
+
+    def clear(
+        self,
+    ) -> None:
+        """
+        Clears the store, the next attached quota starts a new budget.
+        """
+
+        with self.lock():
+            self.write(0, 0, 0, 0, 0)
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Closes the store in this process.
+        """
+
+        raise NotImplementedError
+
+
+class SharedMemoryStore(QuotaStore):
+    """
+    Quota store in `multiprocessing.shared_memory`, requires python>=3.8.
+
+    Passing the store to a child process attaches the child to the same shared memory and lock.
+
+    Args:
+        name (Optional[str], optional): Name of an existing store to attach to. Defaults to None, creating a new store.
+        lock (Optional[Any], optional): Lock of the existing store, a `multiprocessing.Lock`. Defaults to None, creating a new lock.
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        lock: Optional[Any] = None,
+    ) -> None:
+        from multiprocessing import Lock
+        from multiprocessing.shared_memory import SharedMemory
+
+        if name is None:
+            self._shared_memory = SharedMemory(create=True, size=self.size)
+            self._owner = True
+        else:
+            if lock is None:
+                raise ValueError(
+                    "lock of the existing store is required to attach to it"
+                )
+            self._shared_memory = _attach_shared_memory(name)
+            self._owner = False
+
+        self.name: str = self._shared_memory.name
+        self.buffer = self._shared_memory.buf
+        if self._owner:
+            self.buffer[: self.size] = bytes(self.size)
+        self._lock = Lock() if lock is None else lock
+
+    @contextmanager
+    def lock(
+        self,
+    ) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Closes the store in this process, the creator also frees the shared memory.
+        """
+
+        self.buffer = None
+        self._shared_memory.close()
+        if self._owner:
+            self._shared_memory.unlink()
+
+    def __reduce__(
+        self,
+    ) -> Any:
+        return (self.__class__, (self.name, self._lock))
+
+
+def _attach_shared_memory(
+    name: str,
+) -> Any:
+    from multiprocessing.shared_memory import SharedMemory
+
+    try:
+        return SharedMemory(name, track=False)  # type: ignore
+    except TypeError:
+        # python<3.13 would unlink the shared memory when an attached process exits
+        from multiprocessing import resource_tracker
+
+        shared_memory = SharedMemory(name)
+        resource_tracker.unregister(
+            shared_memory._name, "shared_memory"  # type: ignore
+        )
+        return shared_memory
+
+
+class FileStore(QuotaStore):
+    """
+    Quota store in a memory mapped file, locked with `fcntl.flock`, requires a POSIX system.
+    The file must be on a local filesystem, shared by processes of the same host only.
+
+    Args:
+        path (str): Path of the store file, created if missing.
+    """
+
+    def __init__(
+        self,
+        path: str,
+    ) -> None:
+        self.path = path
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < self.size:
+            os.ftruncate(self._fd, self.size)
+
+        self.buffer = mmap.mmap(self._fd, self.size)
+        # flock does not exclude threads sharing the file descriptor
+        self._thread_lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def lock(
+        self,
+    ) -> Iterator[None]:
+        import fcntl
+
+        # flock locks the open file, shared with the parent after a fork, so forked processes open their own
+        if self._pid != os.getpid():
+            fd = os.open(self.path, os.O_RDWR)
+            os.close(self._fd)
+            self._fd = fd
+            self._thread_lock = threading.Lock()
+            self._pid = os.getpid()
+
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(
+        self,
+    ) -> None:
+        self.buffer.close()
+        os.close(self._fd)
+
+    def __reduce__(
+        self,
+    ) -> Any:
+        return (self.__class__, (self.path,))
+
+
+@typechecked
+class DistributedTimeQuota(TimeQuota):
+    """
+    Time quota shared by processes through a `QuotaStore`, enforcing one global budget.
+
+    The first quota attached to an empty store starts the budget, with its *quota*, later ones join it.
+    The elapsed time is the wall clock time (`time.time`) since the budget started, so all processes must run
+    on the same host, and the time per step is the running mean of the steps of all processes. `reset()` resets
+    the local state only, use `QuotaStore.clear` to start a new budget. Takes the same arguments as `TimeQuota`,
+    except *step_aggr_fn*.
+
+    Args:
+        store (QuotaStore): Shared store of the quota.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        store: QuotaStore,
+        **kwargs: Any,
+    ) -> None:
+        if kwargs.get("step_aggr_fn") is not None:
+            raise ValueError(
+                "the time per step of a distributed quota is the shared running mean, step_aggr_fn cannot be given"
+            )
+        self.store = store
+
+        super().__init__(*args, **kwargs)
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Resets local time quota values and joins the shared budget, starting it if the store is empty.
+        """
+
+        with self.store.lock():
+            time_start, quota, *step_stats = self.store.read()
+            if time_start == 0:
+                time_start, quota = _clock(), self.quota
+                self.store.write(time_start, quota, 0, 0, 0)
+
+        super().reset()
+
+        self.quota = quota
+        self._sync(time_start, quota, *step_stats)
+
+    def _sync(
+        self,
+        time_start: float,
+        quota: float,
+        steps: float,
+        step_mean: float,
+        step_m2: float,
+    ) -> None:
+        self.time_elapsed = _clock() - time_start
+        self.time_remaining = quota - self.time_elapsed
+        self.time_per_step = step_mean
+        self.step_stdev = math.sqrt(step_m2 / (steps - 1)) if steps > 1 else 0.0
+        self.shared_steps = int(steps)
+
+    def _update_quota(
+        self,
+        track: bool = False,
+        steps: int = 1,
+    ) -> None:
+        time_now = self.timer_fn()
+        time_taken = (time_now - self.time_since) * self._timer_scale
+        self.time_this_step = time_taken / steps
+
+        for hook in self._update_hooks:
+            hook(self, time_now, time_taken, steps)
+
+        with self.store.lock():
+            time_start, quota, count, step_mean, step_m2 = self.store.read()
+
+            if track:
+                # welford update of the shared step statistics, weighted by the steps
+                count += steps
+                delta = self.time_this_step - step_mean
+                step_mean += delta * steps / count
+                step_m2 += delta * (self.time_this_step - step_mean) * steps
+                self.store.write(time_start, quota, count, step_mean, step_m2)
+
+        self._sync(time_start, quota, count, step_mean, step_m2)
+        # elapsed time is the shared wall time, including the time charged by sub-quotas
+        self._time_charged = 0
+        self.overflow = bool(self.time_remaining < 0)
+
+        if track:
+            for hook in self._track_hooks:
+                hook(self, time_now, time_taken, steps)
+            self.steps_done += steps
+            if self._prior_steps is not None:
+                self._prior_steps.update_many(self.time_this_step, steps)
+            self.time_steps.append(self.time_this_step)
+            if self.predictor is not None:
+                self.predictor.update_many(self.time_this_step, steps)
+            self.predicted_overflow = self._predict_overflow(steps)
+
+        self.time_exceeded = bool(self.overflow or self.predicted_overflow)
@@ -0,0 +1,232 @@
+"""
+Hard deadline enforcement for `timequota.TimeQuota`.
+"""
+
+import os
+import time
+import ctypes
+import signal
+import threading
+from contextlib import ContextDecorator
+from typing import Any, Callable, Optional
+
+from .exceptions import QuotaExceeded
+
+
+class QuotaEnforcer(ContextDecorator):
+    """
+    Context manager and decorator interrupting the enclosed code when the quota runs out, created by `timequota.TimeQuota.enforce`.
+
+    In the main thread a `signal.setitimer` real time timer raises `QuotaExceeded` from the SIGALRM handler. In other threads
+    a watchdog `threading.Timer` raises it asynchronously in the enforced thread, which is only checked between bytecodes,
+    so a blocking C call is interrupted once it returns. The time taken is charged against the quota on exit, without ending
+    its current step, and no polling is done. Nested enforcers restore the timer of the enclosing one on exit, and a SIGALRM
+    handler set before is called, or its default or ignore action taken, when its own timer is due. Every call of a decorated
+    function is enforced separately.
+
+    Args:
+        tq (TimeQuota): Time quota enforced.
+        predicted (bool, optional): Interrupt as soon as the quota is predicted to be exhausted, leaving one time step of the quota. Defaults to False.
+        time_exceeded_fn (Optional[Callable], optional): Function to be executed when time exceeds, instead of raising `QuotaExceeded`. It runs in the signal handler, or in the watchdog thread. Defaults to None.
+        verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        tq: Any,
+        *,
+        predicted: bool = False,
+        time_exceeded_fn: Optional[Callable] = None,
+        verbose: bool = True,
+    ) -> None:
+        self.tq = tq
+        self.predicted = predicted
+        self.time_exceeded_fn = time_exceeded_fn
+        self.verbose = verbose
+
+        self.expired: bool = False
+        self._time_start: float = 0
+        self._lock = threading.Lock()
+        self._active: bool = False
+        self._thread_id: int = 0
+        self._watchdog: Optional[threading.Timer] = None
+        self._signal_handler: Any = None
+        # enclosing signal timer, due before or after this one
+        self._deadline: float = 0
+        self._outer_deadline: Optional[float] = None
+        self._outer_expired: bool = False
+
+    def _recreate_cm(
+        self,
+    ) -> "QuotaEnforcer":
+        # a decorated function may run concurrently or recursively, each call gets its own timer
+        return self.__class__(
+            self.tq,
+            predicted=self.predicted,
+            time_exceeded_fn=self.time_exceeded_fn,
+            verbose=self.verbose,
+        )
+
+    def _get_exception(
+        self,
+    ) -> QuotaExceeded:
+        return QuotaExceeded(f"{self.tq.name} time quota exceeded")
+
+    def _get_exception_type(
+        self,
+    ) -> type:
+        # asynchronous exceptions are set as a class and raised without arguments, the subclass adds the message
+        message = f"{self.tq.name} time quota exceeded"
+
+        def __init__(exc: QuotaExceeded, *args: Any) -> None:
+            QuotaExceeded.__init__(exc, *(args or (message,)))
+
+        return type(
+            QuotaExceeded.__name__,
+            (QuotaExceeded,),
+            {"__init__": __init__, "__module__": QuotaExceeded.__module__},
+        )
+
+    def _call_signal_handler(
+        self,
+        signum: int,
+        frame: Any,
+    ) -> None:
+        # hands the signal over to the handler set before this enforcer
+        if self._signal_handler == signal.SIG_IGN:
+            return
+        if self._signal_handler == signal.SIG_DFL:
+            # the default action of SIGALRM terminates the process
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+            return
+        self._signal_handler(signum, frame)
+
+    def _handle_signal(
+        self,
+        signum: int,
+        frame: Any,
+    ) -> None:
+        if not self._active:
+            return
+
+        if self._outer_deadline is not None and not self._outer_expired:
+            time_now = time.monotonic()
+            if time_now < self._deadline:
+                # the enclosing timer is due first, this one is rearmed before handing over
+                self._outer_expired = True
+                signal.setitimer(signal.ITIMER_REAL, self._deadline - time_now)
+                self._call_signal_handler(signum, frame)
+                return
+
+        self.expired = True
+        if self.time_exceeded_fn is not None:
+            self.time_exceeded_fn()
+        else:
+            raise self._get_exception()
+
+    def _expire_thread(
+        self,
+    ) -> None:
+        if self.time_exceeded_fn is not None:
+            with self._lock:
+                if not self._active:
+                    return
+                self.expired = True
+            self.time_exceeded_fn()
+            return
+
+        with self._lock:
+            if self._active:
+                self.expired = True
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread_id),
+                    ctypes.py_object(self._get_exception_type()),
+                )
+
+    def __enter__(
+        self,
+    ) -> "QuotaEnforcer":
+        self.expired = False
+        self._time_start = self.tq.timer_fn()
+
+        delay = self.tq._get_time_remaining_now()
+        if self.predicted:
+            delay -= self.tq._estimate_time(1)
+
+        if self.tq.time_exceeded or delay <= 0:
+            self.expired = True
+            if self.time_exceeded_fn is None:
+                raise self._get_exception()
+            self.time_exceeded_fn()
+            return self
+
+        if delay == float("inf"):
+            return self
+
+        self._active = True
+        self._thread_id = threading.get_ident()
+        if (
+            hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        ):
+            time_now = time.monotonic()
+            self._deadline = time_now + delay
+            self._outer_expired = False
+            # a handler not set from python is restored as the default one
+            signal_handler = signal.signal(signal.SIGALRM, self._handle_signal)
+            self._signal_handler = (
+                signal.SIG_DFL if signal_handler is None else signal_handler
+            )
+            outer_delay, _ = signal.setitimer(signal.ITIMER_REAL, delay)
+            self._outer_deadline = None
+            if outer_delay > 0:
+                self._outer_deadline = time_now + outer_delay
+                if outer_delay < delay:
+                    signal.setitimer(signal.ITIMER_REAL, outer_delay)
+        else:
+            self._watchdog = threading.Timer(delay, self._expire_thread)
+            self._watchdog.daemon = True
+            self._watchdog.start()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Any,
+        exc: Any,
+        tb: Any,
+    ) -> Optional[bool]:
+        with self._lock:
+            was_active = self._active
+            self._active = False
+
+            if self._signal_handler is not None:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, self._signal_handler)
+                self._signal_handler = None
+
+                # the enclosing timer is rearmed for its remaining time, firing at once if it is already due
+                if self._outer_deadline is not None and not self._outer_expired:
+                    signal.setitimer(
+                        signal.ITIMER_REAL,
+                        max(self._outer_deadline - time.monotonic(), 1e-6),
+                    )
+                self._outer_deadline = None
+
+            if self._watchdog is not None:
+                self._watchdog.cancel()
+                self._watchdog = None
+
+                # the enclosed code finished before an injected exception was raised
+                if was_active and self.expired and exc_type is None:
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                        ctypes.c_ulong(self._thread_id), None
+                    )
+
+        self.tq._charge_since(self._time_start, self.verbose)
+        if was_active and self.expired and not self.predicted:
+            # the timers run on their own clock, the quota clock may read a hair short of the quota when they fire
+            self.tq.overflow = self.tq.time_exceeded = True
+
+        return None
@@ -0,0 +1,9 @@
+"""
+Exceptions raised by `timequota`.
+"""
+
+
+class QuotaExceeded(TimeoutError):
+    """
+    Raised when the time quota runs out while it is enforced, or when quota limited code is called with the quota already exceeded.
+    """
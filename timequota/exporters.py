@@ -0,0 +1,276 @@
+"""
+Machine readable exports of `timequota.TimeQuota` state.
+
+`timequota.TimeQuota.snapshot` returns a `QuotaSnapshot` of the quota state without any string formatting, exporters
+write snapshots as OpenMetrics (Prometheus) text, StatsD gauges over UDP, or JSON lines.
+"""
+
+import json
+import math
+import socket
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+class QuotaSnapshot(NamedTuple):
+    """
+    State of a time quota at its last update, times in seconds.
+    """
+
+    name: str
+    timestamp: float
+    quota: float
+    time_elapsed: float
+    time_remaining: float
+    time_per_step: float
+    time_this_step: float
+    steps_done: int
+    overflow: bool
+    predicted_overflow: bool
+    time_exceeded: bool
+
+
+# exported numeric fields, with their metric name and type
+_metrics: List[Tuple[str, str, str]] = [
+    ("quota", "quota_seconds", "gauge"),
+    ("time_elapsed", "elapsed_seconds", "gauge"),
+    ("time_remaining", "remaining_seconds", "gauge"),
+    ("time_per_step", "time_per_step_seconds", "gauge"),
+    ("time_this_step", "time_this_step_seconds", "gauge"),
+    ("steps_done", "steps", "counter"),
+    ("overflow", "overflow", "gauge"),
+    ("predicted_overflow", "predicted_overflow", "gauge"),
+    ("time_exceeded", "time_exceeded", "gauge"),
+]
+
+
+def _format_value(
+    value: float,
+) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_label(
+    value: str,
+) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_statsd_name(
+    value: str,
+) -> str:
+    # ':' and '|' delimit the value and type of a metric, and lines separate metrics
+    for char in ":|\r\n":
+        value = value.replace(char, "_")
+    return value
+
+
+class Exporter:
+    """
+    Base class for snapshot exporters, called with a `QuotaSnapshot`.
+    """
+
+    def export(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> None:
+        """
+        Exports a snapshot.
+
+        Args:
+            snapshot (QuotaSnapshot): Snapshot of a time quota.
+        """
+
+        raise NotImplementedError
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Releases the resources of the exporter.
+        """
+
+    def __call__(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> None:
+        self.export(snapshot)
+
+    def __enter__(
+        self,
+    ) -> "Exporter":
+        return self
+
+    def __exit__(
+        self,
+        *args: Any,
+    ) -> None:
+        self.close()
+
+
+class OpenMetricsExporter(Exporter):
+    """
+    Keeps the latest snapshot of every quota by name, rendered as OpenMetrics text exposition by `render()`, to be served to Prometheus scrapes.
+
+    Args:
+        prefix (str, optional): Prefix of the metric names. Defaults to 'timequota'.
+    """
+
+    content_type = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+    def __init__(
+        self,
+        prefix: str = "timequota",
+    ) -> None:
+        self.prefix = prefix
+        self.snapshots: dict = {}
+
+    def export(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> None:
+        self.snapshots[snapshot.name] = snapshot
+
+    def render(
+        self,
+    ) -> str:
+        """
+        Returns:
+            str: OpenMetrics text exposition of the latest snapshots.
+        """
+
+        lines = []
+        for field, metric, metric_type in _metrics:
+            name = f"{self.prefix}_{metric}"
+            lines.append(f"# TYPE {name} {metric_type}")
+            sample = f"{name}_total" if metric_type == "counter" else name
+            for snapshot in self.snapshots.values():
+                value = _format_value(getattr(snapshot, field))
+                lines.append(
+                    f'{sample}{{name="{_escape_label(snapshot.name)}"}} {value}'
+                )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class StatsdExporter(Exporter):
+    """
+    Sends snapshots as StatsD gauges over UDP, one datagram per snapshot, named '<prefix>.<quota name>.<field>'.
+
+    Args:
+        host (str, optional): StatsD server host. Defaults to '127.0.0.1'.
+        port (int, optional): StatsD server port. Defaults to 8125.
+        prefix (str, optional): Prefix of the metric names. Defaults to 'timequota'.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        prefix: str = "timequota",
+    ) -> None:
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def format(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> bytes:
+        """
+        Args:
+            snapshot (QuotaSnapshot): Snapshot of a time quota.
+
+        Returns:
+            bytes: StatsD datagram of the snapshot, infinite values are left out.
+        """
+
+        name = f"{self.prefix}.{_escape_statsd_name(snapshot.name)}"
+        lines = []
+        for field, _, _ in _metrics:
+            value = float(getattr(snapshot, field))
+            if math.isinf(value):
+                continue
+            # a signed gauge value is a change of the gauge, a negative value is set by first resetting it to 0
+            if value < 0:
+                lines.append(f"{name}.{field}:0|g")
+            lines.append(f"{name}.{field}:{value!r}|g")
+        return "\n".join(lines).encode()
+
+    def export(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> None:
+        self._socket.sendto(self.format(snapshot), self.address)
+
+    def close(
+        self,
+    ) -> None:
+        self._socket.close()
+
+
+class JsonLinesExporter(Exporter):
+    """
+    Writes snapshots as strict JSON lines to a file, with the infinite times of unbounded quotas written as null.
+
+    Args:
+        file (Union[str, IO[str]]): Path of the file appended to, or an open text file.
+        flush (bool, optional): Flush the file after every snapshot. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        file: Union[str, IO[str]],
+        flush: bool = True,
+    ) -> None:
+        self._owned = isinstance(file, str)
+        self.file: IO[str] = open(file, "a") if isinstance(file, str) else file
+        self.flush = flush
+
+    def export(
+        self,
+        snapshot: QuotaSnapshot,
+    ) -> None:
+        # Infinity is not valid JSON, readers of other languages reject it
+        record = {
+            key: None if isinstance(value, float) and math.isinf(value) else value
+            for key, value in snapshot._asdict().items()
+        }
+        self.file.write(json.dumps(record, allow_nan=False) + "\n")
+        if self.flush:
+            self.file.flush()
+
+    def close(
+        self,
+    ) -> None:
+        if self._owned:
+            self.file.close()
+
+
+def read_json_lines(
+    path: str,
+    name: Optional[str] = None,
+) -> List[QuotaSnapshot]:
+    """
+    Reads the snapshots written by a `JsonLinesExporter`, null times being read back as infinite.
+
+    Args:
+        path (str): Path of the file.
+        name (Optional[str], optional): Only read snapshots of quotas with this name. Defaults to None.
+
+    Returns:
+        List[QuotaSnapshot]: Snapshots in the file.
+    """
+
+    snapshots = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record: Dict[str, Any] = json.loads(line)
+            for key, value in record.items():
+                if value is None:
+                    record[key] = float("inf")
+            snapshots.append(QuotaSnapshot(**record))
+    return [s for s in snapshots if name is None or s.name == name]
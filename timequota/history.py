@@ -0,0 +1,128 @@
+"""
+Compact storage for tracked time steps.
+
+Steps are stored unboxed in an `array('d')`, either growing without bound, as a fixed-size ring buffer
+keeping only the latest steps, or not at all when only streaming aggregates are needed. Plain *step_aggr_fn* callables
+are given the kept steps as a list, so they aggregate over the latest steps only, while `timequota.StepAggregator`
+instances, including the default mean, stream over every step.
+"""
+
+from array import array
+from itertools import chain, islice
+from typing import Any, Iterator, List, Optional, Union
+
+
+class StepHistory:
+    """
+    Array backed history of time steps, used as `timequota.TimeQuota.time_steps`.
+
+    Clearing the history keeps its buffer allocated, so reset quotas reuse the same memory.
+
+    Args:
+        maxlen (Optional[int], optional): Number of latest steps kept, 0 keeps none. Defaults to None, keeping every step.
+    """
+
+    def __init__(
+        self,
+        maxlen: Optional[int] = None,
+    ) -> None:
+        if maxlen is not None and maxlen < 0:
+            raise ValueError(f"maxlen must be None or non-negative, got {maxlen!r}")
+
+        self.maxlen = maxlen
+        self._buffer = array("d", bytes(8 * maxlen) if maxlen else b"")
+        self._len = 0
+        self._head = 0
+
+    def append(
+        self,
+        step: float,
+    ) -> None:
+        """
+        Appends a time step, overwriting the oldest one if the history is full.
+        """
+
+        if self.maxlen is None:
+            if self._len < len(self._buffer):
+                self._buffer[self._len] = step
+            else:
+                self._buffer.append(step)
+            self._len += 1
+        elif self.maxlen:
+            self._buffer[self._head] = step
+            self._head = (self._head + 1) % self.maxlen
+            if self._len < self.maxlen:
+                self._len += 1
+
+    def clear(
+        self,
+    ) -> None:
+        """
+        Removes all time steps, keeping the allocated buffer for reuse.
+        """
+
+        self._len = 0
+        self._head = 0
+
+    def tolist(
+        self,
+    ) -> List[float]:
+        """
+        Returns the stored time steps as a list, oldest first.
+        """
+
+        return list(self)
+
+    @property
+    def nbytes(
+        self,
+    ) -> int:
+        """
+        int: Size of the allocated step buffer in bytes.
+        """
+
+        return self._buffer.buffer_info()[1] * self._buffer.itemsize
+
+    def __len__(
+        self,
+    ) -> int:
+        return self._len
+
+    def __iter__(
+        self,
+    ) -> Iterator[float]:
+        if self.maxlen and self._len == self.maxlen:
+            return chain(
+                islice(self._buffer, self._head, None),
+                islice(self._buffer, 0, self._head),
+            )
+        return islice(self._buffer, self._len)
+
+    def __getitem__(
+        self,
+        index: Union[int, slice],
+    ) -> Any:
+        if isinstance(index, slice):
+            return self.tolist()[index]
+
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("step history index out of range")
+
+        if self.maxlen and self._len == self.maxlen:
+            index = (self._head + index) % self.maxlen
+        return self._buffer[index]
+
+    def __eq__(
+        self,
+        other: object,
+    ) -> bool:
+        if isinstance(other, (StepHistory, list, tuple, array)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}({self.tolist()!r}, maxlen={self.maxlen!r})"
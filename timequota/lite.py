@@ -0,0 +1,244 @@
+"""
+Lightweight per-request time quotas.
+
+A `QuotaTemplate` holds the preconfigured options of many short-lived quotas, parsed and validated once, and stamps
+out `LiteTimeQuota` instances from a pool. A `LiteTimeQuota` has `__slots__` instead of a `__dict__`, keeps no step
+history and never logs, so acquiring and releasing one allocates nothing once the pool is warm.
+"""
+
+import time
+from typing import Any, Callable, List, Union
+
+from .context import QuotaActivation
+from .timequota import _time_dict, _get_clock
+
+
+class LiteTimeQuota:
+    """
+    Time quota of a single request, created by `QuotaTemplate.acquire()` and returned to its pool by `release()`,
+    or on exit when used as a context manager.
+
+    Supports the `update()` and `track()` calls and the time attributes of `timequota.TimeQuota`, with the time per
+    step kept as a running mean.
+    """
+
+    __slots__ = (
+        "template",
+        "quota",
+        "name",
+        "timer_fn",
+        "_timer_scale",
+        "time_since",
+        "time_elapsed",
+        "time_remaining",
+        "time_per_step",
+        "time_this_step",
+        "steps_done",
+        "overflow",
+        "predicted_overflow",
+        "time_exceeded",
+        "_released",
+    )
+
+    def __init__(
+        self,
+        template: "QuotaTemplate",
+    ) -> None:
+        self.template = template
+        self.quota = template.quota
+        self.name = template.name
+        self.timer_fn = template.timer_fn
+        self._timer_scale = template._timer_scale
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Resets time quota to initial values.
+        """
+
+        self.time_elapsed: float = 0
+        self.time_remaining: float = self.quota
+        self.time_per_step: float = 0
+        self.time_this_step: float = 0
+        self.steps_done: int = 0
+        self.overflow: bool = False
+        self.predicted_overflow: bool = False
+        self.time_exceeded: bool = False
+        self._released: bool = False
+        self.time_since: float = self.timer_fn()
+
+    def _update_quota(
+        self,
+        time_now: float,
+    ) -> float:
+        time_taken = (time_now - self.time_since) * self._timer_scale
+        self.time_since = time_now
+        self.time_elapsed += time_taken
+        self.time_remaining -= time_taken
+        self.overflow = self.time_remaining < 0
+        return time_taken
+
+    def _get_time_remaining_now(
+        self,
+    ) -> float:
+        return (
+            self.time_remaining
+            - (self.timer_fn() - self.time_since) * self._timer_scale
+        )
+
+    def update(
+        self,
+    ) -> bool:
+        """
+        Updates the quota considering the time taken from its last update to call.
+
+        Returns:
+            bool: States if quota is exceeded.
+        """
+
+        self._update_quota(self.timer_fn())
+        self.time_exceeded = self.overflow or self.predicted_overflow
+        return self.time_exceeded
+
+    def track(
+        self,
+        *,
+        steps: int = 1,
+    ) -> bool:
+        """
+        Tracks the time taken every call, also used for quota overflow prediction.
+
+        Args:
+            steps (int, optional): Number of steps taken since the last call, the time taken is amortized over them. Defaults to 1.
+
+        Returns:
+            bool: States if quota is exceeded.
+        """
+
+        time_taken = self._update_quota(self.timer_fn())
+        self.time_this_step = time_taken / steps
+        self.steps_done += steps
+        # running mean of the time per step, weighted by the steps
+        self.time_per_step += (
+            (self.time_this_step - self.time_per_step) * steps / self.steps_done
+        )
+        self.predicted_overflow = self.time_per_step * steps > self.time_remaining
+        self.time_exceeded = self.overflow or self.predicted_overflow
+        return self.time_exceeded
+
+    def activate(
+        self,
+    ) -> QuotaActivation:
+        """
+        Context manager making this quota the current one, see `timequota.TimeQuota.activate`.
+        """
+
+        return QuotaActivation(self)
+
+    def release(
+        self,
+    ) -> None:
+        """
+        Returns the quota to the pool of its template, it must not be used afterwards.
+        """
+
+        if self._released:
+            raise ValueError(f"{self!r} is already released")
+        self._released = True
+        self.template.release(self)
+
+    def __enter__(
+        self,
+    ) -> "LiteTimeQuota":
+        return self
+
+    def __exit__(
+        self,
+        *args: Any,
+    ) -> None:
+        self.release()
+
+    def __repr__(
+        self,
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"(name={self.name!r}, time_remaining={self.time_remaining!r}, steps_done={self.steps_done!r})"
+        )
+
+
+class QuotaTemplate:
+    """
+    Factory of preconfigured `LiteTimeQuota` instances, recycled through a pool. Usually created by `timequota.TimeQuota.template`.
+    Acquiring and releasing quotas is thread safe.
+
+    Args:
+        quota (float): Maximum time limit of every quota.
+        unit (str, optional): Unit of time of *quota* given, can be one of 's', 'm' or 'h' for seconds, minutes, or hours respectively. Defaults to 's'.
+        name (str, optional): Custom name of the quotas. Defaults to 'tq'.
+        timer_fn (Union[str, Callable[[], float]], optional): Timer of the quotas, or a `time` clock name. Defaults to time.perf_counter.
+        pool_size (int, optional): Maximum number of released quotas kept for reuse. Defaults to 1024.
+    """
+
+    def __init__(
+        self,
+        quota: float,
+        unit: str = "s",
+        *,
+        name: str = "tq",
+        timer_fn: Union[str, Callable[[], float]] = time.perf_counter,
+        pool_size: int = 1024,
+    ) -> None:
+        unit = unit.lower()
+        if unit not in _time_dict:
+            raise ValueError(f"unit must be one of {list(_time_dict)}, got {unit!r}")
+        if pool_size < 0:
+            raise ValueError(f"pool_size must not be negative, got {pool_size!r}")
+
+        self.unit = unit
+        self.quota = float(quota) * _time_dict[unit]
+        self.name = name
+        self.timer_fn, self._timer_scale = _get_clock(timer_fn)
+        self.pool_size = pool_size
+        self._pool: List[LiteTimeQuota] = []
+
+    def acquire(
+        self,
+    ) -> LiteTimeQuota:
+        """
+        Returns:
+            LiteTimeQuota: Quota started now, from the pool if any.
+        """
+
+        try:
+            tq = self._pool.pop()
+        except IndexError:
+            return LiteTimeQuota(self)
+        tq.reset()
+        return tq
+
+    def release(
+        self,
+        tq: LiteTimeQuota,
+    ) -> None:
+        """
+        Returns *tq* to the pool, called by `LiteTimeQuota.release()`.
+        """
+
+        if len(self._pool) < self.pool_size:
+            self._pool.append(tq)
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._pool)
+
+    def __repr__(
+        self,
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"({self.quota / _time_dict[self.unit]!r}, {self.unit!r}, name={self.name!r}, timer_fn={self.timer_fn!r}, pool_size={self.pool_size!r})"
+        )
@@ -0,0 +1,51 @@
+"""
+Executor helpers for `timequota.TimeQuota.map`.
+"""
+
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple, Union
+
+_executor_dict = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def get_executor(
+    executor: Union[str, Executor],
+    workers: Optional[int] = None,
+) -> Tuple[Executor, int, bool]:
+    """
+    Returns the executor, its number of workers, and whether it was created here and should be shut down by the caller.
+    """
+
+    if isinstance(executor, Executor):
+        if workers is None:
+            workers = getattr(executor, "_max_workers", None) or 1
+        return executor, workers, False
+
+    if executor not in _executor_dict:
+        raise ValueError(
+            f"executor must be one of {list(_executor_dict)} or an Executor, got {executor!r}"
+        )
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return _executor_dict[executor](workers), workers, True
+
+
+def timed_call(
+    fn: Callable[[Any], Any],
+    item: Any,
+    timer_fn: Callable[[], float],
+    timer_scale: float = 1,
+) -> Tuple[float, Any]:
+    """
+    Calls *fn* on *item* in the worker, returning the time taken in seconds on the quota clock *timer_fn*, with
+    values scaled by *timer_scale*, along with the result. *timer_fn* must be picklable for process executors.
+    """
+
+    time_since = timer_fn()
+    result = fn(item)
+    return (timer_fn() - time_since) * timer_scale, result
@@ -0,0 +1,382 @@
+"""
+Pluggable overflow predictors.
+
+Predictors see every tracked time step incrementally and decide if the next steps will overflow the
+remaining quota, in constant time per step. They can be passed as *predictor* to `timequota.TimeQuota`,
+which otherwise predicts an overflow when the aggregated time per step exceeds the remaining time.
+"""
+
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+from .aggregators import P2Quantile
+
+
+class OverflowPredictor:
+    """
+    Base class for overflow predictors.
+
+    Subclasses implement `update()`, `reset()` and `estimate()`. Predictors hold state, so every quota should be given its own instance.
+    """
+
+    # attributes of the running statistics, see get_state()
+    _state_attrs: Optional[Tuple[str, ...]] = None
+
+    def update(
+        self,
+        step: float,
+    ) -> None:
+        """
+        Adds a time step to the predictor.
+
+        Args:
+            step (float): Time taken by the step.
+        """
+
+        raise NotImplementedError
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> None:
+        """
+        Adds *count* time steps taking *step* each, like the steps amortized by `timequota.TimeQuota.track`.
+        Calls `update()` for every step unless overridden.
+
+        Args:
+            step (float): Time taken by each step.
+            count (int): Number of steps.
+        """
+
+        for _ in range(count):
+            self.update(step)
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Resets the predictor to its initial state.
+        """
+
+        raise NotImplementedError
+
+    def estimate(
+        self,
+        time_per_step: float,
+        steps: int = 1,
+    ) -> float:
+        """
+        Estimates the time taken by the next steps.
+
+        Args:
+            time_per_step (float): Time per step aggregated by the quota *step_aggr_fn*.
+            steps (int, optional): Number of next steps. Defaults to 1.
+
+        Returns:
+            float: Estimated time taken by the next steps.
+        """
+
+        raise NotImplementedError
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        """
+        Starts the predictor from the step statistics of previous runs, as kept by `timequota.StepPriorCache`.
+        Does nothing unless overridden.
+
+        Args:
+            count (int): Number of previous steps.
+            mean (float): Mean time of the previous steps.
+            m2 (float, optional): Sum of squared deviations of the previous steps from their mean. Defaults to 0.
+        """
+
+    def get_state(
+        self,
+    ) -> Dict[str, Any]:
+        """
+        Returns the running statistics of the predictor as JSON serializable values, to be restored by `set_state()`.
+        Options are not part of the state. Subclasses list their statistics in `_state_attrs`, all attributes are saved otherwise.
+        """
+
+        if self._state_attrs is None:
+            return copy.deepcopy(vars(self))
+        return {name: copy.deepcopy(getattr(self, name)) for name in self._state_attrs}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        """
+        Restores the running statistics returned by `get_state()`, keeping the options of the predictor.
+        """
+
+        if self._state_attrs is None:
+            vars(self).update(copy.deepcopy(state))
+            return
+        for name in self._state_attrs:
+            if name in state:
+                setattr(self, name, copy.deepcopy(state[name]))
+
+    def predict(
+        self,
+        time_remaining: float,
+        time_per_step: float,
+        steps: int = 1,
+    ) -> bool:
+        """
+        Predicts if the next steps will overflow the remaining time.
+
+        Args:
+            time_remaining (float): Remaining time of the quota.
+            time_per_step (float): Time per step aggregated by the quota *step_aggr_fn*.
+            steps (int, optional): Number of next steps. Defaults to 1.
+
+        Returns:
+            bool: States if the quota is predicted to overflow.
+        """
+
+        return bool(self.estimate(time_per_step, steps) > time_remaining)
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class LinearTrendPredictor(OverflowPredictor):
+    """
+    Fits a linear trend of the time steps over the step number by online least squares, and extrapolates it
+    over the next steps. Catches loops getting slower over time, like growing caches or GC pressure.
+    """
+
+    _state_attrs = ("count", "_mean_x", "_mean_y", "_m2_x", "_c_xy")
+
+    def __init__(
+        self,
+    ) -> None:
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self._mean_x: float = 0.0
+        self._mean_y: float = 0.0
+        self._m2_x: float = 0.0
+        self._c_xy: float = 0.0
+
+    def update(
+        self,
+        step: float,
+    ) -> None:
+        # welford style co-moment updates, x being the step number
+        self.count += 1
+        dx = self.count - self._mean_x
+        self._mean_x += dx / self.count
+        self._mean_y += (step - self._mean_y) / self.count
+        self._m2_x += dx * (self.count - self._mean_x)
+        self._c_xy += dx * (step - self._mean_y)
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        # a single point at the previous mean anchors the trend, without outweighing the steps of this run
+        if count > 0:
+            self.reset()
+            self.update(mean)
+
+    @property
+    def slope(
+        self,
+    ) -> float:
+        """
+        float: Change of the time taken per step, per step.
+        """
+
+        return self._c_xy / self._m2_x if self._m2_x else 0.0
+
+    def estimate(
+        self,
+        time_per_step: float,
+        steps: int = 1,
+    ) -> float:
+        if self.count < 2:
+            return time_per_step * steps
+
+        # sum of the trend line over the next steps, at their mean step number
+        next_x = self.count + (steps + 1) / 2
+        next_step = self._mean_y + self.slope * (next_x - self._mean_x)
+        return max(next_step, 0.0) * steps
+
+
+class QuantilePredictor(OverflowPredictor):
+    """
+    Predicts an overflow if a quantile of the time steps exceeds the remaining time, for example stopping
+    if the P95 of the next step does not fit. Guards against heavy-tailed step times.
+
+    Args:
+        q (float, optional): Quantile of the time steps, in (0, 1). Defaults to 0.95.
+    """
+
+    def __init__(
+        self,
+        q: float = 0.95,
+    ) -> None:
+        self._quantile = P2Quantile(q)
+
+    @property
+    def q(
+        self,
+    ) -> float:
+        """
+        float: Quantile of the time steps.
+        """
+
+        return self._quantile.q
+
+    def reset(
+        self,
+    ) -> None:
+        self._quantile.reset()
+
+    def update(
+        self,
+        step: float,
+    ) -> None:
+        self._quantile.update(step)
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> None:
+        self._quantile.update_many(step, count)
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        self._quantile.seed(count, mean, m2)
+
+    def get_state(
+        self,
+    ) -> Dict[str, Any]:
+        return self._quantile.get_state()
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        self._quantile.set_state(state)
+
+    def estimate(
+        self,
+        time_per_step: float,
+        steps: int = 1,
+    ) -> float:
+        return self._quantile.value * steps
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}(q={self.q!r})"
+
+
+class SafetyMarginPredictor(OverflowPredictor):
+    """
+    Keeps a safety margin on top of another prediction, scaling the estimated time by *factor* and adding *margin*.
+
+    Args:
+        predictor (Optional[OverflowPredictor], optional): Predictor estimating the next steps. Defaults to None, using the quota time per step.
+        margin (float, optional): Time in seconds added to the estimate. Defaults to 0.
+        factor (float, optional): Factor the estimate is multiplied by. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        predictor: Optional[OverflowPredictor] = None,
+        *,
+        margin: float = 0.0,
+        factor: float = 1.0,
+    ) -> None:
+        if margin < 0 or factor <= 0:
+            raise ValueError(
+                f"margin must be non-negative and factor positive, got {margin!r} and {factor!r}"
+            )
+
+        self.predictor = predictor
+        self.margin = margin
+        self.factor = factor
+
+    def reset(
+        self,
+    ) -> None:
+        if self.predictor is not None:
+            self.predictor.reset()
+
+    def update(
+        self,
+        step: float,
+    ) -> None:
+        if self.predictor is not None:
+            self.predictor.update(step)
+
+    def update_many(
+        self,
+        step: float,
+        count: int,
+    ) -> None:
+        if self.predictor is not None:
+            self.predictor.update_many(step, count)
+
+    def seed(
+        self,
+        count: int,
+        mean: float,
+        m2: float = 0.0,
+    ) -> None:
+        if self.predictor is not None:
+            self.predictor.seed(count, mean, m2)
+
+    def get_state(
+        self,
+    ) -> Dict[str, Any]:
+        if self.predictor is None:
+            return {}
+        return {"predictor": self.predictor.get_state()}
+
+    def set_state(
+        self,
+        state: Dict[str, Any],
+    ) -> None:
+        if self.predictor is not None and "predictor" in state:
+            self.predictor.set_state(state["predictor"])
+
+    def estimate(
+        self,
+        time_per_step: float,
+        steps: int = 1,
+    ) -> float:
+        if self.predictor is None:
+            estimate = time_per_step * steps
+        else:
+            estimate = self.predictor.estimate(time_per_step, steps)
+        return estimate * self.factor + self.margin
+
+    def __repr__(
+        self,
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"({self.predictor!r}, margin={self.margin!r}, factor={self.factor!r})"
+        )
@@ -0,0 +1,200 @@
+"""
+Step time priors cached across runs.
+
+A `StepPriorCache` keeps the step time statistics of quotas by name in an SQLite database, so a new quota with the same
+name predicts overflow from its first step, the prior weighing as at most *prior_weight* steps. Entries not updated for *ttl* seconds expire, and the least recently used
+entries are evicted beyond *max_entries*.
+"""
+
+import math
+import time
+import threading
+from typing import NamedTuple, Optional
+
+
+class StepPrior(NamedTuple):
+    """
+    Step time statistics of previous runs.
+    """
+
+    n_steps: int
+    mean: float
+    m2: float
+
+    @property
+    def stdev(
+        self,
+    ) -> float:
+        """
+        float: Sample standard deviation of the steps.
+        """
+
+        return math.sqrt(self.m2 / (self.n_steps - 1)) if self.n_steps > 1 else 0.0
+
+    def downweight(
+        self,
+        n_steps: int,
+    ) -> "StepPrior":
+        """
+        Returns the prior weighing as at most *n_steps* steps, with the same mean and standard deviation.
+        """
+
+        n_steps = max(n_steps, 1)
+        if self.n_steps <= n_steps:
+            return self
+        return StepPrior(
+            n_steps, self.mean, self.m2 * (n_steps - 1) / (self.n_steps - 1)
+        )
+
+
+class StepPriorCache:
+    """
+    SQLite cache of step time priors keyed by quota name, passed as *prior_cache* to `timequota.TimeQuota`.
+
+    Args:
+        path (str): Path of the SQLite database, created if missing. ':memory:' keeps it in memory.
+        max_entries (int, optional): Maximum number of names kept, least recently used ones are evicted. Defaults to 1024.
+        ttl (Optional[float], optional): Seconds after their last update entries expire. Defaults to None, never expiring.
+        max_count (Optional[int], optional): Maximum weight in steps of the cached statistics when merging new runs, so recent runs are not outweighed by old ones. Defaults to 10000.
+        prior_weight (Optional[int], optional): Maximum weight in steps of the prior seeding a quota, so the steps of the run soon outweigh it. Defaults to 10, None seeding the whole cached weight.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        max_count: Optional[int] = 10_000,
+        prior_weight: Optional[int] = 10,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries!r}")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_count = max_count
+        self.prior_weight = prior_weight
+
+        import sqlite3
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS priors ("
+                "name TEXT PRIMARY KEY, count INTEGER, mean REAL, m2 REAL, updated_at REAL, accessed_at REAL)"
+            )
+
+    def _expire(
+        self,
+        now: float,
+    ) -> None:
+        if self.ttl is not None:
+            self._connection.execute(
+                "DELETE FROM priors WHERE updated_at < ?", (now - self.ttl,)
+            )
+
+    def get(
+        self,
+        name: str,
+    ) -> Optional[StepPrior]:
+        """
+        Returns the step time prior of *name*, None if missing or expired.
+        """
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._expire(now)
+            row = self._connection.execute(
+                "SELECT count, mean, m2 FROM priors WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE priors SET accessed_at = ? WHERE name = ?", (now, name)
+            )
+        return StepPrior(*row)
+
+    def update(
+        self,
+        name: str,
+        prior: StepPrior,
+    ) -> None:
+        """
+        Merges the step time statistics of a run into the prior of *name*, evicting expired and least recently used entries.
+        """
+
+        if prior.n_steps < 1:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._expire(now)
+            row = self._connection.execute(
+                "SELECT count, mean, m2 FROM priors WHERE name = ?", (name,)
+            ).fetchone()
+            if row is not None:
+                prior = self._merge(StepPrior(*row), prior)
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO priors VALUES (?, ?, ?, ?, ?, ?)",
+                (name, *prior, now, now),
+            )
+            self._connection.execute(
+                "DELETE FROM priors WHERE name IN "
+                "(SELECT name FROM priors ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _merge(
+        self,
+        a: StepPrior,
+        b: StepPrior,
+    ) -> StepPrior:
+        # downweights the cached statistics beyond max_count steps
+        if self.max_count is not None:
+            a = a.downweight(self.max_count - b.n_steps)
+
+        # parallel combination of the two sets of statistics (Chan et al.)
+        n_steps = a.n_steps + b.n_steps
+        delta = b.mean - a.mean
+        mean = a.mean + delta * b.n_steps / n_steps
+        m2 = a.m2 + b.m2 + delta * delta * a.n_steps * b.n_steps / n_steps
+        return StepPrior(n_steps, mean, m2)
+
+    def delete(
+        self,
+        name: str,
+    ) -> None:
+        """
+        Removes the prior of *name*.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM priors WHERE name = ?", (name,))
+
+    def __len__(
+        self,
+    ) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM priors").fetchone()[0]
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Closes the database connection.
+        """
+
+        self._connection.close()
+
+    def __repr__(
+        self,
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"({self.path!r}, max_entries={self.max_entries!r}, ttl={self.ttl!r}, max_count={self.max_count!r}, "
+            f"prior_weight={self.prior_weight!r})"
+        )
@@ -0,0 +1,110 @@
+"""
+Named code sections timed against a `timequota.TimeQuota`.
+"""
+
+from contextlib import ContextDecorator
+from typing import Any, List
+
+
+class SectionStats:
+    """
+    Aggregate statistics of the time taken by a code section, updated in constant time and memory per call.
+    """
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(
+        self,
+    ) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def update(
+        self,
+        time_taken: float,
+    ) -> None:
+        """
+        Adds the time taken by a call of the section.
+
+        Args:
+            time_taken (float): Time taken by the call.
+        """
+
+        self.count += 1
+        self.total += time_taken
+        if time_taken > self.max:
+            self.max = time_taken
+
+    @property
+    def mean(
+        self,
+    ) -> float:
+        """
+        float: Mean time taken per call.
+        """
+
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(
+        self,
+    ) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"(count={self.count!r}, total={self.total!r}, max={self.max!r})"
+        )
+
+
+class QuotaSection(ContextDecorator):
+    """
+    Context manager and decorator timing a named code section, created by `timequota.TimeQuota.section`.
+
+    The time taken by every call is added to the section statistics in *tq.sections* and charged against the quota on exit,
+    like the time of a sub-quota, so the current step of the quota goes on. Sections can be nested and decorated functions
+    can recurse.
+
+    Args:
+        tq (TimeQuota): Time quota charged.
+        name (str): Name of the section.
+        verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        tq: Any,
+        name: str,
+        *,
+        verbose: bool = True,
+    ) -> None:
+        self.tq = tq
+        self.name = name
+        self.verbose = verbose
+
+        self._time_starts: List[float] = []
+
+    def __enter__(
+        self,
+    ) -> "QuotaSection":
+        self._time_starts.append(self.tq.timer_fn())
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Any,
+        exc: Any,
+        tb: Any,
+    ) -> None:
+        time_start = self._time_starts.pop()
+        time_taken = self.tq._charge_since(time_start, self.verbose)
+
+        stats = self.tq.sections.get(self.name)
+        if stats is None:
+            stats = self.tq.sections[self.name] = SectionStats()
+        stats.update(time_taken)
+
+        if self.tq.trace is not None:
+            self.tq.trace.append(
+                time_start * self.tq._timer_scale,
+                time_taken,
+                self.tq.trace.section_id(self.name),
+            )
@@ -0,0 +1,130 @@
+"""
+Time quota shared by concurrent threads.
+"""
+
+import threading
+from typing import Any
+
+from .timequota import TimeQuota
+from .typechecks import typechecked
+
+
+@typechecked
+class ThreadSafeTimeQuota(TimeQuota):
+    """
+    Time quota that can be shared by threads, enforcing one global wall clock budget.
+
+    Each thread times its own steps, from its previous `update()`/`track()` call or the quota (re)start.
+    The elapsed time is the wall time since the quota (re)start, and steps of all threads are recorded
+    in shared step statistics. Every `update()`/`track()` call, with its logging and checkpointing, runs
+    as a single critical section on the update path of `TimeQuota`.
+    Takes the same arguments as `TimeQuota`, a *cpu_timer_fn* must be a process wide clock like 'process_time'.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._time_start: float = 0
+
+        super().__init__(*args, **kwargs)
+
+    @property
+    def time_since(
+        self,
+    ) -> float:
+        """
+        float: Start time of the current step of the calling thread.
+        """
+
+        return getattr(self._local, "time_since", self._time_start)
+
+    @time_since.setter
+    def time_since(
+        self,
+        value: float,
+    ) -> None:
+        self._local.time_since = value
+
+    @property
+    def time_this_step(
+        self,
+    ) -> float:
+        """
+        float: Time taken by the last step of the calling thread.
+        """
+
+        return getattr(self._local, "time_this_step", 0)
+
+    @time_this_step.setter
+    def time_this_step(
+        self,
+        value: float,
+    ) -> None:
+        self._local.time_this_step = value
+
+    def reset(
+        self,
+    ) -> None:
+        """
+        Resets time quota to initial values, and the step timers of all threads.
+        """
+
+        with self._lock:
+            self._time_start = self.timer_fn()
+            self._local = threading.local()
+            super().reset()
+
+    def update(
+        self,
+        *,
+        verbose: bool = True,
+    ) -> bool:
+        """
+        Updates the quota considering the wall time taken from its (re)start to call.
+
+        Args:
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            bool: States if quota is exceeded.
+        """
+
+        with self._lock:
+            return super().update(verbose=verbose)
+
+    def track(
+        self,
+        *,
+        steps: int = 1,
+        verbose: bool = True,
+    ) -> bool:
+        """
+        Tracks the time taken by the calling thread since its previous call into the shared step statistics, and updates the quota.
+
+        Args:
+            steps (int, optional): Number of steps taken since the last call, the time taken is amortized over them and overflow is predicted for as many steps ahead. Defaults to 1.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            bool: States if quota is exceeded.
+        """
+
+        with self._lock:
+            return super().track(steps=steps, verbose=verbose)
+
+    def _count_time(
+        self,
+        time_now: float,
+        time_taken: float,
+    ) -> None:
+        # elapsed time is the wall time since the start, including the time charged by sub-quotas
+        self._time_charged = 0
+        # threads may get here out of order, elapsed time only moves forward
+        time_elapsed = (time_now - self._time_start) * self._timer_scale
+        if time_elapsed > self.time_elapsed:
+            self.time_elapsed = time_elapsed
+            self.time_remaining = self.quota - time_elapsed
@@ -7,27 +7,95 @@
 [[Changelog]](https://github.com/AravRS/timequota/blob/main/CHANGELOG.md)
 """
 
+from __future__ import annotations
+
+import re
 import sys
+import math
 import time
-from statistics import mean
-
-from tabulate import tabulate
-from colorama import Fore, Style
+import types
+import weakref
+import functools
+from operator import length_hint
 
+from itertools import islice
 from collections import defaultdict
-from typing import Any, List, Iterable, Iterator, Callable, Optional
-from typeguard import typechecked
-
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    List,
+    Iterable,
+    Iterator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Tuple,
+    Optional,
+    Union,
+    cast,
+)
+
+from .aggregators import StepAggregator, RunningMean, Welford
+from .history import StepHistory
+from .predictors import OverflowPredictor
+from .exceptions import QuotaExceeded
+from .sections import SectionStats, QuotaSection
+from .typechecks import typechecked, lazy_type
+
+# tabulate, colorama, typeguard and the modules of optional features are imported by the methods using them,
+# the annotations of optional features refer to stand-ins until their modules are imported
+if TYPE_CHECKING:
+    import logging
+    from concurrent.futures import Executor
+
+    from .aio import QuotaDeadline
+    from .enforce import QuotaEnforcer
+    from .exporters import QuotaSnapshot
+    from .context import QuotaActivation
+    from .lite import LiteTimeQuota, QuotaTemplate
+    from .priors import StepPrior, StepPriorCache
+    from .trace import TraceWriter
+
+    LoggerType = Union[Callable[[str], None], logging.Logger, logging.LoggerAdapter]
+else:
+    Executor = lazy_type("concurrent.futures", "Executor")
+    QuotaDeadline = lazy_type("timequota.aio", "QuotaDeadline")
+    QuotaEnforcer = lazy_type("timequota.enforce", "QuotaEnforcer")
+    QuotaSnapshot = lazy_type("timequota.exporters", "QuotaSnapshot")
+    QuotaActivation = lazy_type("timequota.context", "QuotaActivation")
+    LiteTimeQuota = lazy_type("timequota.lite", "LiteTimeQuota")
+    QuotaTemplate = lazy_type("timequota.lite", "QuotaTemplate")
+    StepPrior = lazy_type("timequota.priors", "StepPrior")
+    StepPriorCache = lazy_type("timequota.priors", "StepPriorCache")
+    TraceWriter = lazy_type("timequota.trace", "TraceWriter")
+
+    Logger = lazy_type("logging", "Logger")
+    LoggerAdapter = lazy_type("logging", "LoggerAdapter")
+    LoggerType = Union[Callable[[str], None], Logger, LoggerAdapter]
 
 # provide compability with python<3.8
 if sys.version_info[1] < 8:
     UnitType = str
     DisplayUnitType = str
+    ExecutorType = str
+    ClockType = str
 else:
     from typing import Literal
 
     UnitType = Literal["s", "m", "h"]
     DisplayUnitType = Literal["s", "m", "h", "p"]
+    ExecutorType = Literal["thread", "process"]
+    ClockType = Literal[
+        "perf_counter",
+        "perf_counter_ns",
+        "process_time",
+        "process_time_ns",
+        "thread_time",
+        "thread_time_ns",
+        "monotonic",
+        "monotonic_ns",
+    ]
 
 
 _time_dict = {
@@ -36,14 +104,115 @@ _time_dict = {
     "h": 3600,
 }
 
-_color_dict = {
-    "g": Fore.GREEN,
-    "c": Fore.CYAN,
-    "y": Fore.YELLOW,
-    "r": Fore.RED,
-    "R": Style.RESET_ALL,
+# clocks by name, with the scale of their values to seconds
+_clock_dict = {
+    "perf_counter": (time.perf_counter, 1),
+    "perf_counter_ns": (time.perf_counter_ns, 1e-9),
+    "process_time": (time.process_time, 1),
+    "process_time_ns": (time.process_time_ns, 1e-9),
+    "thread_time": (time.thread_time, 1),
+    "thread_time_ns": (time.thread_time_ns, 1e-9),
+    "monotonic": (time.monotonic, 1),
+    "monotonic_ns": (time.monotonic_ns, 1e-9),
 }
 
+# target time between quota checks of adaptive strides
+_adaptive_check_time = 1e-3
+
+# logging levels, logging is only imported by custom loggers
+_INFO = 20
+_WARNING = 30
+
+
+# color codes are stripped from the messages of loggers, which may not write to a terminal
+_ansi_pattern = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def _get_logger_types() -> Tuple[type, ...]:
+    # a logger can only have been created once logging is imported
+    logging = sys.modules.get("logging")
+    return () if logging is None else (logging.Logger, logging.LoggerAdapter)
+
+
+_color_dict: Optional[Dict[str, str]] = None
+_no_color_dict: Dict[str, str] = defaultdict(str)
+
+
+def _get_color_dict() -> Dict[str, str]:
+    global _color_dict
+    if _color_dict is None:
+        from colorama import Fore, Style
+
+        _color_dict = {
+            "g": Fore.GREEN,
+            "c": Fore.CYAN,
+            "y": Fore.YELLOW,
+            "r": Fore.RED,
+            "R": Style.RESET_ALL,
+        }
+    return _color_dict
+
+
+def _get_step_aggregator(
+    step_aggr_fn: Optional[Callable[[List[float]], float]],
+) -> Optional[StepAggregator]:
+    # default mean is swapped for its O(1) running equivalent
+    if isinstance(step_aggr_fn, StepAggregator):
+        return step_aggr_fn
+    if step_aggr_fn is None or step_aggr_fn is getattr(
+        sys.modules.get("statistics"), "mean", None
+    ):
+        return RunningMean()
+    return None
+
+
+def _get_clock(
+    clock: Union[str, Callable[[], float]],
+) -> Tuple[Callable[[], float], float]:
+    # returns the timer function and the scale of its values to seconds, nanosecond clocks are kept as integers
+    if isinstance(clock, str):
+        if clock not in _clock_dict:
+            raise ValueError(
+                f"clock must be one of {list(_clock_dict)} or a callable, got {clock!r}"
+            )
+        return _clock_dict[clock]
+    for clock_fn, scale in _clock_dict.values():
+        if clock is clock_fn:
+            return clock_fn, scale
+    return clock, 1
+
+
+# hooks of the optional features in use, run on update with the quota, current time, time taken and number of steps
+_Hook = Callable[[Any, float, float, int], None]
+
+
+def _cpu_time_hook(
+    tq: Any,
+    time_now: float,
+    time_taken: float,
+    steps: int,
+) -> None:
+    tq._update_cpu_time(steps)
+
+
+def _ancestors_hook(
+    tq: Any,
+    time_now: float,
+    time_taken: float,
+    steps: int,
+) -> None:
+    tq._charge_ancestors(time_now, time_taken)
+
+
+def _trace_hook(
+    tq: Any,
+    time_now: float,
+    time_taken: float,
+    steps: int,
+) -> None:
+    # steps end now, tasks of map() end before and do not start at the last update
+    tq.trace.append(time_now * tq._timer_scale - time_taken, time_taken, 0, steps)
+
 
 @typechecked
 class TimeQuota:
@@ -54,9 +223,19 @@ class TimeQuota:
         display_unit: DisplayUnitType = None,
         *,
         name: str = "tq",
-        step_aggr_fn: Callable[[List[float]], float] = mean,
-        timer_fn: Callable[[], float] = time.perf_counter,
-        logger_fn: Optional[Callable[[str], None]] = print,
+        step_aggr_fn: Optional[Callable[[List[float]], float]] = None,
+        history_size: Optional[int] = None,
+        predictor: Optional[OverflowPredictor] = None,
+        prior_cache: Optional[StepPriorCache] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 100,
+        trace: Optional[Union[str, TraceWriter]] = None,
+        timer_fn: Union[ClockType, Callable[[], float]] = time.perf_counter,
+        cpu_timer_fn: Optional[Union[ClockType, Callable[[], float]]] = None,
+        logger_fn: Optional[LoggerType] = print,
+        log_every: Optional[int] = None,
+        log_interval: Optional[float] = None,
+        log_on_change: bool = False,
         precision: int = 4,
         color: bool = True,
         verbose: bool = True,
@@ -67,9 +246,19 @@ class TimeQuota:
             unit (Literal[s, m, h], optional): Unit of time of *quota* given, can be one of 's', 'm' or 'h' for seconds, minutes, or hours respectively . Defaults to 's'.
             display_unit (Literal[s, m, h, p], optional): Unit of time for logging messages, can be one of 's', 'm' or 'h' for seconds, minutes, or hours respectively; or 'p' for pretty format. Defaults to *unit*.
             name (str, optional): Custom name for quota timer. Defaults to 'tq'.
-            step_aggr_fn (Callable[[list[float]], float], optional): Function to aggregate individual time steps, used for overflow prediction. Defaults to mean.
-            timer_fn (Callable[[], float], optional): Function timer called before and after code execution to calculate the time taken. Defaults to time.perf_counter.
-            logger_fn (Optional[Callable[[str], None]], optional): Custom info logger function. Defaults to print.
+            step_aggr_fn (Callable[[list[float]], float], optional): Function aggregating the list of steps kept in *time_steps*, for overflow prediction. A `StepAggregator` is updated in constant time over every step. Defaults to None, the mean.
+            history_size (Optional[int], optional): Number of latest time steps kept in *time_steps* and aggregated by a plain *step_aggr_fn*, in a ring buffer. 0 keeps none, requiring a `StepAggregator`. Defaults to None, keeping every step.
+            predictor (Optional[OverflowPredictor], optional): Predictor of quota overflow, seeing every time step. Defaults to None, predicting an overflow if the time per step exceeds the remaining time.
+            prior_cache (Optional[StepPriorCache], optional): Cache of step time priors by *name*, seeding the step aggregator and predictor on reset, so previous steps weigh in the time per step, and updated with the steps of every run. Defaults to None.
+            checkpoint_path (Optional[str], optional): Path of the checkpoint saved by `track()` every *checkpoint_every* steps, to resume with `TimeQuota.load`. Defaults to None.
+            checkpoint_every (int, optional): Number of tracked steps between checkpoints. Defaults to 100.
+            trace (Optional[Union[str, TraceWriter]], optional): Trace file path, or `TraceWriter`, recording the start and duration of every tracked step and section. A writer created from a path is closed by `close()`. Defaults to None.
+            timer_fn (Union[str, Callable[[], float]], optional): Timer called before and after code execution, or a `time` clock name: 'perf_counter', 'process_time', 'thread_time', 'monotonic' or their '_ns' variants. Defaults to time.perf_counter.
+            cpu_timer_fn (Optional[Union[str, Callable[[], float]]], optional): Second timer accounted alongside *timer_fn* in *cpu_time_elapsed*, usually 'process_time' to compare CPU time with wall time. Defaults to None.
+            logger_fn (Optional[Union[Callable[[str], None], logging.Logger]], optional): Custom info logger function, or a `logging.Logger` logging at INFO and WARNING (time exceeded) levels. Messages are only formatted when emitted. Defaults to print.
+            log_every (Optional[int], optional): Log every *log_every* update or track calls only. Defaults to None.
+            log_interval (Optional[float], optional): Log at most once every *log_interval* seconds of elapsed time. Defaults to None.
+            log_on_change (bool, optional): Log only when the time exceeded state changes. Defaults to False.
             precision (int, optional): Custom value precision for logging messages. Defaults to 4.
             color (bool, optional): Enable or disable color. Defaults to True.
             verbose (bool, optional): Enable or disable logging messages entirely. Defaults to True.
@@ -80,54 +269,442 @@ class TimeQuota:
         self.quota = float(quota) * _time_dict[self.unit]
 
         self.name = name
-        self.step_aggr_fn = step_aggr_fn
-        self.timer_fn = timer_fn
+        self._step_aggregator = _get_step_aggregator(step_aggr_fn)
+        self._step_aggr_fn = step_aggr_fn
+        if history_size == 0 and self._step_aggregator is None:
+            raise ValueError(
+                "history_size=0 stores no time steps, step_aggr_fn must be a StepAggregator"
+            )
+        self.time_steps: StepHistory = StepHistory(history_size)
+        self.predictor = predictor
+        self.prior_cache = prior_cache
+        self.prior: Optional[StepPrior] = None
+        self._prior_steps: Optional[Welford] = (
+            None if prior_cache is None else Welford()
+        )
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self._trace_owned = isinstance(trace, str)
+        if isinstance(trace, str):
+            from .trace import TraceWriter
+
+            trace = TraceWriter(trace)
+            # closed with the quota at the latest, truncating the unused records of the file
+            weakref.finalize(self, trace.close)
+        self.trace = trace
+        self.timer_fn, self._timer_scale = _get_clock(timer_fn)
+        self.cpu_timer_fn: Optional[Callable[[], float]] = None
+        self._cpu_timer_scale: float = 1
+        if cpu_timer_fn is not None:
+            self.cpu_timer_fn, self._cpu_timer_scale = _get_clock(cpu_timer_fn)
         self.logger_fn = logger_fn
+        self.log_every = log_every
+        self.log_interval = log_interval
+        self.log_on_change = log_on_change
 
         self.precision = precision
-        self._color_dict = _color_dict if color else defaultdict(str)
+        self.color = color
         self.verbose = verbose
 
+        self.parent: Optional[TimeQuota] = None
+        self.children: List[TimeQuota] = []
+        self._children_created: int = 0
+        self.sections: Dict[str, SectionStats] = {}
+
+        self._configure_hooks()
         self.reset()
 
     def reset(
         self,
     ) -> None:
         """
-        Resets time quota to initial values.
+        Resets time quota to initial values. With a *prior_cache*, the steps tracked so far are saved to it, and the time per step is seeded from it.
         """
 
+        self.save_prior()
+
         self.time_elapsed: float = 0
         self.time_remaining: float = self.quota
+        self._time_charged: float = 0
 
         self.overflow: bool = False
         self.predicted_overflow: bool = False
         self.time_exceeded: bool = False
 
-        self.time_steps: list[float] = []
+        self.time_steps.clear()
         self.time_per_step: float = 0
         self.time_this_step: float = 0
 
+        self.steps_done: int = 0
+        self.total_steps: Optional[int] = None
+        self.children.clear()
+        self.sections.clear()
+        self._checkpoint_steps: int = 0
+
+        self.cpu_time_elapsed: float = 0
+        self.cpu_time_this_step: float = 0
+        if self.cpu_timer_fn is not None:
+            self._cpu_time_since = self.cpu_timer_fn()
+
+        self._log_calls: int = 0
+        self._logged_time_elapsed: float = float("-inf")
+        self._logged_time_exceeded: bool = False
+
+        if self._step_aggregator is not None:
+            self._step_aggregator.reset()
+        if self.predictor is not None:
+            self.predictor.reset()
+
+        if self.prior_cache is not None:
+            self.prior = self.prior_cache.get(self.name)
+            if self.prior is not None:
+                prior_weight = self.prior_cache.prior_weight
+                self._seed_prior(
+                    self.prior
+                    if prior_weight is None
+                    else self.prior.downweight(prior_weight)
+                )
+
         self.time_since: float = self.timer_fn()
 
+    def _seed_prior(
+        self,
+        prior: StepPrior,
+    ) -> None:
+        # previous runs weigh in the time per step as their (capped) steps, so overflow is predicted from the start
+        if self._step_aggregator is not None:
+            self._step_aggregator.seed(*prior)
+            self.time_per_step = self._step_aggregator.value
+        else:
+            self.time_per_step = prior.mean
+        if self.predictor is not None:
+            self.predictor.seed(*prior)
+
+        self.predicted_overflow = self._predict_overflow()
+        self.time_exceeded = self.predicted_overflow
+
     def _update_quota(
         self,
         track: bool = False,
+        steps: int = 1,
     ) -> None:
-        self.time_this_step = self.timer_fn() - self.time_since
+        time_now = self.timer_fn()
+        time_taken = (time_now - self.time_since) * self._timer_scale
+        self.time_this_step = time_taken / steps
+        self._count_time(time_now, time_taken)
 
-        self.time_elapsed += self.time_this_step
-        self.time_remaining -= self.time_this_step
+        for hook in self._update_hooks:
+            hook(self, time_now, time_taken, steps)
 
         self.overflow = bool(self.time_remaining < 0)
 
         if track:
-            self.time_steps.append(self.time_this_step)
-            self.time_per_step = self.step_aggr_fn(self.time_steps)
-            self.predicted_overflow = bool(self.time_per_step > self.time_remaining)
+            for hook in self._track_hooks:
+                hook(self, time_now, time_taken, steps)
+            self._add_step(self.time_this_step, steps)
+            self.predicted_overflow = self._predict_overflow(steps)
 
         self.time_exceeded = bool(self.overflow or self.predicted_overflow)
 
+    def _count_time(
+        self,
+        time_now: float,
+        time_taken: float,
+    ) -> None:
+        # time already charged by sub-quotas since the last update is not counted twice, but is part of the step
+        time_counted = time_taken - self._time_charged
+        self._time_charged = 0
+        self.time_elapsed += time_counted
+        self.time_remaining -= time_counted
+
+    def _configure_hooks(
+        self,
+    ) -> None:
+        # optional features are looked up once, so updates of a quota not using them skip them entirely
+        self._update_hooks: Tuple[_Hook, ...] = tuple(
+            hook
+            for hook, enabled in (
+                (_cpu_time_hook, self.cpu_timer_fn is not None),
+                (_ancestors_hook, self.parent is not None),
+            )
+            if enabled
+        )
+        self._track_hooks: Tuple[_Hook, ...] = (
+            (_trace_hook,) if self.trace is not None else ()
+        )
+
+    def _charge_time(
+        self,
+        time_now: float,
+        time_taken: float,
+    ) -> None:
+        # charges time taken within the current step without ending it, only the time not yet accounted by the quota is
+        # charged and its next update excludes it from the elapsed time
+        time_charged = min(
+            time_taken,
+            (time_now - self.time_since) * self._timer_scale - self._time_charged,
+        )
+        if time_charged > 0:
+            self.time_elapsed += time_charged
+            self.time_remaining -= time_charged
+            self._time_charged += time_charged
+            self.overflow = bool(self.time_remaining < 0)
+            self.time_exceeded = bool(self.overflow or self.predicted_overflow)
+
+    def _charge_since(
+        self,
+        time_start: float,
+        verbose: bool,
+    ) -> float:
+        # charges the time taken by a section, enforced or deadline block since *time_start*, returning it
+        time_now = self.timer_fn()
+        time_taken = (time_now - time_start) * self._timer_scale
+        self._charge_time(time_now, time_taken)
+        self._charge_ancestors(time_now, time_taken)
+        self._log_quota(verbose)
+        return time_taken
+
+    def _charge_ancestors(
+        self,
+        time_now: float,
+        time_taken: float,
+    ) -> None:
+        # charges the time taken to the ancestors, limiting the remaining time to theirs
+        ancestor = self.parent
+        while ancestor is not None:
+            ancestor._charge_time(time_now, time_taken)
+            self.time_remaining = min(self.time_remaining, ancestor.time_remaining)
+            ancestor = ancestor.parent
+
+    def _update_cpu_time(
+        self,
+        steps: int = 1,
+    ) -> None:
+        cpu_time_now = self.cpu_timer_fn()  # type: ignore
+        cpu_time_taken = (cpu_time_now - self._cpu_time_since) * self._cpu_timer_scale
+        self._cpu_time_since = cpu_time_now
+
+        self.cpu_time_this_step = cpu_time_taken / steps
+        self.cpu_time_elapsed += cpu_time_taken
+
+    @property
+    def step_aggr_fn(
+        self,
+    ) -> Callable[[List[float]], float]:
+        """
+        Callable[[List[float]], float]: Function aggregating the time steps, `statistics.mean` by default.
+        """
+
+        if self._step_aggr_fn is None:
+            from statistics import mean
+
+            return mean
+        return self._step_aggr_fn
+
+    @property
+    def _color_dict(
+        self,
+    ) -> Dict[str, str]:
+        # colorama is imported by the first colored message
+        return _get_color_dict() if self.color else _no_color_dict
+
+    @property
+    def cpu_utilization(
+        self,
+    ) -> Optional[float]:
+        """
+        Optional[float]: Ratio of the *cpu_timer_fn* time to the *timer_fn* time elapsed, below 1 when waiting on I/O or other threads. None without *cpu_timer_fn*.
+        """
+
+        if self.cpu_timer_fn is None:
+            return None
+        return self.cpu_time_elapsed / self.time_elapsed if self.time_elapsed else 0.0
+
+    def _get_time_remaining_now(
+        self,
+    ) -> float:
+        return (
+            self.time_remaining
+            - (self.timer_fn() - self.time_since) * self._timer_scale
+            + self._time_charged
+        )
+
+    def _predict_overflow(
+        self,
+        steps: int = 1,
+        time_remaining: Optional[float] = None,
+    ) -> bool:
+        if time_remaining is None:
+            time_remaining = self.time_remaining
+        if self.predictor is None:
+            return bool(self.time_per_step * steps > time_remaining)
+        return bool(self.predictor.predict(time_remaining, self.time_per_step, steps))
+
+    def _estimate_time(
+        self,
+        steps: int,
+    ) -> float:
+        if self.predictor is None:
+            return self.time_per_step * steps
+        return self.predictor.estimate(self.time_per_step, steps)
+
+    def _add_step(
+        self,
+        step: float,
+        steps: int = 1,
+    ) -> None:
+        # the amortized step counts once per step, the history keeps one entry per call
+        self.steps_done += steps
+        if self._prior_steps is not None:
+            self._prior_steps.update_many(step, steps)
+        self.time_steps.append(step)
+        if self.predictor is not None:
+            self.predictor.update_many(step, steps)
+        if self._step_aggregator is not None:
+            self.time_per_step = self._step_aggregator.update_many(step, steps)
+        else:
+            self.time_per_step = self.step_aggr_fn(self.time_steps.tolist())
+
+    def _get_adaptive_stride(
+        self,
+        stride: int,
+    ) -> int:
+        # grows the stride until checks are _adaptive_check_time apart, keeping it within half of the steps that still fit
+        if self.time_per_step <= 0:
+            return 2 * stride
+
+        steps_fit = self.time_remaining / self.time_per_step
+        return max(
+            1,
+            int(
+                min(
+                    2 * stride,
+                    _adaptive_check_time / self.time_per_step,
+                    steps_fit / 2,
+                )
+            ),
+        )
+
+    def _set_total_steps(
+        self,
+        iterable: Any,
+    ) -> None:
+        # sized iterables (and iterators hinting their length) set the steps left to do
+        steps_left = length_hint(iterable, -1)
+        self.total_steps = self.steps_done + steps_left if steps_left >= 0 else None
+
+    def _start_strides(
+        self,
+        iterable: Any,
+        stride: Optional[int],
+        verbose: bool,
+    ) -> bool:
+        # strided iteration of iter() and aiter(), returns whether to start iterating
+        if stride is not None and stride < 1:
+            raise ValueError(
+                f"stride must be None or a positive integer, got {stride!r}"
+            )
+
+        self._set_total_steps(iterable)
+        return not self.update(verbose=verbose)
+
+    def _track_stride(
+        self,
+        steps: int,
+        steps_stride: int,
+        stride: Optional[int],
+        time_exceeded_fn: Optional[Callable],
+        time_exceeded_break: bool,
+        verbose: bool,
+    ) -> int:
+        # tracks the iterations of a stride, returns the next stride, 0 to stop iterating
+        time_exceeded = self.track(steps=steps, verbose=verbose)
+
+        if stride is None:
+            steps_stride = self._get_adaptive_stride(steps_stride)
+
+        if time_exceeded:
+            if time_exceeded_fn is not None:
+                time_exceeded_fn()
+
+            if time_exceeded_break:
+                return 0
+        return steps_stride
+
+    def _finish_strides(
+        self,
+        steps: int,
+        time_exceeded_fn: Optional[Callable],
+        verbose: bool,
+    ) -> None:
+        # tracks the iterations left over from the last stride
+        if steps and self.track(steps=steps, verbose=verbose):
+            if time_exceeded_fn is not None:
+                time_exceeded_fn()
+
+        self.save_prior()
+
+    @property
+    def throughput(
+        self,
+    ) -> float:
+        """
+        float: Steps per second, from the time per step. 0 before any step is tracked.
+        """
+
+        return 1 / self.time_per_step if self.time_per_step > 0 else 0.0
+
+    @property
+    def steps_remaining(
+        self,
+    ) -> Optional[int]:
+        """
+        Optional[int]: Steps left of *total_steps*, None if the total is unknown.
+        """
+
+        if self.total_steps is None:
+            return None
+        return max(self.total_steps - self.steps_done, 0)
+
+    @property
+    def eta(
+        self,
+    ) -> Optional[float]:
+        """
+        Optional[float]: Estimated time to finish the remaining steps, None if the total is unknown or no step is tracked yet.
+        """
+
+        steps_remaining = self.steps_remaining
+        if steps_remaining is None or self.time_per_step <= 0:
+            return None
+        return self._estimate_time(steps_remaining)
+
+    @property
+    def steps_fit(
+        self,
+    ) -> Optional[int]:
+        """
+        Optional[int]: Estimated number of steps fitting in the remaining time, None if no step is tracked yet.
+        """
+
+        time_per_step = self._estimate_time(1)
+        if time_per_step <= 0:
+            return None
+        return max(int(self.time_remaining / time_per_step), 0)
+
+    @property
+    def will_finish(
+        self,
+    ) -> Optional[bool]:
+        """
+        Optional[bool]: States if the remaining steps are estimated to finish within the remaining time, None if unknown.
+        """
+
+        eta = self.eta
+        if eta is None:
+            return None
+        return bool(eta <= self.time_remaining)
+
     def _get_display_string(
         self,
         seconds: float,
@@ -217,6 +794,62 @@ class TimeQuota:
 
         return info_string
 
+    def _should_log(
+        self,
+        verbose: bool,
+    ) -> bool:
+        if not (self.verbose and verbose) or self.logger_fn is None:
+            return False
+
+        self._log_calls += 1
+
+        # state changes are always logged, throttling applies otherwise
+        if self.time_exceeded != self._logged_time_exceeded:
+            return True
+        if self.log_on_change:
+            return False
+        if self.log_every is not None and (self._log_calls - 1) % self.log_every:
+            return False
+        if (
+            self.log_interval is not None
+            and self.time_elapsed - self._logged_time_elapsed < self.log_interval
+        ):
+            return False
+        return True
+
+    def _log(
+        self,
+        level: int,
+        get_string: Callable[..., str],
+        *args: Any,
+    ) -> None:
+        self._logged_time_elapsed = self.time_elapsed
+        self._logged_time_exceeded = self.time_exceeded
+
+        if isinstance(self.logger_fn, _get_logger_types()):
+            logger = cast("logging.Logger", self.logger_fn)
+            if logger.isEnabledFor(level):
+                logger.log(level, _ansi_pattern.sub("", get_string(*args)))
+        elif self.logger_fn is not None:
+            cast(Callable[[str], None], self.logger_fn)(get_string(*args))
+
+    def _log_quota(
+        self,
+        verbose: bool,
+        track: bool = False,
+    ) -> None:
+        if not self._should_log(verbose):
+            return
+
+        if track:
+            self._log(_INFO, self._get_info_string, True)
+            if self.time_exceeded:
+                self._log(_WARNING, self._get_time_exceeded_string)
+        elif self.time_exceeded:
+            self._log(_WARNING, self._get_time_exceeded_string)
+        else:
+            self._log(_INFO, self._get_info_string)
+
     def update(
         self,
         *,
@@ -233,12 +866,7 @@ class TimeQuota:
         """
 
         self._update_quota()
-
-        if (self.verbose and verbose) and self.logger_fn is not None:
-            if self.time_exceeded:
-                self.logger_fn(self._get_time_exceeded_string())
-            else:
-                self.logger_fn(self._get_info_string())
+        self._log_quota(verbose)
 
         self.time_since = self.timer_fn()
         return self.time_exceeded
@@ -246,31 +874,38 @@ class TimeQuota:
     def track(
         self,
         *,
+        steps: int = 1,
         verbose: bool = True,
     ) -> bool:
         """
         Tracks, stores and updates the time taken every call, also used for quota overflow prediction. To be used in loops or repetitive calls.
 
         Args:
+            steps (int, optional): Number of steps taken since the last call, the time taken is amortized over them and overflow is predicted for as many steps ahead. Defaults to 1.
             verbose (bool, optional): Enable or disable logging messages. Defaults to True.
         Returns:
             bool: States if quota is exceeded.
         """
 
-        self._update_quota(track=True)
-
-        if (self.verbose and verbose) and self.logger_fn is not None:
-            self.logger_fn(self._get_info_string(track=True))
-            if self.time_exceeded:
-                self.logger_fn(self._get_time_exceeded_string())
+        self._update_quota(track=True, steps=steps)
+        self._log_quota(verbose, track=True)
 
         self.time_since = self.timer_fn()
+
+        # saved once the step is timed, the time taken by saving is charged to the next step
+        if (
+            self.checkpoint_path is not None
+            and self.steps_done - self._checkpoint_steps >= self.checkpoint_every
+        ):
+            self.save(self.checkpoint_path)
+
         return self.time_exceeded
 
     def iter(
         self,
         iterable: Iterable[Any],
         *,
+        stride: Optional[int] = 1,
         time_exceeded_fn: Optional[Callable] = None,
         time_exceeded_break: bool = True,
         verbose: bool = True,
@@ -284,6 +919,7 @@ class TimeQuota:
 
         Args:
             iterable (Iterable[Any]): Iterable to be iterated.
+            stride (Optional[int], optional): Number of iterations tracked at once, with the time taken amortized over them. None adapts the stride to the measured step time, checking the quota about every millisecond. Defaults to 1.
             time_exceeded_fn (Optional[Callable], optional): Function to be executed if time exceeds. Defaults to None.
             time_exceeded_break (bool, optional): To break out of the loop if time exceeds. Defaults to True.
             verbose (bool, optional): Enable or disable logging messages. Defaults to True.
@@ -292,20 +928,35 @@ class TimeQuota:
             Iterator[Any]: Element in the iterable.
         """
 
-        if not self.update(verbose=verbose):
+        if self._start_strides(iterable, stride, verbose):
+            steps_stride = 1 if stride is None else stride
+            steps = 0
+
             for i in iterable:
                 yield i
 
-                if self.track(verbose=verbose):
-                    if time_exceeded_fn is not None:
-                        time_exceeded_fn()
+                steps += 1
+                if steps < steps_stride:
+                    continue
 
-                    if time_exceeded_break:
-                        break
+                steps_stride = self._track_stride(
+                    steps,
+                    steps_stride,
+                    stride,
+                    time_exceeded_fn,
+                    time_exceeded_break,
+                    verbose,
+                )
+                steps = 0
+                if not steps_stride:
+                    break
+
+            self._finish_strides(steps, time_exceeded_fn, verbose)
 
     def range(
         self,
         *args: Any,
+        stride: Optional[int] = 1,
         time_exceeded_fn: Optional[Callable] = None,
         time_exceeded_break: bool = True,
         verbose: bool = True,
@@ -319,6 +970,7 @@ class TimeQuota:
             (ii) Predicted exhaustion - The time taken by the next iteration (calculated by the *step_aggr_fn*) will exceed the time quota.
 
         Args:
+            stride (Optional[int], optional): Number of iterations tracked at once, with the time taken amortized over them. None adapts the stride to the measured step time. Defaults to 1.
             time_exceeded_fn (Optional[Callable], optional): Function to be executed if time exceeds. Defaults to None.
             time_exceeded_break (bool, optional): To break out of the loop if time exceeds. Defaults to True.
             verbose (bool, optional): Enable or disable logging messages. Defaults to True.
@@ -329,32 +981,731 @@ class TimeQuota:
 
         return self.iter(
             iterable=range(*args, **kwargs),
+            stride=stride,
             time_exceeded_fn=time_exceeded_fn,
             time_exceeded_break=time_exceeded_break,
             verbose=verbose,
         )
 
+    def _get_batch_size(
+        self,
+        batch_size: int,
+    ) -> int:
+        steps_fit = self.steps_fit
+        if steps_fit is None:
+            return 2 * batch_size
+
+        # grows while plenty of time remains, keeping half of the remaining time spare near the deadline
+        next_batch_size = min(2 * batch_size, steps_fit // 2)
+
+        # the final batch takes all the steps left if they fit, instead of halving
+        steps_remaining = self.steps_remaining
+        if steps_remaining is not None and steps_remaining <= min(
+            2 * batch_size, steps_fit
+        ):
+            next_batch_size = max(next_batch_size, steps_remaining)
+
+        return max(next_batch_size, min(steps_fit, 1))
+
+    def batches(
+        self,
+        iterable: Iterable[Any],
+        *,
+        batch_size: int = 1,
+        max_batch_size: Optional[int] = None,
+        time_exceeded_fn: Optional[Callable] = None,
+        time_exceeded_break: bool = True,
+        verbose: bool = True,
+    ) -> Iterator[List[Any]]:
+        """
+        Time limited batches of the iterable, sized to fit the remaining quota. When called, updates the quota and tracks time taken for each batch, amortized over its elements.
+
+        Batches double in size while the time per element (calculated by the *step_aggr_fn*) leaves plenty of time, and shrink to fit half of the remaining time near the deadline.
+        The final batch takes all the elements left if they fit in the remaining time and a doubled batch. Iteration stops (default) when the quota overflows or not even one more element fits.
+
+        Args:
+            iterable (Iterable[Any]): Iterable to be batched.
+            batch_size (int, optional): Size of the first batch. Defaults to 1.
+            max_batch_size (Optional[int], optional): Maximum size of the batches. Defaults to None.
+            time_exceeded_fn (Optional[Callable], optional): Function to be executed if time exceeds. Defaults to None.
+            time_exceeded_break (bool, optional): To break out of the loop if time exceeds. Defaults to True.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Yields:
+            Iterator[List[Any]]: Batch of elements of the iterable.
+        """
+
+        if batch_size < 1 or (
+            max_batch_size is not None and max_batch_size < batch_size
+        ):
+            raise ValueError(
+                f"batch_size must be a positive integer up to max_batch_size, got {batch_size!r} and {max_batch_size!r}"
+            )
+
+        self._set_total_steps(iterable)
+
+        if not self.update(verbose=verbose):
+            items = iter(iterable)
+
+            while True:
+                batch = list(islice(items, batch_size))
+                if not batch:
+                    break
+
+                yield batch
+
+                self.track(steps=len(batch), verbose=verbose)
+                batch_size = self._get_batch_size(batch_size)
+                if max_batch_size is not None:
+                    batch_size = min(batch_size, max_batch_size)
+
+                if batch_size == 0:
+                    if time_exceeded_fn is not None:
+                        time_exceeded_fn()
+
+                    if time_exceeded_break:
+                        break
+                    batch_size = 1
+
+            self.save_prior()
+
+    def _track_task(
+        self,
+        task_time: float,
+        tasks: int,
+        workers: int,
+    ) -> None:
+        # tasks run concurrently, so elapsed time is wall time while task times feed the step statistics
+        self._update_quota()
+        self.time_this_step = task_time
+        time_now = self.timer_fn()
+        for hook in self._track_hooks:
+            hook(self, time_now, task_time, 1)
+        self._add_step(task_time)
+        self.predicted_overflow = self._predict_tasks_overflow(tasks, workers)
+        self.time_exceeded = bool(self.overflow or self.predicted_overflow)
+
+    def _predict_tasks_overflow(
+        self,
+        tasks: int,
+        workers: int,
+        time_remaining: Optional[float] = None,
+    ) -> bool:
+        return self._predict_overflow(math.ceil(tasks / workers), time_remaining)
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        iterable: Iterable[Any],
+        *,
+        executor: Union[ExecutorType, Executor] = "thread",
+        workers: Optional[int] = None,
+        cancel_pending: bool = True,
+        time_exceeded_fn: Optional[Callable] = None,
+        verbose: bool = True,
+    ) -> Iterator[Any]:
+        """
+        Time limited parallel map, yields the results of *fn* applied to the elements of the iterable as they complete.
+
+        Tasks are submitted while the tasks in flight are predicted to finish within the remaining quota, considering the time taken per task (calculated by the *step_aggr_fn*) and the number of workers.
+        Submission stops upon quota (predicted) exhaustion, results of the tasks in flight are still yielded unless the quota overflows.
+
+        Args:
+            fn (Callable[[Any], Any]): Function applied to each element, must be picklable for process executors, as must the *timer_fn* timing the tasks on the quota clock.
+            iterable (Iterable[Any]): Iterable to be mapped.
+            executor (Union[Literal[thread, process], Executor], optional): Executor running the tasks, can be one of 'thread' or 'process' for a new pool, or an existing executor. Defaults to 'thread'.
+            workers (Optional[int], optional): Number of workers. Defaults to the number of CPUs for new pools, or the workers of the given executor.
+            cancel_pending (bool, optional): Cancel the tasks not yet running and stop yielding upon quota overflow. Defaults to True.
+            time_exceeded_fn (Optional[Callable], optional): Function to be executed if time exceeds. Defaults to None.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Yields:
+            Iterator[Any]: Result of a task, in completion order.
+        """
+
+        if self.update(verbose=verbose):
+            return
+
+        from contextvars import copy_context
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        from .parallel import get_executor, timed_call
+
+        pool, workers, shutdown = get_executor(executor, workers)
+        items = iter(iterable)
+        futures: set = set()
+        submit = True
+        time_exceeded = False
+
+        try:
+            while True:
+                # keep at most two tasks per worker in flight, as long as they are predicted to fit
+                while submit and len(futures) < 2 * workers:
+                    time_remaining = self._get_time_remaining_now()
+                    if self._predict_tasks_overflow(
+                        len(futures) + 1, workers, time_remaining
+                    ):
+                        submit = False
+                        time_exceeded = True
+                        break
+
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        submit = False
+                        break
+
+                    if isinstance(pool, ThreadPoolExecutor):
+                        # thread tasks see the context of the caller, as its current quota
+                        future = pool.submit(
+                            copy_context().run,
+                            timed_call,
+                            fn,
+                            item,
+                            self.timer_fn,
+                            self._timer_scale,
+                        )
+                    else:
+                        future = pool.submit(
+                            timed_call, fn, item, self.timer_fn, self._timer_scale
+                        )
+                    futures.add(future)
+
+                if time_exceeded and time_exceeded_fn is not None:
+                    time_exceeded_fn()
+                    time_exceeded_fn = None
+
+                if not futures:
+                    break
+
+                # with cancel_pending, waiting stops as soon as the quota runs out
+                timeout = None
+                if cancel_pending and self.quota != float("inf"):
+                    timeout = max(self._get_time_remaining_now(), 0)
+
+                done, futures = wait(
+                    futures, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+
+                if not done:
+                    self._update_quota()
+                    self._log_quota(verbose)
+                    self.time_since = self.timer_fn()
+
+                for future in done:
+                    task_time, result = future.result()
+                    self._track_task(task_time, len(futures) + 1, workers)
+                    self._log_quota(verbose, track=True)
+                    self.time_since = self.timer_fn()
+
+                    yield result
+
+                if self.overflow and cancel_pending:
+                    if time_exceeded_fn is not None:
+                        time_exceeded_fn()
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+            if shutdown:
+                pool.shutdown(wait=not cancel_pending)
+
+    async def aiter(
+        self,
+        aiterable: AsyncIterable[Any],
+        *,
+        stride: Optional[int] = 1,
+        time_exceeded_fn: Optional[Callable] = None,
+        time_exceeded_break: bool = True,
+        verbose: bool = True,
+    ) -> AsyncIterator[Any]:
+        """
+        Time limited asynchronous iterator of the async iterable, with the same tracking and stopping behaviour as `TimeQuota.iter`.
+
+        Args:
+            aiterable (AsyncIterable[Any]): Async iterable to be iterated.
+            stride (Optional[int], optional): Number of iterations tracked at once, with the time taken amortized over them. None adapts the stride to the measured step time. Defaults to 1.
+            time_exceeded_fn (Optional[Callable], optional): Function to be executed if time exceeds. Defaults to None.
+            time_exceeded_break (bool, optional): To break out of the loop if time exceeds. Defaults to True.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Yields:
+            AsyncIterator[Any]: Element in the async iterable.
+        """
+
+        if self._start_strides(aiterable, stride, verbose):
+            steps_stride = 1 if stride is None else stride
+            steps = 0
+
+            async for i in aiterable:
+                yield i
+
+                steps += 1
+                if steps < steps_stride:
+                    continue
+
+                steps_stride = self._track_stride(
+                    steps,
+                    steps_stride,
+                    stride,
+                    time_exceeded_fn,
+                    time_exceeded_break,
+                    verbose,
+                )
+                steps = 0
+                if not steps_stride:
+                    break
+
+            self._finish_strides(steps, time_exceeded_fn, verbose)
+
+    def deadline(
+        self,
+        *,
+        predicted: bool = False,
+        verbose: bool = True,
+    ) -> QuotaDeadline:
+        """
+        Async context manager cancelling the enclosed code when the quota runs out, raising `asyncio.TimeoutError`.
+        The time taken is charged against the quota on exit without ending its current step, and cancellation is scheduled with an event loop timer.
+
+        Args:
+            predicted (bool, optional): Cancel as soon as the quota is predicted to be exhausted, leaving one time step of the quota. Defaults to False.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            QuotaDeadline: Async context manager.
+        """
+
+        from .aio import QuotaDeadline
+
+        return QuotaDeadline(self, predicted=predicted, verbose=verbose)
+
+    def enforce(
+        self,
+        *,
+        predicted: bool = False,
+        time_exceeded_fn: Optional[Callable] = None,
+        verbose: bool = True,
+    ) -> QuotaEnforcer:
+        """
+        Context manager and decorator interrupting the enclosed code when the quota runs out, raising `QuotaExceeded`.
+        The time taken is charged against the quota on exit without ending its current step, and the interruption is scheduled with a SIGALRM timer in the main thread, or a watchdog thread elsewhere.
+
+        Args:
+            predicted (bool, optional): Interrupt as soon as the quota is predicted to be exhausted, leaving one time step of the quota. Defaults to False.
+            time_exceeded_fn (Optional[Callable], optional): Function to be executed when time exceeds, instead of raising `QuotaExceeded`. Defaults to None.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            QuotaEnforcer: Context manager and decorator.
+        """
+
+        from .enforce import QuotaEnforcer
+
+        return QuotaEnforcer(
+            self,
+            predicted=predicted,
+            time_exceeded_fn=time_exceeded_fn,
+            verbose=verbose,
+        )
+
+    def section(
+        self,
+        name: str,
+        *,
+        verbose: bool = True,
+    ) -> QuotaSection:
+        """
+        Context manager and decorator timing a named code section, keeping its count, total, mean and max time taken in *sections*.
+        The time taken is charged against the quota on exit, without ending the current step of `track()` or `iter()`.
+
+        Args:
+            name (str): Name of the section.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            QuotaSection: Context manager and decorator.
+        """
+
+        return QuotaSection(self, name, verbose=verbose)
+
+    def limit(
+        self,
+        fn: Optional[Callable] = None,
+        *,
+        name: Optional[str] = None,
+        verbose: bool = True,
+    ) -> Callable:
+        """
+        Decorator timing the calls of a function as a section, raising `QuotaExceeded` instead of calling it once the quota is exceeded.
+        Used as `@tq.limit`, or `@tq.limit(name=...)`.
+
+        Args:
+            fn (Optional[Callable], optional): Function to be limited. Defaults to None, returning the decorator.
+            name (Optional[str], optional): Name of the section. Defaults to the qualified name of the function.
+            verbose (bool, optional): Enable or disable logging messages. Defaults to True.
+
+        Returns:
+            Callable: Limited function, or the decorator.
+        """
+
+        def decorator(
+            fn: Callable,
+        ) -> Callable:
+            section = self.section(
+                fn.__qualname__ if name is None else name, verbose=verbose
+            )
+
+            @functools.wraps(fn)
+            def limited(*args: Any, **kwargs: Any) -> Any:
+                if self.time_exceeded or self._get_time_remaining_now() < 0:
+                    raise QuotaExceeded(f"{self.name} time quota exceeded")
+
+                with section:
+                    return fn(*args, **kwargs)
+
+            return limited
+
+        return decorator if fn is None else decorator(fn)
+
+    def sub(
+        self,
+        quota: Optional[float] = None,
+        unit: UnitType = "s",
+        *,
+        fraction: Optional[float] = None,
+        name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "TimeQuota":
+        """
+        Creates a sub-quota, a slice of the remaining time of this quota. Time taken by the sub-quota is charged to this quota and its ancestors,
+        and its remaining time is limited by theirs. Options not given are inherited from this quota, except *timer_fn* which cannot differ from it.
+        Sub-quotas are kept in *children* and reported by `str` until this quota is reset.
+
+        Args:
+            quota (Optional[float], optional): Maximum time limit of the sub-quota. Defaults to None.
+            unit (Literal[s, m, h], optional): Unit of time of *quota* given. Defaults to 's'.
+            fraction (Optional[float], optional): Maximum time limit of the sub-quota as a fraction in (0, 1] of the remaining time. Defaults to None, the whole remaining time if *quota* is not given either.
+            name (Optional[str], optional): Custom name for the sub-quota timer. Defaults to '<name>.<number of sub-quotas>'.
+            **kwargs (Any): Other `TimeQuota` options of the sub-quota.
+
+        Returns:
+            TimeQuota: Sub-quota.
+        """
+
+        if quota is not None and fraction is not None:
+            raise ValueError("only one of quota or fraction can be given")
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError(f"fraction must be in (0, 1], got {fraction!r}")
+        # the time charged to the ancestors is measured on the clock they share
+        if "timer_fn" in kwargs and _get_clock(kwargs["timer_fn"]) != (
+            self.timer_fn,
+            self._timer_scale,
+        ):
+            raise ValueError(
+                f"timer_fn of a sub-quota must be the one of its parent, got {kwargs['timer_fn']!r}"
+            )
+
+        time_remaining = max(self._get_time_remaining_now(), 0)
+        if quota is not None:
+            time_remaining = min(
+                float(quota) * _time_dict[unit.lower()], time_remaining
+            )
+        elif fraction is not None:
+            time_remaining *= fraction
+
+        options: Dict[str, Any] = dict(
+            display_unit=self.display_unit,
+            name=f"{self.name}.{self._children_created}" if name is None else name,
+            timer_fn=self.timer_fn,
+            cpu_timer_fn=self.cpu_timer_fn,
+            logger_fn=self.logger_fn,
+            log_every=self.log_every,
+            log_interval=self.log_interval,
+            log_on_change=self.log_on_change,
+            precision=self.precision,
+            color=self.color,
+            verbose=self.verbose,
+        )
+        options.update(kwargs)
+
+        quota_cls = FastTimeQuota if isinstance(self, FastTimeQuota) else TimeQuota
+        child = quota_cls(time_remaining, **options)
+        child.parent = self
+        child._configure_hooks()
+        self.children.append(child)
+        self._children_created += 1
+        return child
+
+    def activate(
+        self,
+    ) -> QuotaActivation:
+        """
+        Context manager making this quota the current one, returned by `TimeQuota.current()` in the enclosed code,
+        its threads started with `contextvars.copy_context()` or a target wrapped by `timequota.context.propagate`, `map()` thread tasks
+        and asyncio tasks created within. Plain `threading.Thread` targets start with an empty context and see no current quota.
+
+        Returns:
+            QuotaActivation: Context manager, returning this quota on enter.
+        """
+
+        from .context import QuotaActivation
+
+        return QuotaActivation(self)
+
+    @classmethod
+    def current(
+        cls,
+    ) -> Optional[Union[TimeQuota, LiteTimeQuota]]:
+        """
+        Returns:
+            Optional[Union[TimeQuota, LiteTimeQuota]]: Quota activated in the current context by `activate()`, None if none is active.
+        """
+
+        from .context import current_quota
+
+        return current_quota()
+
+    def snapshot(
+        self,
+    ) -> QuotaSnapshot:
+        """
+        Snapshot of the quota state at its last update, without any string formatting, to be passed to exporters.
+
+        Returns:
+            QuotaSnapshot: Named tuple of the quota state, times in seconds.
+        """
+
+        from .exporters import QuotaSnapshot
+
+        return QuotaSnapshot(
+            self.name,
+            time.time(),
+            self.quota,
+            self.time_elapsed,
+            self.time_remaining,
+            self.time_per_step,
+            self.time_this_step,
+            self.steps_done,
+            self.overflow,
+            self.predicted_overflow,
+            self.time_exceeded,
+        )
+
+    def save_prior(
+        self,
+    ) -> None:
+        """
+        Merges the steps tracked since the last call into the *prior_cache*, if any. Called by `reset()`, and when `iter()`, `range()`, `aiter()` or `batches()` finish.
+        """
+
+        if self._prior_steps is None or not self._prior_steps.count:
+            return
+
+        from .priors import StepPrior
+
+        self.prior_cache.update(  # type: ignore
+            self.name,
+            StepPrior(
+                self._prior_steps.count,
+                self._prior_steps.mean,
+                self._prior_steps._m2,
+            ),
+        )
+        self._prior_steps.reset()
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Closes the trace writer created from a *trace* path, truncating the trace file to its records.
+        Called when the quota is garbage collected otherwise, a `TraceWriter` given is left open to its owner.
+        """
+
+        if self._trace_owned:
+            self.trace.close()  # type: ignore
+
+    def save(
+        self,
+        path: str,
+        *,
+        history_size: int = 1000,
+    ) -> None:
+        """
+        Saves the quota state to a JSON checkpoint, written atomically. Sub-quotas and sections are not saved.
+
+        Args:
+            path (str): Path of the checkpoint.
+            history_size (int, optional): Number of latest time steps saved. Defaults to 1000.
+        """
+
+        steps_saved = min(history_size, len(self.time_steps))
+        time_steps = [
+            self.time_steps[i]
+            for i in range(len(self.time_steps) - steps_saved, len(self.time_steps))
+        ]
+
+        state = {
+            "name": self.name,
+            "quota": self.quota,
+            "unit": self.unit,
+            "display_unit": self.display_unit,
+            "saved_at": time.time(),
+            "time_elapsed": self.time_elapsed,
+            "time_remaining": self.time_remaining,
+            "time_per_step": self.time_per_step,
+            "steps_done": self.steps_done,
+            "total_steps": self.total_steps,
+            "time_steps": time_steps,
+        }
+        for key, obj in (
+            ("aggregator", self._step_aggregator),
+            ("predictor", self.predictor),
+        ):
+            state[key] = (
+                None
+                if obj is None
+                else {"class": type(obj).__name__, "state": obj.get_state()}
+            )
+
+        from .checkpoint import save_checkpoint
+
+        save_checkpoint(path, state)
+        self._checkpoint_steps = self.steps_done
+
+    @classmethod
+    def template(
+        cls,
+        quota: float,
+        unit: UnitType = "s",
+        *,
+        name: str = "tq",
+        timer_fn: Union[ClockType, Callable[[], float]] = time.perf_counter,
+        pool_size: int = 1024,
+    ) -> QuotaTemplate:
+        """
+        Creates a factory of lightweight quotas for per-request budgets, options are parsed once and quotas are recycled through a pool.
+
+        Args:
+            quota (float): Maximum time limit of every quota.
+            unit (Literal[s, m, h], optional): Unit of time of *quota* given. Defaults to 's'.
+            name (str, optional): Custom name of the quotas. Defaults to 'tq'.
+            timer_fn (Union[str, Callable[[], float]], optional): Timer of the quotas, or a `time` clock name. Defaults to time.perf_counter.
+            pool_size (int, optional): Maximum number of released quotas kept for reuse. Defaults to 1024.
+
+        Returns:
+            QuotaTemplate: Factory whose `acquire()` returns a started `LiteTimeQuota`.
+        """
+
+        from .lite import QuotaTemplate
+
+        return QuotaTemplate(
+            quota, unit, name=name, timer_fn=timer_fn, pool_size=pool_size
+        )
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        *,
+        include_downtime: bool = True,
+        **kwargs: Any,
+    ) -> "TimeQuota":
+        """
+        Creates a quota resuming the budget and step statistics of a checkpoint saved by `save()`.
+
+        The quota, units and name are taken from the checkpoint unless given. Aggregator and predictor states are restored
+        into the given *step_aggr_fn* and *predictor* (or the defaults) when they are of the saved class.
+
+        Args:
+            path (str): Path of the checkpoint.
+            include_downtime (bool, optional): Charge the wall time since the checkpoint was saved against the quota, keeping an absolute deadline. False resumes the budget left at the checkpoint, for compute time budgets. Defaults to True.
+            **kwargs: Arguments of the quota, as for `TimeQuota`.
+
+        Returns:
+            TimeQuota: Resumed quota.
+        """
+
+        from .checkpoint import load_checkpoint
+
+        state = load_checkpoint(path)
+
+        options: Dict[str, Any] = dict(
+            unit=state["unit"], display_unit=state["display_unit"], name=state["name"]
+        )
+        options.update(kwargs)
+        tq = cls(state["quota"] / _time_dict[options["unit"].lower()], **options)
+
+        time_downtime = (
+            max(time.time() - state["saved_at"], 0) if include_downtime else 0
+        )
+        tq.time_elapsed = state["time_elapsed"] + time_downtime
+        tq.time_remaining = state["time_remaining"] - time_downtime
+
+        for step in state["time_steps"]:
+            tq.time_steps.append(step)
+        for key, obj in (
+            ("aggregator", tq._step_aggregator),
+            ("predictor", tq.predictor),
+        ):
+            saved = state[key]
+            if (
+                saved is not None
+                and obj is not None
+                and saved["class"] == type(obj).__name__
+            ):
+                obj.set_state(saved["state"])
+
+        tq.time_per_step = state["time_per_step"]
+        tq.steps_done = tq._checkpoint_steps = state["steps_done"]
+        tq.total_steps = state["total_steps"]
+
+        tq.overflow = bool(tq.time_remaining < 0)
+        if tq.steps_done:
+            tq.predicted_overflow = tq._predict_overflow()
+        tq.time_exceeded = bool(tq.overflow or tq.predicted_overflow)
+
+        return tq
+
+    def _get_time_exceeded_status(
+        self,
+    ) -> str:
+        if self.overflow:
+            return self._color_dict["r"] + "True" + self._color_dict["R"]
+        elif self.predicted_overflow:
+            return self._color_dict["r"] + "Predicted" + self._color_dict["R"]
+        else:
+            return self._color_dict["c"] + "False" + self._color_dict["R"]
+
+    def _get_tree_rows(
+        self,
+        depth: int = 0,
+    ) -> List[List[str]]:
+        rows = [
+            [
+                ("│ " * (depth - 1) + "└ " if depth else "") + self.name,
+                self._get_display_string(self.quota),
+                self._get_display_string(self.time_elapsed),
+                self._get_display_string(self.time_remaining),
+                self._get_time_exceeded_status(),
+            ]
+        ]
+        for child in self.children:
+            rows.extend(child._get_tree_rows(depth + 1))
+        return rows
+
     def __str__(
         self,
     ) -> str:
+        from tabulate import tabulate
+
         headers = [
             f"{self._color_dict['g']}{self.name}{self._color_dict['R']}",
             f"{self._color_dict['y']}Time{self._color_dict['R']}",
             f"{self._color_dict['y']}Time ({self.display_unit}){self._color_dict['R']}",
         ]
 
-        if self.overflow:
-            time_exceeded_string = (
-                self._color_dict["r"] + "True" + self._color_dict["R"]
-            )
-        elif self.predicted_overflow:
-            time_exceeded_string = (
-                self._color_dict["r"] + "Predicted" + self._color_dict["R"]
-            )
-        else:
-            time_exceeded_string = (
-                self._color_dict["c"] + "False" + self._color_dict["R"]
-            )
+        time_exceeded_string = self._get_time_exceeded_status()
 
         table = [
             [
@@ -384,13 +1735,82 @@ class TimeQuota:
             ],
         ]
 
-        return tabulate(
+        if self.cpu_timer_fn is not None:
+            cpu_utilization_string = f"{self.cpu_utilization:.{self.precision}f}"
+            table[-1:-1] = [
+                [
+                    "CPU Time Elapsed",
+                    self._get_pretty_string(self.cpu_time_elapsed, display=True),
+                    self._get_display_string(self.cpu_time_elapsed),
+                ],
+                ["CPU Utilization", cpu_utilization_string, cpu_utilization_string],
+            ]
+
+        if self.total_steps is not None:
+            steps_string = f"{self.steps_done}/{self.total_steps}"
+            table.insert(-1, ["Steps Done", steps_string, steps_string])
+
+            eta = self.eta
+            if eta is not None:
+                will_finish_string = "Yes" if self.will_finish else "No"
+                table[-1:-1] = [
+                    [
+                        "Time To Finish",
+                        self._get_pretty_string(eta, display=True),
+                        self._get_display_string(eta),
+                    ],
+                    ["Will Finish", will_finish_string, will_finish_string],
+                ]
+
+        table_string = tabulate(
             table,
             headers,
             colalign=("left", "right", "right"),
             tablefmt="simple",
         )
 
+        if self.sections:
+            section_headers = [
+                f"{self._color_dict['g']}{self.name}{self._color_dict['R']}",
+                *(
+                    f"{self._color_dict['y']}{header}{self._color_dict['R']}"
+                    for header in ["Count", "Total", "Mean", "Max"]
+                ),
+            ]
+            section_rows = [
+                [
+                    name,
+                    stats.count,
+                    self._get_display_string(stats.total),
+                    self._get_display_string(stats.mean),
+                    self._get_display_string(stats.max),
+                ]
+                for name, stats in self.sections.items()
+            ]
+            table_string += "\n\n" + tabulate(
+                section_rows,
+                section_headers,
+                colalign=("left", "right", "right", "right", "right"),
+                tablefmt="simple",
+            )
+
+        if self.children:
+            tree_headers = [
+                f"{self._color_dict['g']}{self.name}{self._color_dict['R']}",
+                *(
+                    f"{self._color_dict['y']}{header}{self._color_dict['R']}"
+                    for header in ["Quota", "Elapsed", "Remaining", "Exceeded"]
+                ),
+            ]
+            table_string += "\n\n" + tabulate(
+                self._get_tree_rows(),
+                tree_headers,
+                colalign=("left", "right", "right", "right", "right"),
+                tablefmt="simple",
+            )
+
+        return table_string
+
     def __repr__(
         self,
     ) -> str:
@@ -402,10 +1822,54 @@ class TimeQuota:
             f"{_quota!r}, {self.unit!r}, {self.display_unit!r}, "
             f"name={self.name!r}, "
             f"step_aggr_fn={self.step_aggr_fn!r}, "
+            f"history_size={self.time_steps.maxlen!r}, "
+            f"predictor={self.predictor!r}, "
+            f"prior_cache={self.prior_cache!r}, "
+            f"checkpoint_path={self.checkpoint_path!r}, "
+            f"checkpoint_every={self.checkpoint_every!r}, "
             f"timer_fn={self.timer_fn!r}, "
+            f"cpu_timer_fn={self.cpu_timer_fn!r}, "
             f"logger_fn={self.logger_fn!r}, "
+            f"log_every={self.log_every!r}, "
+            f"log_interval={self.log_interval!r}, "
+            f"log_on_change={self.log_on_change!r}, "
             f"precision={self.precision!r}, "
-            f"color={any(self._color_dict.values())!r}, "
+            f"color={self.color!r}, "
             f"verbose={self.verbose!r}"
             ")"
         )
+
+
+def _unwrap_typechecked(
+    attr: Any,
+) -> Any:
+    if isinstance(attr, (classmethod, staticmethod)):
+        return type(attr)(_unwrap_typechecked(attr.__func__))
+    if isinstance(attr, property):
+        return property(
+            _unwrap_typechecked(attr.fget),
+            _unwrap_typechecked(attr.fset),
+            _unwrap_typechecked(attr.fdel),
+            attr.__doc__,
+        )
+    return getattr(attr, "__wrapped__", attr)
+
+
+def _without_typechecks(
+    cls: type,
+) -> type:
+    # shadows the type checked methods of the base class by the original ones, except __init__
+    for attr_name, attr in vars(cls.__base__).items():
+        if attr_name == "__init__" or attr_name in vars(cls):
+            continue
+        if isinstance(attr, (types.FunctionType, classmethod, staticmethod, property)):
+            setattr(cls, attr_name, _unwrap_typechecked(attr))
+    return cls
+
+
+@_without_typechecks
+class FastTimeQuota(TimeQuota):
+    """
+    Production mode of `TimeQuota`, arguments are type checked once on creation and all other methods run without runtime type checks.
+    Takes the same arguments as `TimeQuota`.
+    """
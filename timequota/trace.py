@@ -0,0 +1,289 @@
+"""
+Memory mapped step trace files, for post-mortem profiling of quota guarded loops.
+
+A trace is a header followed by fixed width little-endian records of the step start time and duration (float64),
+section id and number of steps (uint32). `TraceWriter` appends records to a memory mapped file grown in chunks, so
+tracking a step only writes to memory, and the trace survives the process. Section names are kept in a JSON file
+next to the trace. `TraceReader` exposes the records as a zero-copy `memoryview` or numpy structured array.
+"""
+
+import os
+import mmap
+import struct
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+# magic, number of records
+_header = struct.Struct("<8sQ")
+_count = struct.Struct("<Q")
+_magic = b"TQTRACE1"
+
+# step start, step duration, section id, steps
+_record = struct.Struct("<ddII")
+
+_step_section = "step"
+
+
+def _get_sections_path(
+    path: str,
+) -> str:
+    return path + ".sections.json"
+
+
+class TraceRecord(NamedTuple):
+    """
+    Traced step, times in seconds of the quota timer.
+    """
+
+    start: float
+    duration: float
+    section: int
+    steps: int
+
+
+class TraceWriter:
+    """
+    Appends step records to a memory mapped trace file, passed as *trace* to `timequota.TimeQuota`.
+
+    The file is grown by *chunk_records* records at a time, the only system calls made while tracing.
+    Tracked steps are recorded with the 'step' section id 0, code sections by their own id.
+
+    Args:
+        path (str): Path of the trace file, overwritten if it exists.
+        chunk_records (int, optional): Number of records the file is grown by. Defaults to 65536.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        chunk_records: int = 65536,
+    ) -> None:
+        if chunk_records < 1:
+            raise ValueError(
+                f"chunk_records must be a positive integer, got {chunk_records!r}"
+            )
+
+        self.path = path
+        self.chunk_records = chunk_records
+        self.sections: Dict[str, int] = {_step_section: 0}
+        self.count: int = 0
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._size: int = _header.size
+        self._buffer: Optional[mmap.mmap] = None
+        self._grow()
+
+        _header.pack_into(self._buffer, 0, _magic, 0)  # type: ignore
+        self._save_sections()
+
+    def _grow(
+        self,
+    ) -> None:
+        self._size += self.chunk_records * _record.size
+        os.ftruncate(self._fd, self._size)
+        if self._buffer is not None:
+            self._buffer.close()
+        self._buffer = mmap.mmap(self._fd, self._size)
+
+    def _save_sections(
+        self,
+    ) -> None:
+        import json
+
+        from .checkpoint import write_atomic
+
+        write_atomic(_get_sections_path(self.path), json.dumps(self.sections))
+
+    def section_id(
+        self,
+        name: str,
+    ) -> int:
+        """
+        Returns the id of the section *name*, assigning a new one on first use.
+        """
+
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = len(self.sections)
+            self._save_sections()
+        return section
+
+    def append(
+        self,
+        start: float,
+        duration: float,
+        section: int = 0,
+        steps: int = 1,
+    ) -> None:
+        """
+        Appends a step record.
+
+        Args:
+            start (float): Start time of the step.
+            duration (float): Time taken by the step, or all *steps*.
+            section (int, optional): Section id. Defaults to 0, tracked steps.
+            steps (int, optional): Number of steps the duration is amortized over. Defaults to 1.
+        """
+
+        offset = _header.size + self.count * _record.size
+        if offset + _record.size > self._size:
+            self._grow()
+
+        _record.pack_into(self._buffer, offset, start, duration, section, steps)  # type: ignore
+        self.count += 1
+        # the count is updated with every record, so the trace is complete if the process dies
+        _count.pack_into(self._buffer, 8, self.count)  # type: ignore
+
+    def flush(
+        self,
+    ) -> None:
+        """
+        Flushes the trace to disk.
+        """
+
+        self._buffer.flush()  # type: ignore
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Flushes the trace and truncates the file to its records.
+        """
+
+        if self._buffer is None:
+            return
+
+        self.flush()
+        self._buffer.close()
+        self._buffer = None
+        os.ftruncate(self._fd, _header.size + self.count * _record.size)
+        os.close(self._fd)
+
+    def __enter__(
+        self,
+    ) -> "TraceWriter":
+        return self
+
+    def __exit__(
+        self,
+        *args: Any,
+    ) -> None:
+        self.close()
+
+    def __repr__(
+        self,
+    ) -> str:
+        return f"{self.__class__.__name__}({self.path!r}, chunk_records={self.chunk_records!r})"
+
+
+class TraceReader:
+    """
+    Reads a trace file written by `TraceWriter`, memory mapped read-only. Can be read while the trace is written.
+
+    Args:
+        path (str): Path of the trace file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+    ) -> None:
+        self.path = path
+
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = _header.unpack_from(self._buffer)
+        if magic != _magic:
+            self._buffer.close()
+            raise ValueError(f"{path!r} is not a timequota trace file")
+        self.count: int = count
+
+        self.sections: Dict[int, str] = {0: _step_section}
+        sections_path = _get_sections_path(path)
+        if os.path.exists(sections_path):
+            import json
+
+            with open(sections_path) as f:
+                self.sections = {i: name for name, i in json.load(f).items()}
+
+    def memoryview(
+        self,
+    ) -> memoryview:
+        """
+        Returns:
+            memoryview: Zero-copy view of the record bytes, to be released before `close()`.
+        """
+
+        start = _header.size
+        end = start + self.count * _record.size
+        return memoryview(self._buffer)[start:end]
+
+    def numpy(
+        self,
+    ) -> Any:
+        """
+        Returns:
+            numpy.ndarray: Zero-copy structured array of the records, with fields 'start', 'duration', 'section' and 'steps'.
+        """
+
+        import numpy
+
+        dtype = numpy.dtype(
+            [
+                ("start", "<f8"),
+                ("duration", "<f8"),
+                ("section", "<u4"),
+                ("steps", "<u4"),
+            ]
+        )
+        return numpy.frombuffer(
+            self._buffer, dtype=dtype, count=self.count, offset=_header.size
+        )
+
+    def __len__(
+        self,
+    ) -> int:
+        return self.count
+
+    def __getitem__(
+        self,
+        index: int,
+    ) -> TraceRecord:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("trace index out of range")
+        return TraceRecord(
+            *_record.unpack_from(self._buffer, _header.size + index * _record.size)
+        )
+
+    def __iter__(
+        self,
+    ) -> Iterator[TraceRecord]:
+        view = self.memoryview()
+        try:
+            for record in _record.iter_unpack(view):
+                yield TraceRecord(*record)
+        finally:
+            view.release()
+
+    def close(
+        self,
+    ) -> None:
+        """
+        Unmaps the trace file, views returned by `memoryview()` and `numpy()` must be released first.
+        """
+
+        self._buffer.close()
+
+    def __enter__(
+        self,
+    ) -> "TraceReader":
+        return self
+
+    def __exit__(
+        self,
+        *args: Any,
+    ) -> None:
+        self.close()
@@ -0,0 +1,67 @@
+"""
+Runtime type checks of the quota classes, with typeguard imported on first use.
+
+`typechecked` registers a class to be decorated in place by `typeguard.typechecked` when the first instance of any
+registered class is created, so importing timequota does not import typeguard. typeguard resolves the annotations
+when the methods are called, and the annotations of optional features refer to `lazy_type` stand-ins, so resolving
+them does not import the modules of these features either.
+"""
+
+import sys
+import functools
+from typing import Any, Callable, List, Optional, Tuple
+
+_pending_typechecks: List[Tuple[type, Optional[Callable[..., None]]]] = []
+
+
+class _LazyType(type):
+    # no instance of a class can exist before its module is imported, instances are only checked from then on
+    def __instancecheck__(
+        cls,
+        instance: Any,
+    ) -> bool:
+        module = sys.modules.get(cls.__module__)
+        return module is not None and isinstance(
+            instance, getattr(module, cls.__name__)
+        )
+
+
+def lazy_type(
+    module: str,
+    name: str,
+) -> type:
+    """
+    Stand-in of the class *name* of *module* in annotations, `isinstance` checks against it import nothing.
+    """
+
+    return _LazyType(name, (), {"__module__": module, "__qualname__": name})
+
+
+def _apply_typechecks() -> None:
+    from typeguard import typechecked as typeguard_typechecked
+
+    while _pending_typechecks:
+        cls, init = _pending_typechecks.pop()
+        if init is not None:
+            cls.__init__ = init  # type: ignore
+        typeguard_typechecked(cls)
+
+
+def typechecked(
+    cls: type,
+) -> type:
+    """
+    `typeguard.typechecked`, applied in place when the first instance of any class decorated by it is initialized.
+    """
+
+    init = vars(cls).get("__init__")
+    _pending_typechecks.append((cls, init))
+    if init is not None:
+
+        @functools.wraps(init)
+        def __init__(self: Any, *args: Any, **kwargs: Any) -> None:
+            _apply_typechecks()
+            cls.__init__(self, *args, **kwargs)  # type: ignore
+
+        cls.__init__ = __init__  # type: ignore
+    return cls